@@ -0,0 +1,66 @@
+# coding:utf8
+
+# Analyse des correspondances multiples (ACM) sur un tableau disjonctif complet creux.
+# Les variables qualitatives sont codées en entiers (pd.factorize) et le tableau disjonctif est
+# construit directement en matrice creuse CSR (une seule valeur non nulle par individu et par
+# variable), sans get_dummies dense. L'ACM est l'AFC de ce tableau : une seule SVD tronquée
+# (afc.py) fournit valeurs propres et coordonnées. Les cos² sont obtenus à partir des distances
+# au centre de gravité, calculées elles aussi en creux (tableau binaire) :
+#   d²(ligne i) = somme_j z_ij / (c_j * z_i.²) - 1 ;  d²(colonne j) = somme_i z_ij / (r_i * z_.j²) - 1.
+
+import numpy as np
+import pandas as pd
+import scipy.sparse
+
+import afc
+
+
+#Fonction pour coder en entiers les modalités de chaque variable qualitative (-1 si valeur manquante)
+def codesQualitatifs(variables, separateur="_"):
+    codes = np.empty(variables.shape, dtype=np.int64)
+    noms = []
+    nombres = []
+    for k, colonne in enumerate(variables.columns):
+        codes[:, k], modalites = pd.factorize(variables[colonne], sort=True)
+        noms += [f"{colonne}{separateur}{modalite}" for modalite in modalites]
+        nombres.append(len(modalites))
+    return codes, nombres, noms
+
+
+#Fonction pour construire le tableau disjonctif complet creux à partir des codes entiers
+def tableauDisjonctif(codes, nombres):
+    codes = np.asarray(codes)
+    decalages = np.concatenate([[0], np.cumsum(nombres)[:-1]])
+    presents = codes >= 0
+    lignes = np.broadcast_to(np.arange(codes.shape[0])[:, None], codes.shape)[presents]
+    colonnes = (codes + decalages)[presents]
+    return scipy.sparse.csr_matrix(
+        (np.ones(len(lignes)), (lignes, colonnes)), shape=(codes.shape[0], int(np.sum(nombres)))
+    )
+
+
+#Fonction pour réaliser l'ACM d'un DataFrame de variables qualitatives (k axes, une seule SVD tronquée)
+def analyseCorrespondancesMultiples(variables, k=None, methode="lanczos", graine=None):
+    codes, nombres, noms = codesQualitatifs(variables)
+    Z = tableauDisjonctif(codes, nombres)
+    resultats = afc.analyseCorrespondances(Z, k=k, methode=methode, graine=graine)
+    dimensions = list(range(len(resultats["inertie"])))
+
+    total_lignes = np.asarray(Z.sum(axis=1)).ravel()
+    total_colonnes = np.asarray(Z.sum(axis=0)).ravel()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        distances_lignes = (Z @ (1.0 / resultats["masses_colonnes"])) / total_lignes ** 2 - 1.0
+        distances_colonnes = (Z.T @ (1.0 / resultats["masses_lignes"])) / total_colonnes ** 2 - 1.0
+        cos2_lignes = resultats["coord_lignes"] ** 2 / distances_lignes[:, None]
+        cos2_colonnes = resultats["coord_colonnes"] ** 2 / distances_colonnes[:, None]
+
+    index = variables.index
+    return {
+        "valeurs_propres": resultats["inertie"],
+        "inertie_totale": (len(noms) - variables.shape[1]) / variables.shape[1],
+        "coord_lignes": pd.DataFrame(resultats["coord_lignes"], index=index, columns=dimensions),
+        "coord_colonnes": pd.DataFrame(resultats["coord_colonnes"], index=noms, columns=dimensions),
+        "cos2_lignes": pd.DataFrame(cos2_lignes, index=index, columns=dimensions),
+        "cos2_colonnes": pd.DataFrame(cos2_colonnes, index=noms, columns=dimensions),
+        "tableau_disjonctif": Z,
+    }
@@ -0,0 +1,122 @@
+# coding:utf8
+
+# Analyse en composantes principales (ACP normée) hors mémoire.
+# Première lecture par blocs : moyennes et co-moments (sommes des produits croisés centrés)
+# sont accumulés bloc par bloc et fusionnés avec les formules de Chan, ce qui donne la matrice
+# de corrélation sans jamais charger le fichier entier. Les axes sont obtenus par
+# décomposition de cette matrice (variables x variables), avec la même convention de signe que
+# sklearn (plus grande composante de chaque axe positive) et les mêmes valeurs propres que
+# PCA appliquée aux données centrées-réduites par StandardScaler.
+# Seconde lecture par blocs : coordonnées, contributions et cos² des individus sont calculés
+# et ajoutés aux fichiers CSV de sortie bloc après bloc.
+
+import os
+import numpy as np
+import pandas as pd
+
+from flux import lireParBlocs, TAILLE_BLOC_PAR_DEFAUT
+
+
+#Classe pour accumuler effectif, moyennes et co-moments de plusieurs variables, bloc par bloc
+class CoMoments:
+    def __init__(self, p):
+        self.n = 0
+        self.moyenne = np.zeros(p)
+        self.comoments = np.zeros((p, p))
+
+    def ajouter(self, bloc):
+        bloc = np.asarray(bloc, dtype=float)
+        autre = CoMoments(bloc.shape[1])
+        autre.n = bloc.shape[0]
+        if autre.n:
+            autre.moyenne = bloc.mean(axis=0)
+            centre = bloc - autre.moyenne
+            autre.comoments = centre.T @ centre
+        self.fusionner(autre)
+
+    def fusionner(self, autre):
+        if autre.n == 0:
+            return
+        n = self.n + autre.n
+        delta = autre.moyenne - self.moyenne
+        self.comoments += autre.comoments + np.outer(delta, delta) * (self.n * autre.n / n)
+        self.moyenne += delta * (autre.n / n)
+        self.n = n
+
+    def ecartType(self, ddof=0):
+        return np.sqrt(np.diag(self.comoments) / (self.n - ddof))
+
+    def correlation(self):
+        ecarts = np.sqrt(np.diag(self.comoments))
+        return self.comoments / np.outer(ecarts, ecarts)
+
+
+#Fonction pour calculer les axes d'une ACP normée à partir des co-moments accumulés
+def axesACP(comoments, n_composantes=None):
+    p = len(comoments.moyenne)
+    n_composantes = p if n_composantes is None else n_composantes
+    # covariance des données centrées-réduites (ddof=0 pour réduire, ddof=1 pour la variance, comme sklearn)
+    covariance = comoments.correlation() * comoments.n / (comoments.n - 1)
+    valeurs, vecteurs = np.linalg.eigh(covariance)
+    ordre = np.argsort(valeurs)[::-1][:n_composantes]
+    valeurs = np.maximum(valeurs[ordre], 0.0)
+    composantes = vecteurs[:, ordre].T
+    # convention de signe de sklearn (svd_flip sur les composantes)
+    signes = np.sign(composantes[np.arange(len(composantes)), np.argmax(np.abs(composantes), axis=1)])
+    signes[signes == 0] = 1
+    composantes *= signes[:, None]
+    return {
+        "valeurs_propres": valeurs,
+        "ratio_variance": valeurs / np.trace(covariance),
+        "composantes": composantes,
+    }
+
+
+#Fonction pour réaliser une ACP normée en deux lectures par blocs d'un CSV, résultats individus écrits sur disque
+def acpParBlocs(nom, colonne_individus, dossier_sortie, n_composantes=None, taille_bloc=TAILLE_BLOC_PAR_DEFAUT,
+                **options):
+    colonnes = None
+    accumulateur = None
+    for bloc in lireParBlocs(nom, taille_bloc, **options):
+        if colonnes is None:
+            colonnes = [c for c in bloc.columns if c != colonne_individus]
+            accumulateur = CoMoments(len(colonnes))
+        accumulateur.ajouter(bloc[colonnes].to_numpy(dtype=float))
+
+    resultats = axesACP(accumulateur, n_composantes)
+    moyenne = accumulateur.moyenne
+    ecart_type = accumulateur.ecartType()
+    composantes = resultats["composantes"]
+    valeurs = resultats["valeurs_propres"]
+    dimensions = [f"Dim{i + 1}" for i in range(len(valeurs))]
+
+    os.makedirs(dossier_sortie, exist_ok=True)
+    fichiers = {nom_fichier: os.path.join(dossier_sortie, f"acp_{nom_fichier}.csv")
+                for nom_fichier in ("scores", "contributions", "cos2")}
+    premier = True
+    for bloc in lireParBlocs(nom, taille_bloc, **options):
+        scores = ((bloc[colonnes].to_numpy(dtype=float) - moyenne) / ecart_type) @ composantes.T
+        carres = scores ** 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            tables = {
+                "scores": scores,
+                "contributions": carres / (accumulateur.n * valeurs),
+                "cos2": carres / carres.sum(axis=1, keepdims=True),
+            }
+        for nom_fichier, valeurs_bloc in tables.items():
+            pd.DataFrame(valeurs_bloc, index=bloc[colonne_individus], columns=dimensions).to_csv(
+                fichiers[nom_fichier], mode="w" if premier else "a", header=premier, encoding="utf-8"
+            )
+        premier = False
+
+    # variables : charges et coordonnées du cercle des corrélations (mêmes formules que la session 9)
+    resultats["loadings"] = pd.DataFrame(composantes.T * np.sqrt(valeurs), index=colonnes, columns=dimensions)
+    resultats["cercle_correlations"] = pd.DataFrame(composantes.T * np.sqrt(resultats["ratio_variance"]),
+                                                    index=colonnes, columns=dimensions)
+    fichiers["loadings"] = os.path.join(dossier_sortie, "acp_loadings.csv")
+    fichiers["cercle_correlations"] = os.path.join(dossier_sortie, "acp_cercle_correlations.csv")
+    resultats["loadings"].to_csv(fichiers["loadings"], encoding="utf-8")
+    resultats["cercle_correlations"].to_csv(fichiers["cercle_correlations"], encoding="utf-8")
+    resultats.update({"moyenne": moyenne, "ecart_type": ecart_type, "n": accumulateur.n,
+                      "colonnes": colonnes, "fichiers": fichiers})
+    return resultats
@@ -0,0 +1,115 @@
+# coding:utf8
+
+# Analyse factorielle des correspondances (AFC) pour de grands tableaux de contingence.
+# La matrice des résidus standardisés S = Dr^-1/2 (P - r c') Dc^-1/2 n'est jamais formée :
+# elle est représentée par un LinearOperator (produit creux Dr^-1/2 P Dc^-1/2 moins le terme de
+# rang un racine(r) racine(c)'), et seuls les k premiers axes sont calculés, par Lanczos
+# (scipy.sparse.linalg.svds) ou par SVD aléatoire (Halko, Martinsson & Tropp). Sans k, le calcul
+# dense historique (SVD complète) est conservé, ce qui garde les sorties de la session 8.
+# Les lignes et colonnes supplémentaires sont projetées par les formules de transition.
+
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+N_ITERATIONS_PAR_DEFAUT = 4
+SURECHANTILLONNAGE_PAR_DEFAUT = 10
+
+
+def _inverse_racine(masses):
+    with np.errstate(divide="ignore"):
+        return np.where(masses > 0, 1.0 / np.sqrt(masses), 0.0)
+
+
+#Fonction pour construire l'opérateur des résidus standardisés S d'un tableau (creux ou dense) sans le densifier
+def operateurResidus(table):
+    table = scipy.sparse.csr_matrix(table, dtype=float)
+    n = table.sum()
+    r = np.asarray(table.sum(axis=1)).ravel() / n
+    c = np.asarray(table.sum(axis=0)).ravel() / n
+    A = scipy.sparse.diags(_inverse_racine(r)) @ (table / n) @ scipy.sparse.diags(_inverse_racine(c))
+    A = A.tocsr()
+    racine_r = np.sqrt(r)
+    racine_c = np.sqrt(c)
+
+    def produit(v):
+        return A @ v - np.outer(racine_r, racine_c @ v).reshape(A.shape[0], *np.shape(v)[1:])
+
+    def produit_transpose(v):
+        return A.T @ v - np.outer(racine_c, racine_r @ v).reshape(A.shape[1], *np.shape(v)[1:])
+
+    operateur = scipy.sparse.linalg.LinearOperator(
+        A.shape, matvec=produit, rmatvec=produit_transpose, matmat=produit, rmatmat=produit_transpose, dtype=float
+    )
+    return operateur, r, c
+
+
+#Fonction pour calculer les k premiers triplets singuliers d'un opérateur par SVD aléatoire
+def svdAleatoire(operateur, k, n_iterations=N_ITERATIONS_PAR_DEFAUT, surechantillonnage=SURECHANTILLONNAGE_PAR_DEFAUT,
+                 graine=None):
+    rng = np.random.default_rng(graine)
+    taille = min(k + surechantillonnage, min(operateur.shape))
+    Q, _ = np.linalg.qr(operateur.matmat(rng.standard_normal((operateur.shape[1], taille))))
+    for _ in range(n_iterations):
+        Q, _ = np.linalg.qr(operateur.rmatmat(Q))
+        Q, _ = np.linalg.qr(operateur.matmat(Q))
+    B = operateur.rmatmat(Q).T
+    U, valeurs, Vt = np.linalg.svd(B, full_matrices=False)
+    return (Q @ U)[:, :k], valeurs[:k], Vt[:k]
+
+
+def _orienter(U, Vt):
+    # convention de signe déterministe : plus grande composante (en valeur absolue) de chaque axe positive
+    signes = np.sign(U[np.argmax(np.abs(U), axis=0), np.arange(U.shape[1])])
+    signes[signes == 0] = 1
+    return U * signes, Vt * signes[:, None]
+
+
+#Fonction pour réaliser l'AFC d'un tableau de contingence (k axes en creux, ou tous les axes en dense si k=None)
+def analyseCorrespondances(table, k=None, methode="lanczos", graine=None):
+    if k is None:
+        # calcul dense historique (SVD complète), identique à correspondence_analysis de la session 8
+        X = table.toarray() if scipy.sparse.issparse(table) else np.asarray(table, dtype=float)
+        X = X.astype(float)
+        n = X.sum()
+        P = X / n
+        r = P.sum(axis=1, keepdims=True)
+        c = P.sum(axis=0, keepdims=True)
+        attendus = r @ c
+        S = (P - attendus) / np.sqrt(attendus)
+        U, valeurs, Vt = np.linalg.svd(S, full_matrices=False)
+        r, c = r.ravel(), c.ravel()
+    else:
+        operateur, r, c = operateurResidus(table)
+        if methode == "aleatoire":
+            U, valeurs, Vt = svdAleatoire(operateur, k, graine=graine)
+        else:
+            U, valeurs, Vt = scipy.sparse.linalg.svds(operateur, k=k, random_state=graine)
+            ordre = np.argsort(valeurs)[::-1]
+            U, valeurs, Vt = U[:, ordre], valeurs[ordre], Vt[ordre]
+        U, Vt = _orienter(U, Vt)
+    return {
+        "coord_lignes": _inverse_racine(r)[:, None] * (U * valeurs),
+        "coord_colonnes": _inverse_racine(c)[:, None] * (Vt.T * valeurs),
+        "inertie": valeurs ** 2,
+        "valeurs_singulieres": valeurs,
+        "masses_lignes": r,
+        "masses_colonnes": c,
+    }
+
+
+def _profils(table):
+    table = scipy.sparse.csr_matrix(table, dtype=float)
+    return scipy.sparse.diags(_inverse_racine(np.asarray(table.sum(axis=1)).ravel()) ** 2) @ table
+
+
+#Fonction pour projeter des lignes supplémentaires (mêmes colonnes que le tableau actif) sur les axes d'une AFC
+def projeterLignes(resultats, lignes_supplementaires):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _profils(lignes_supplementaires) @ resultats["coord_colonnes"] / resultats["valeurs_singulieres"]
+
+
+#Fonction pour projeter des colonnes supplémentaires (mêmes lignes que le tableau actif) sur les axes d'une AFC
+def projeterColonnes(resultats, colonnes_supplementaires):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _profils(scipy.sparse.csr_matrix(colonnes_supplementaires).T) @ resultats["coord_lignes"] / resultats["valeurs_singulieres"]
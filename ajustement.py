@@ -0,0 +1,236 @@
+# coding:utf8
+
+# Service d'ajustement de lois de probabilité.
+# Chaque loi du catalogue dist_names est ajustée par maximum de vraisemblance (dist.fit)
+# dans un processus du pool (parallele.py), avec un délai maximal par loi : au-delà,
+# l'ajustement est interrompu par une alarme (SIGALRM, systèmes Unix) et la loi est
+# marquée "delai depasse" (sans délai hors du fil principal ou sans SIGALRM). Les ajustements
+# dégénérés, fréquents sur des données discrétisées (échelle quasi nulle, densité infinie ou en
+# pic sur une valeur observée, support sans rapport avec l'étendue des données), sont écartés
+# avant le classement par statistique de Kolmogorov-Smirnov, AIC ou BIC. Les paramètres ajustés
+# sont mémorisés par empreinte des données (en mémoire et, si un dossier de cache est fourni,
+# sur disque) : une série déjà vue n'est pas réajustée.
+
+import os
+import json
+import time
+import signal
+import warnings
+import threading
+import hashlib
+import numpy as np
+import pandas as pd
+import scipy.stats
+
+from parallele import repartir
+
+dist_names = [
+    "norm",
+    "beta",
+    "gamma",
+    "pareto",
+    "t",
+    "lognorm",
+    "invgamma",
+    "invgauss",
+    "loggamma",
+    "alpha",
+    "chi",
+    "chi2",
+    "bradford",
+    "burr",
+    "burr12",
+    "cauchy",
+    "dweibull",
+    "erlang",
+    "expon",
+    "exponnorm",
+    "exponweib",
+    "exponpow",
+    "f",
+    "genpareto",
+    "gausshyper",
+    "gibrat",
+    "gompertz",
+    "gumbel_r",
+    "pareto",
+    "pearson3",
+    "powerlaw",
+    "triang",
+    "weibull_min",
+    "weibull_max",
+    "bernoulli",
+    "betabinom",
+    "betanbinom",
+    "binom",
+    "geom",
+    "hypergeom",
+    "logser",
+    "nbinom",
+    "poisson",
+    "poisson_binom",
+    "randint",
+    "zipf",
+    "zipfian",
+]
+
+# Catalogue ajusté par défaut : les lois de la session 4, plus la loi uniforme des candidates d'origine de la session 5
+lois_ajustement = list(dict.fromkeys(dist_names + ["uniform"]))
+
+DELAI_PAR_DEFAUT = 30.0
+
+# Seuils de dégénérescence : échelle minimale et maximale relatives à l'étendue des données,
+# densité maximale relative à la résolution des données (plus petit écart entre valeurs distinctes) :
+# une densité supérieure à 1 / résolution mettrait plus que toute la masse dans une seule cellule
+ECHELLE_MIN_RELATIVE = 1e-9
+ECHELLE_MAX_RELATIVE = 1e3
+DENSITE_MAX_RELATIVE = 1.0
+
+# Ajustements déjà calculés dans ce processus : {empreinte des données: {loi: résultat}}
+_memoire = {}
+
+
+class DelaiDepasse(Exception):
+    pass
+
+
+def _alarme(signum, frame):
+    raise DelaiDepasse()
+
+
+#Fonction pour calculer l'empreinte d'une série de données
+def empreinteDonnees(donnees):
+    donnees = np.ascontiguousarray(donnees, dtype=float)
+    return hashlib.sha256(donnees.tobytes()).hexdigest()[:32]
+
+
+#Fonction pour ajuster une loi (exécutée dans un processus du pool, interrompue après delai secondes)
+def ajusterLoi(tache):
+    nom, donnees, delai = tache
+    dist = getattr(scipy.stats, nom, None)
+    resultat = {"loi": nom, "params": None, "ks": np.nan, "pvalue": np.nan, "loglik": np.nan,
+                "aic": np.nan, "bic": np.nan, "statut": "ok", "duree": 0.0}
+    if dist is None or not hasattr(dist, "fit"):
+        resultat["statut"] = "non ajustable (loi discrete)" if dist is not None else "inconnue"
+        return resultat
+    # l'alarme n'est disponible que sur le fil principal d'un système qui fournit SIGALRM : sinon, pas de délai
+    alarme = bool(delai) and hasattr(signal, "SIGALRM") and hasattr(signal, "setitimer") \
+        and threading.current_thread() is threading.main_thread()
+    if alarme:
+        try:
+            ancien = signal.signal(signal.SIGALRM, _alarme)
+            signal.setitimer(signal.ITIMER_REAL, delai)
+        except (ValueError, OSError):
+            alarme = False
+    debut = time.perf_counter()
+    try:
+        with np.errstate(all="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            params = dist.fit(donnees)
+            ks = scipy.stats.kstest(donnees, nom, args=params)
+            loglik = float(np.sum(dist.logpdf(donnees, *params)))
+        k = len(params)
+        resultat.update({
+            "params": tuple(float(p) for p in params),
+            "ks": float(ks.statistic),
+            "pvalue": float(ks.pvalue),
+            "loglik": loglik,
+            "aic": 2 * k - 2 * loglik if np.isfinite(loglik) else np.inf,
+            "bic": k * np.log(len(donnees)) - 2 * loglik if np.isfinite(loglik) else np.inf,
+        })
+    except DelaiDepasse:
+        resultat["statut"] = "delai depasse"
+    except Exception as erreur:
+        resultat["statut"] = f"echec ({type(erreur).__name__})"
+    finally:
+        if alarme:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, ancien)
+    resultat["duree"] = time.perf_counter() - debut
+    return resultat
+
+
+#Fonction pour détecter un ajustement dégénéré (raison, ou None si l'ajustement est acceptable)
+def degenerescence(resultat, donnees):
+    if not np.isfinite(resultat["loglik"]):
+        return "vraisemblance non finie"
+    dist = getattr(scipy.stats, resultat["loi"])
+    params = resultat["params"]
+    valeurs = np.unique(donnees)
+    etendue = float(valeurs[-1] - valeurs[0]) if len(valeurs) > 1 else 0.0
+    if etendue == 0.0:
+        return None
+    echelle = params[-1]
+    if echelle <= ECHELLE_MIN_RELATIVE * etendue:
+        return "echelle quasi nulle"
+    if echelle >= ECHELLE_MAX_RELATIVE * etendue:
+        return "support sans rapport avec les donnees"
+    resolution = float(np.min(np.diff(valeurs)))
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        densite = dist.pdf(valeurs, *params)
+    if not np.all(np.isfinite(densite)) or np.max(densite) * resolution > DENSITE_MAX_RELATIVE:
+        return "densite en pic sur une valeur observee"
+    return None
+
+
+def _lire_cache(dossier_cache, empreinte):
+    if dossier_cache is None:
+        return {}
+    try:
+        with open(os.path.join(dossier_cache, f"{empreinte}.json"), "r", encoding="utf-8") as fichier:
+            return json.load(fichier)
+    except (OSError, ValueError):
+        return {}
+
+
+def _ecrire_cache(dossier_cache, empreinte, resultats):
+    if dossier_cache is None:
+        return
+    os.makedirs(dossier_cache, exist_ok=True)
+    chemin = os.path.join(dossier_cache, f"{empreinte}.json")
+    with open(chemin + ".tmp", "w", encoding="utf-8") as fichier:
+        json.dump(resultats, fichier)
+    os.replace(chemin + ".tmp", chemin)
+
+
+#Fonction pour ajuster tout un catalogue de lois en parallèle et classer les résultats (critere : "ks", "aic" ou "bic")
+def ajusterCatalogue(donnees, lois=lois_ajustement, critere="ks", delai=DELAI_PAR_DEFAUT, dossier_cache=None, processus=None):
+    donnees = np.asarray(donnees, dtype=float)
+    donnees = donnees[~np.isnan(donnees)]
+    empreinte = empreinteDonnees(donnees)
+    connus = {**_lire_cache(dossier_cache, empreinte), **_memoire.get(empreinte, {})}
+
+    lois = list(dict.fromkeys(lois))
+    a_ajuster = [nom for nom in lois if nom not in connus]
+    nouveaux = repartir(ajusterLoi, [(nom, donnees, delai) for nom in a_ajuster], processus)
+    for resultat in nouveaux:
+        # un délai dépassé ou un échec n'est pas mémorisé : il sera retenté au prochain appel
+        if resultat["statut"] == "ok" or resultat["statut"].startswith("non ajustable"):
+            connus[resultat["loi"]] = resultat
+    if nouveaux:
+        _memoire[empreinte] = connus
+        _ecrire_cache(dossier_cache, empreinte, connus)
+
+    resultats = {resultat["loi"]: dict(resultat) for resultat in nouveaux}
+    resultats.update({nom: dict(connus[nom]) for nom in lois if nom in connus})
+    # la dégénérescence est évaluée à chaque classement (et non mémorisée) : les résultats en cache restent bruts
+    for resultat in resultats.values():
+        if resultat["statut"] == "ok":
+            raison = degenerescence(resultat, donnees)
+            if raison is not None:
+                resultat["statut"] = f"degenere ({raison})"
+    tableau = pd.DataFrame([resultats[nom] for nom in lois])
+    tableau["memorise"] = [nom not in a_ajuster for nom in lois]
+    # ajustements acceptables d'abord, classés par le critère ; les autres ensuite
+    tableau["_rejete"] = tableau["statut"] != "ok"
+    tableau = tableau.sort_values(["_rejete", critere], na_position="last", kind="stable")
+    return tableau.drop(columns="_rejete").reset_index(drop=True)
+
+
+#Fonction pour choisir la meilleure loi d'un classement : plus grande p-value KS, égalités (p-values nulles) départagées par la statistique KS
+def meilleureLoi(classement):
+    ajustees = classement[classement["statut"] == "ok"]
+    if ajustees.empty:
+        return None
+    return ajustees.sort_values(["pvalue", "ks"], ascending=[False, True], kind="stable").iloc[0]
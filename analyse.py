@@ -0,0 +1,338 @@
+# coding:utf8
+
+# Point d'entrée en ligne de commande : une sous-commande par session et par analyse.
+# Seule la bibliothèque standard est importée au démarrage : pandas, scipy, sklearn, statsmodels
+# et les modules du dépôt ne sont chargés que par la sous-commande qui en a besoin (importer()).
+# matplotlib n'est importé que si une figure est demandée (--figure), avec l'API objet et le
+# rendu Agg (non interactif) ; pour les scripts de session qui tracent avec pyplot, le backend
+# Agg est imposé avant leur exécution. Avec --temps, la durée des imports et celle du calcul sont
+# affichées sur la sortie d'erreur, ce qui permet de suivre le coût du démarrage.
+#
+# Exemples :
+#   python src/analyse.py session 8
+#   python src/analyse.py stats src/data/resultats-elections-presidentielles-2022-1er-tour.csv --flux
+#   python src/analyse.py mco src/data/geomarketing.csv --cible ca --selection bic --temps
+#   python src/analyse.py acp src/data/france-temperatures.csv --individus Villes --figure acp.png
+
+import os
+import sys
+import time
+import argparse
+import importlib
+
+RACINE = os.path.dirname(os.path.abspath(__file__))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+# script, et s'il trace avec pyplot (backend Agg imposé avant exécution)
+SESSIONS = {
+    "2": ("main_session2.py", False),
+    "3": ("main_session3.py", False),
+    "4": ("main_session4.py", True),
+    "5": ("main_session5.py", False),
+    "6": ("main _session6.py", True),
+    "7": ("main_session7.py", False),
+    "8": ("main_session8.py", False),
+    "9": ("main_session9.py", True),
+    "10": ("main_session10.py", False),
+}
+
+_temps_imports = {}
+
+
+#Fonction pour importer un module à la demande en mesurant la durée de son import
+def importer(nom):
+    if nom in sys.modules:
+        return sys.modules[nom]
+    debut = time.perf_counter()
+    module = importlib.import_module(nom)
+    _temps_imports[nom] = time.perf_counter() - debut
+    return module
+
+
+#Fonction pour créer une figure avec l'API objet de matplotlib (rendu Agg, sans pyplot ni backend interactif)
+def nouvelleFigure(taille=(7, 6)):
+    figure_module = importer("matplotlib.figure")
+    agg = importer("matplotlib.backends.backend_agg")
+    figure = figure_module.Figure(figsize=taille)
+    agg.FigureCanvasAgg(figure)
+    return figure, figure.add_subplot()
+
+
+def _lire(arguments):
+    chargement = importer("chargement")
+    return chargement.ouvrirUnFichier(arguments.fichier, cache=not arguments.sans_cache)
+
+
+def _ecrire(tableau, chemin, **options):
+    if chemin:
+        tableau.to_csv(chemin, encoding="utf-8", **options)
+        print("Écrit :", chemin)
+
+
+def _nuage(chemin, x, y, etiquettes, titre, cercle=False):
+    figure, axes = nouvelleFigure()
+    axes.scatter(x, y)
+    for xi, yi, etiquette in zip(x, y, etiquettes):
+        axes.text(xi, yi, str(etiquette), fontsize=8)
+    axes.axhline(0, color="grey", linewidth=0.8)
+    axes.axvline(0, color="grey", linewidth=0.8)
+    if cercle:
+        patches = importer("matplotlib.patches")
+        axes.add_patch(patches.Circle((0, 0), 1, color="grey", fill=False, linestyle="--"))
+        axes.set_aspect("equal")
+    axes.set_xlabel("Dim1")
+    axes.set_ylabel("Dim2")
+    axes.set_title(titre)
+    figure.tight_layout()
+    figure.savefig(chemin, dpi=150)
+    print("Figure :", chemin)
+
+
+#Fonction pour exécuter un script de session (depuis le dossier parent du dépôt, comme en exécution manuelle)
+def commandeSession(arguments):
+    script, pyplot = SESSIONS[arguments.numero]
+    if arguments.flux:
+        os.environ["MODE_FLUX"] = "1"
+    if pyplot:
+        os.environ["MPLBACKEND"] = "Agg"
+    # modules du dépôt utilisés par le script importés d'abord, pour séparer le temps d'import du calcul
+    for module in importer("pipeline").modulesImportes(script):
+        importer(module)
+    if pyplot:
+        importer("matplotlib.pyplot")
+    os.chdir(os.path.dirname(RACINE))
+    sys.argv = [os.path.join(RACINE, script)]
+    importer("runpy").run_path(os.path.join(RACINE, script), run_name="__main__")
+
+
+def commandePipeline(arguments):
+    pipeline = importer("pipeline")
+    bilan = pipeline.executer(arguments.taches or None, forcer=arguments.forcer, processus=arguments.processus)
+    print("Bilan :", ", ".join(f"{nom}={statut}" for nom, statut in bilan.items()))
+    return 1 if "echec" in bilan.values() else 0
+
+
+def commandeStats(arguments):
+    statistiques = importer("statistiques")
+    if arguments.flux:
+        resultats = importer("flux").agregerParBlocs(arguments.fichier)
+    else:
+        contenu = _lire(arguments)
+        resultats = statistiques.statistiquesDescriptives(contenu, colonnes=arguments.colonnes)
+    tableau = statistiques.tableauStatistiques(resultats)
+    print(tableau.to_string(index=False))
+    print(statistiques.tableauDistances(resultats).to_string(index=False))
+    _ecrire(tableau, arguments.sortie, index=False)
+
+
+def commandeRangs(arguments):
+    panel = importer("rangs").PanelRangs.depuisDataFrame(_lire(arguments), arguments.unites, arguments.colonnes)
+    matrice = panel.matrice(arguments.mesure, arguments.colonnes)
+    print(matrice)
+    _ecrire(matrice, arguments.sortie)
+
+
+def commandeContingence(arguments):
+    contingence = importer("contingence")
+    donnees = _lire(arguments)
+    if arguments.croise:
+        tableau = contingence.tableauDepuisCroise(donnees.set_index(arguments.croise))
+    else:
+        tableau = contingence.tableauDepuisEnregistrements(arguments.lignes, arguments.colonnes, donnees=donnees)
+    analyse = contingence.analyseContingence(tableau["table"])
+    print(f"Chi2: {analyse['chi2']:.4f}, ddl: {analyse['ddl']}, p-value: {analyse['pvalue']:.6e}")
+    print(f"Phi2: {analyse['phi2']:.6f}, V de Cramér: {analyse['v_cramer']:.6f}, effectif: {analyse['n']}")
+
+
+def commandeAfc(arguments):
+    pd = importer("pandas")
+    croise = _lire(arguments).set_index(arguments.croise)
+    resultats = importer("afc").analyseCorrespondances(croise.to_numpy(dtype=float), k=arguments.k)
+    dimensions = [f"Dim{i + 1}" for i in range(len(resultats["inertie"]))]
+    print("Inerties :", resultats["inertie"])
+    lignes = pd.DataFrame(resultats["coord_lignes"], index=croise.index, columns=dimensions)
+    colonnes = pd.DataFrame(resultats["coord_colonnes"], index=croise.columns, columns=dimensions)
+    print(lignes)
+    print(colonnes)
+    _ecrire(lignes, arguments.sortie)
+    if arguments.figure and len(dimensions) >= 2:
+        coordonnees = pd.concat([lignes, colonnes])
+        _nuage(arguments.figure, coordonnees["Dim1"], coordonnees["Dim2"], coordonnees.index, "AFC (Dim1/Dim2)")
+
+
+def commandeAcp(arguments):
+    pd = importer("pandas")
+    np = importer("numpy")
+    acp = importer("acp")
+    donnees = _lire(arguments)
+    X = donnees.drop(columns=[arguments.individus]).select_dtypes("number")
+    comoments = acp.CoMoments(X.shape[1])
+    comoments.ajouter(X.to_numpy(dtype=float))
+    axes = acp.axesACP(comoments, arguments.k)
+    dimensions = [f"Dim{i + 1}" for i in range(len(axes["valeurs_propres"]))]
+    print("Valeurs propres :", axes["valeurs_propres"])
+    print("Variance expliquée (%) :", axes["ratio_variance"] * 100)
+    cercle = pd.DataFrame(axes["composantes"].T * np.sqrt(axes["ratio_variance"]), index=X.columns, columns=dimensions)
+    print("Cercle des corrélations :")
+    print(cercle)
+    scores = ((X.to_numpy(dtype=float) - comoments.moyenne) / comoments.ecartType()) @ axes["composantes"].T
+    scores = pd.DataFrame(scores, index=donnees[arguments.individus], columns=dimensions)
+    _ecrire(scores, arguments.sortie)
+    if arguments.figure and len(dimensions) >= 2:
+        _nuage(arguments.figure, scores["Dim1"], scores["Dim2"], scores.index, "ACP - individus (Dim1/Dim2)")
+
+
+def commandeAcm(arguments):
+    donnees = _lire(arguments)
+    variables = donnees[arguments.variables] if arguments.variables else donnees.select_dtypes(exclude="number")
+    resultats = importer("acm").analyseCorrespondancesMultiples(variables, k=arguments.k)
+    print("Valeurs propres :", resultats["valeurs_propres"])
+    print("Coordonnées des modalités :")
+    print(resultats["coord_colonnes"])
+    _ecrire(resultats["coord_lignes"], arguments.sortie)
+
+
+def commandeCah(arguments):
+    classification = importer("classification")
+    donnees = _lire(arguments)
+    X = donnees[arguments.colonnes] if arguments.colonnes else donnees.select_dtypes("number")
+    points = X.to_numpy(dtype=float)
+    if arguments.reduire:
+        points = (points - points.mean(axis=0)) / points.std(axis=0)
+    arbre = classification.cah(points, n_centres=classification.N_CENTRES_PAR_DEFAUT, graine=arguments.graine)
+    classes = classification.couperArbre(arbre, arguments.classes)
+    print(classification.decrireClasses(X, classes))
+    if arguments.figure:
+        etiquettes = donnees[arguments.etiquettes].astype(str).tolist() if arguments.etiquettes else None
+        classification.dessinerDendrogramme(arbre, arguments.figure, etiquettes=etiquettes)
+        print("Figure :", arguments.figure)
+
+
+def commandeMco(arguments):
+    moindres_carres = importer("moindres_carres")
+    donnees = _lire(arguments)
+    X = donnees[arguments.variables] if arguments.variables else \
+        donnees.drop(columns=[arguments.cible]).select_dtypes(exclude=["object", "string"])
+    mco = moindres_carres.MoindresCarres(X, donnees[arguments.cible])
+    variables = None
+    if arguments.selection:
+        selection = importer("selection").selectionPasAPas(mco, sens="avant", critere=arguments.selection)
+        variables = selection["variables"]
+        print(f"Variables retenues ({arguments.selection}) :", variables)
+    modele = mco.ajuster(variables)
+    if arguments.resume:
+        # statsmodels (import coûteux) n'est chargé que pour le résumé complet
+        print(modele.summary())
+    else:
+        print("Coefficients :")
+        print(importer("pandas").DataFrame({"coefficient": modele.params, "erreur_type": modele.bse,
+                                           "t": modele.tvalues, "pvalue": modele.pvalues}))
+        print(f"R² : {modele.rsquared:.6f}  R² ajusté : {modele.rsquared_adj:.6f}  AIC : {modele.aic:.2f}  BIC : {modele.bic:.2f}")
+
+
+def _fichier(sous_parser):
+    sous_parser.add_argument("fichier", help="fichier CSV (UTF-8)")
+    sous_parser.add_argument("--sans-cache", action="store_true", help="relire le CSV sans le cache binaire")
+
+
+#Fonction pour construire l'analyseur de la ligne de commande
+def analyseur():
+    parser = argparse.ArgumentParser(description="Sessions et analyses du projet, avec imports à la demande.")
+    parser.add_argument("--temps", action="store_true", help="afficher la durée des imports et du calcul (sortie d'erreur)")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    p = commandes.add_parser("session", help="exécuter un script de session")
+    p.add_argument("numero", choices=list(SESSIONS))
+    p.add_argument("--flux", action="store_true", help="mode flux (MODE_FLUX=1) pour les sessions qui le proposent")
+    p.set_defaults(fonction=commandeSession)
+
+    p = commandes.add_parser("pipeline", help="exécuter les sessions comme un graphe de tâches (pipeline.py)")
+    p.add_argument("taches", nargs="*")
+    p.add_argument("--forcer", action="store_true")
+    p.add_argument("--processus", type=int, default=None)
+    p.set_defaults(fonction=commandePipeline)
+
+    p = commandes.add_parser("stats", help="statistiques descriptives des colonnes quantitatives")
+    _fichier(p)
+    p.add_argument("--colonnes", nargs="+", default=None)
+    p.add_argument("--flux", action="store_true", help="lecture par blocs (mémoire constante)")
+    p.add_argument("--sortie", default=None, help="CSV du tableau de statistiques")
+    p.set_defaults(fonction=commandeStats)
+
+    p = commandes.add_parser("rangs", help="concordance des classements (Spearman, Kendall)")
+    _fichier(p)
+    p.add_argument("--unites", required=True, help="colonne des unités classées")
+    p.add_argument("--colonnes", nargs="+", required=True)
+    p.add_argument("--mesure", choices=["spearman", "p_spearman", "kendall", "p_kendall"], default="spearman")
+    p.add_argument("--sortie", default=None)
+    p.set_defaults(fonction=commandeRangs)
+
+    p = commandes.add_parser("contingence", help="test du chi2, phi2 et V de Cramér")
+    _fichier(p)
+    p.add_argument("--croise", default=None, help="colonne des lignes d'un tableau déjà croisé")
+    p.add_argument("--lignes", nargs="+", default=None, help="variable(s) en lignes (enregistrements bruts)")
+    p.add_argument("--colonnes", default=None, help="variable en colonnes (enregistrements bruts)")
+    p.set_defaults(fonction=commandeContingence)
+
+    p = commandes.add_parser("afc", help="analyse factorielle des correspondances d'un tableau croisé")
+    _fichier(p)
+    p.add_argument("--croise", required=True, help="colonne des lignes du tableau croisé")
+    p.add_argument("-k", type=int, default=None, help="nombre d'axes (par défaut : SVD complète)")
+    p.add_argument("--sortie", default=None)
+    p.add_argument("--figure", default=None, help="image du plan Dim1/Dim2")
+    p.set_defaults(fonction=commandeAfc)
+
+    p = commandes.add_parser("acp", help="analyse en composantes principales normée")
+    _fichier(p)
+    p.add_argument("--individus", required=True, help="colonne des individus")
+    p.add_argument("-k", type=int, default=None)
+    p.add_argument("--sortie", default=None, help="CSV des coordonnées des individus")
+    p.add_argument("--figure", default=None, help="image du plan Dim1/Dim2 des individus")
+    p.set_defaults(fonction=commandeAcp)
+
+    p = commandes.add_parser("acm", help="analyse des correspondances multiples")
+    _fichier(p)
+    p.add_argument("--variables", nargs="+", default=None, help="variables qualitatives (par défaut : non numériques)")
+    p.add_argument("-k", type=int, default=None)
+    p.add_argument("--sortie", default=None, help="CSV des coordonnées des individus")
+    p.set_defaults(fonction=commandeAcm)
+
+    p = commandes.add_parser("cah", help="classification ascendante hiérarchique (Ward)")
+    _fichier(p)
+    p.add_argument("--colonnes", nargs="+", default=None)
+    p.add_argument("--classes", type=int, default=3)
+    p.add_argument("--reduire", action="store_true", help="centrer-réduire les colonnes")
+    p.add_argument("--graine", type=int, default=42)
+    p.add_argument("--etiquettes", default=None, help="colonne des étiquettes du dendrogramme")
+    p.add_argument("--figure", default=None, help="image du dendrogramme")
+    p.set_defaults(fonction=commandeCah)
+
+    p = commandes.add_parser("mco", help="régression linéaire (moindres carrés ordinaires)")
+    _fichier(p)
+    p.add_argument("--cible", required=True)
+    p.add_argument("--variables", nargs="+", default=None, help="variables explicatives (par défaut : toutes les numériques)")
+    p.add_argument("--selection", choices=["aic", "bic", "cv"], default=None, help="sélection pas à pas avant")
+    p.add_argument("--resume", action="store_true", help="résumé statsmodels complet")
+    p.set_defaults(fonction=commandeMco)
+    return parser
+
+
+def main(argv=None):
+    debut = time.perf_counter()
+    arguments = analyseur().parse_args(argv)
+    code = 0
+    try:
+        code = arguments.fonction(arguments) or 0
+    finally:
+        if arguments.temps:
+            total = time.perf_counter() - debut
+            imports = sum(_temps_imports.values())
+            for nom, duree in sorted(_temps_imports.items(), key=lambda element: -element[1]):
+                print(f"import {nom:40s} {duree:8.3f} s", file=sys.stderr)
+            print(f"imports : {imports:.3f} s, calcul : {total - imports:.3f} s, total : {total:.3f} s", file=sys.stderr)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+# coding:utf8
+
+# Générateurs de jeux de données synthétiques fidèles aux fichiers de data/.
+# Chaque fichier réel sert de référence : on en garde les noms et l'ordre des colonnes, puis
+# chaque colonne est reproduite à l'échelle demandée (n lignes) :
+#  - colonne numérique : loi log-normale (valeurs positives) ou normale ajustée sur la colonne
+#    réelle, bornée à son étendue, arrondie si elle est entière, même taux de valeurs manquantes ;
+#  - colonne qualitative : tirage des modalités observées avec leurs fréquences ;
+#  - identifiant (une valeur distincte par ligne : État, Villes, Race...) : libellés uniques.
+# Les colonnes numériques ne sont pas tirées indépendamment : une copule gaussienne ajustée sur la
+# référence (corrélations des scores normaux des rangs) relie leurs tirages, ce qui conserve la
+# concordance des rangs d'une année à l'autre et le lien entre la cible et les variables explicatives
+# (ca ~ X) ; les colonnes qualitatives restent tirées indépendamment.
+# Les fichiers en colonnes "préfixe + année" (PIB_1960, Pop 2007...) peuvent être étendus à d'autres
+# années, et ceux en colonnes par zone (potentiel_Z10...) à d'autres zones, en reprenant la colonne
+# réelle la plus proche.
+
+import os
+import re
+import sys
+import numpy as np
+import pandas as pd
+import scipy.stats
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+from chargement import ouvrirUnFichier  # noqa: E402
+
+DOSSIER_DONNEES = os.path.join(RACINE, "data")
+
+FICHIERS = {
+    "elections": "resultats-elections-presidentielles-2022-1er-tour.csv",
+    "echantillons": "Echantillonnage-100-Echantillons.csv",
+    "monde": "Le-Monde-HS-Etats-du-monde-2007-2025.csv",
+    "pib_energie": "pib-vs-energie.csv",
+    "socioprofessionnelle": "Socioprofessionnelle-vs-sexe.csv",
+    "temperatures_france": "france-temperatures.csv",
+    "chiens": "chiens.csv",
+    "temperature": "temperature.csv",
+    "geomarketing": "geomarketing.csv",
+}
+
+MOTIF_ANNEE = re.compile(r"^(.*?)(\d{4})$")
+MOTIF_ZONE = re.compile(r"^(.*_Z)(\d+)$")
+
+
+#Fonction pour lire le fichier réel servant de référence à un générateur
+def reference(nom):
+    return pd.DataFrame(ouvrirUnFichier(os.path.join(DOSSIER_DONNEES, FICHIERS[nom])))
+
+
+def _colonne_numerique(valeurs, n, generateur, normales=None):
+    # normales : tirages N(0, 1) de la copule (corrélés aux autres colonnes), indépendants à défaut
+    observees = valeurs.dropna().to_numpy(dtype=float)
+    if len(observees) == 0:
+        return np.full(n, np.nan)
+    if normales is None:
+        normales = generateur.standard_normal(n)
+    bas, haut = observees.min(), observees.max()
+    if bas > 0:
+        logs = np.log(observees)
+        tirage = np.exp(logs.mean() + (logs.std() or 1e-9) * normales)
+    else:
+        tirage = observees.mean() + (observees.std() or 1e-9) * normales
+    tirage = np.clip(tirage, bas, haut)
+    if np.all(observees == np.round(observees)):
+        tirage = np.round(tirage)
+    manquants = valeurs.isna().mean()
+    if manquants:
+        tirage[generateur.random(n) < manquants] = np.nan
+    return tirage
+
+
+def _colonne_qualitative(valeurs, n, generateur):
+    observees = valeurs.dropna()
+    if len(observees) and observees.nunique() == len(valeurs):
+        # identifiant : un libellé distinct par ligne
+        indices = np.arange(n)
+        libelles = pd.Series(observees.to_numpy(dtype=object)[indices % len(observees)]).astype(str)
+        return (libelles + " " + pd.Series(indices).astype(str)).to_numpy(dtype=object)
+    frequences = observees.value_counts(normalize=True)
+    if frequences.empty:
+        return np.full(n, None, dtype=object)
+    tirage = generateur.choice(frequences.index.to_numpy(dtype=object), size=n, p=frequences.to_numpy())
+    manquants = valeurs.isna().mean()
+    if manquants:
+        tirage[generateur.random(n) < manquants] = None
+    return tirage
+
+
+#Fonction pour estimer la matrice de corrélation de la copule gaussienne (scores normaux des rangs, paires complètes)
+def correlationsCopule(numeriques):
+    rangs = numeriques.rank()
+    effectifs = numeriques.notna().sum()
+    scores = pd.DataFrame(scipy.stats.norm.ppf((rangs - 0.5) / effectifs), columns=numeriques.columns)
+    correlations = scores.corr().fillna(0.0).to_numpy(copy=True)
+    np.fill_diagonal(correlations, 1.0)
+    # paires calculées sur des lignes différentes : la matrice est ramenée à la plus proche semi-définie positive
+    propres, vecteurs = np.linalg.eigh(correlations)
+    correlations = (vecteurs * np.clip(propres, 0.0, None)) @ vecteurs.T
+    diagonale = np.sqrt(np.clip(np.diag(correlations), 1e-12, None))
+    return correlations / np.outer(diagonale, diagonale)
+
+
+def _normales_correlees(correlations, n, generateur):
+    propres, vecteurs = np.linalg.eigh(correlations)
+    facteur = vecteurs * np.sqrt(np.clip(propres, 0.0, None))
+    return generateur.standard_normal((n, len(correlations))) @ facteur.T
+
+
+#Fonction pour produire n lignes synthétiques ayant le schéma (colonnes, types, distributions, corrélations) d'un DataFrame de référence
+def synthetiser(reference, n, graine=None):
+    generateur = np.random.default_rng(graine)
+    numeriques = [c for c in reference.columns if pd.api.types.is_numeric_dtype(reference[c])]
+    normales = {}
+    if numeriques:
+        tirages = _normales_correlees(correlationsCopule(reference[numeriques]), n, generateur)
+        normales = dict(zip(numeriques, tirages.T))
+    colonnes = {}
+    for colonne in reference.columns:
+        valeurs = reference[colonne]
+        if colonne in normales:
+            colonnes[colonne] = _colonne_numerique(valeurs, n, generateur, normales[colonne])
+            if pd.api.types.is_integer_dtype(valeurs) and not np.isnan(colonnes[colonne]).any():
+                colonnes[colonne] = colonnes[colonne].astype(valeurs.dtype)
+        else:
+            colonnes[colonne] = _colonne_qualitative(valeurs, n, generateur)
+    return pd.DataFrame(colonnes, columns=reference.columns)
+
+
+def _elargir(reference, motif, valeurs_voulues):
+    familles = {}
+    for colonne in reference.columns:
+        correspondance = motif.match(str(colonne))
+        if correspondance:
+            familles.setdefault(correspondance.group(1), {})[int(correspondance.group(2))] = colonne
+    if not familles:
+        return reference
+    colonnes = {}
+    deja = set()
+    for colonne in reference.columns:
+        correspondance = motif.match(str(colonne))
+        if correspondance is None:
+            colonnes[colonne] = reference[colonne]
+            continue
+        prefixe = correspondance.group(1)
+        if prefixe in deja:
+            continue
+        deja.add(prefixe)
+        existantes = familles[prefixe]
+        for valeur in valeurs_voulues:
+            proche = min(existantes, key=lambda v: abs(v - valeur))
+            colonnes[f"{prefixe}{valeur}"] = reference[existantes[proche]]
+    return pd.DataFrame(colonnes)
+
+
+#Fonction pour étendre une référence en colonnes "préfixe + année" à une autre plage d'années (année réelle la plus proche)
+def elargirAnnees(reference, annees):
+    return _elargir(reference, MOTIF_ANNEE, list(annees))
+
+
+#Fonction pour étendre une référence en colonnes par zone (..._Z5, ..._Z10...) à d'autres zones (zone réelle la plus proche)
+def elargirZones(reference, zones):
+    return _elargir(reference, MOTIF_ZONE, list(zones))
+
+
+#Fonction pour générer une version synthétique d'un fichier de data/ (n lignes, années ou zones éventuellement étendues)
+def generer(nom, n, graine=None, annees=None, zones=None):
+    base = reference(nom)
+    if annees is not None:
+        base = elargirAnnees(base, annees)
+    if zones is not None:
+        base = elargirZones(base, zones)
+    return synthetiser(base, n, graine)
+
+
+#Fonction pour générer n individus (catégorie socioprofessionnelle, sexe) selon le tableau croisé réel, avec d'éventuelles catégories en plus
+def individusSocioprofessionnels(n, graine=None, n_categories=None):
+    generateur = np.random.default_rng(graine)
+    croise = reference("socioprofessionnelle").set_index("Catégorie")
+    categories = list(croise.index)
+    effectifs = croise.to_numpy(dtype=float)
+    if n_categories is not None and n_categories > len(categories):
+        # catégories supplémentaires : profils réels tirés au hasard, poids décroissants (loi de Zipf)
+        supplementaires = n_categories - len(categories)
+        profils = effectifs[generateur.integers(0, len(effectifs), supplementaires)]
+        poids = effectifs.sum() / len(effectifs) / np.arange(2, supplementaires + 2)
+        effectifs = np.vstack([effectifs, profils / profils.sum(axis=1, keepdims=True) * poids[:, None]])
+        categories += [f"Catégorie {i}" for i in range(len(categories) + 1, n_categories + 1)]
+    probabilites = (effectifs / effectifs.sum()).ravel()
+    cellules = generateur.choice(len(probabilites), size=n, p=probabilites)
+    return pd.DataFrame({
+        "Catégorie": np.asarray(categories, dtype=object)[cellules // effectifs.shape[1]],
+        "Sexe": croise.columns.to_numpy(dtype=object)[cellules % effectifs.shape[1]],
+    })
+
+
+#Fonction pour générer un tableau de contingence (lignes x colonnes) de même structure que le tableau croisé réel, à plus grande échelle
+def tableauContingence(n_lignes, n_colonnes, effectif_total, graine=None):
+    generateur = np.random.default_rng(graine)
+    croise = reference("socioprofessionnelle").set_index("Catégorie").to_numpy(dtype=float)
+    # marges réelles répétées (lignes) et effet colonne, avec une interaction de faible rang
+    lignes = np.resize(croise.sum(axis=1), n_lignes) * generateur.lognormal(0, 0.5, n_lignes)
+    colonnes = generateur.lognormal(0, 0.5, n_colonnes)
+    interaction = np.exp(0.3 * np.outer(generateur.normal(size=n_lignes), generateur.normal(size=n_colonnes)))
+    attendus = np.outer(lignes, colonnes) * interaction
+    return generateur.poisson(attendus / attendus.sum() * effectif_total)
+
+
+#Fonction pour écrire un jeu synthétique au format des fichiers de data/ (CSV UTF-8, textes entre guillemets)
+def ecrireCSV(donnees, chemin):
+    os.makedirs(os.path.dirname(os.path.abspath(chemin)), exist_ok=True)
+    donnees.to_csv(chemin, index=False, encoding="utf-8", quoting=2)
+    return chemin
@@ -0,0 +1,268 @@
+# coding:utf8
+
+# Mesure des performances des chemins critiques de chaque session sur des données synthétiques.
+# Pour chaque analyse et chaque taille demandée, les données sont générées (generateurs.py, hors
+# chronométrage), puis le calcul est répété : on garde le temps réel minimal et médian, le temps
+# CPU et, avec --memoire, le pic d'allocation Python (tracemalloc, mesuré sur une exécution à part
+# pour ne pas fausser les temps). Les résultats sont écrits en JSON avec le commit git, les versions
+# des bibliothèques et la machine, pour comparer les exécutions d'un commit à l'autre (--comparer).
+#
+# Utilisation : python src/benchmarks/performances.py [--tailles 1000 10000 ...] [--analyses ...]
+#               [--repetitions 3] [--memoire] [--sortie fichier.json] [--comparer ancien.json]
+
+import os
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+import generateurs
+from generateurs import RACINE
+
+import statistiques  # noqa: E402  (RACINE ajoutée à sys.path par generateurs)
+import flux
+import rangs
+import rang_taille
+import regression
+import contingence
+import afc
+import acp
+import acm
+import classification
+import moindres_carres
+import selection
+
+TAILLES_PAR_DEFAUT = [1000, 10000, 100000]
+REPETITIONS_PAR_DEFAUT = 3
+DOSSIER_RESULTATS = os.path.join(RACINE, "benchmarks", "resultats")
+
+
+# Chaque analyse : session, préparation des données pour une taille n (non chronométrée), calcul chronométré
+def _preparer_elections(n, graine, dossier):
+    return {"contenu": generateurs.generer("elections", n, graine)}
+
+
+def _preparer_elections_csv(n, graine, dossier):
+    chemin = os.path.join(dossier, f"elections-{n}.csv")
+    generateurs.ecrireCSV(generateurs.generer("elections", n, graine), chemin)
+    return {"chemin": chemin}
+
+
+def _preparer_monde(n, graine, dossier):
+    monde = generateurs.generer("monde", n, graine)
+    colonnes = [c for c in monde.columns if c.startswith("Pop ")]
+    return {"monde": monde, "colonnes": colonnes}
+
+
+def _preparer_tailles(n, graine, dossier):
+    monde = generateurs.generer("monde", n, graine)
+    return {"tailles": monde["Pop 2025"].to_numpy(dtype=float)}
+
+
+def _preparer_pib(n, graine, dossier):
+    return {"data": generateurs.generer("pib_energie", n, graine), "annees": list(range(1960, 2023))}
+
+
+def _preparer_individus(n, graine, dossier):
+    return {"individus": generateurs.individusSocioprofessionnels(n, graine, n_categories=max(9, int(np.sqrt(n))))}
+
+
+def _preparer_afc(n, graine, dossier):
+    # tableau de n cases environ : 50 colonnes, n / 50 lignes, effectif total 100 n
+    n_lignes = max(9, n // 50)
+    return {"table": generateurs.tableauContingence(n_lignes, 50, 100 * n, graine)}
+
+
+def _preparer_temperatures(n, graine, dossier):
+    temperatures = generateurs.generer("temperatures_france", n, graine)
+    return {"X": temperatures.drop(columns=["Villes"]).to_numpy(dtype=float)}
+
+
+def _preparer_chiens(n, graine, dossier):
+    return {"variables": generateurs.generer("chiens", n, graine).drop(columns=["Race"])}
+
+
+def _preparer_cah(n, graine, dossier):
+    X = _preparer_temperatures(n, graine, dossier)["X"]
+    axes = acp.CoMoments(X.shape[1])
+    axes.ajouter(X)
+    composantes = acp.axesACP(axes, 2)["composantes"]
+    return {"points": ((X - axes.moyenne) / axes.ecartType()) @ composantes.T}
+
+
+def _preparer_geomarketing(n, graine, dossier):
+    geomarketing = generateurs.generer("geomarketing", n, graine)
+    X = geomarketing.drop(columns=["ca"]).select_dtypes(exclude=["object", "string"])
+    return {"geomarketing": geomarketing, "X": X, "y": geomarketing["ca"]}
+
+
+def _preparer_selection(n, graine, dossier):
+    donnees = _preparer_geomarketing(n, graine, dossier)
+    return {"mco": moindres_carres.MoindresCarres(donnees["X"], donnees["y"])}
+
+
+def _acp(X):
+    comoments = acp.CoMoments(X.shape[1])
+    comoments.ajouter(X)
+    return acp.axesACP(comoments, 12)
+
+
+def _rang_taille(tailles):
+    triees = rang_taille.trierDecroissant(tailles)
+    return rang_taille.ajustementMCO(triees), rang_taille.ajustementMV(triees)
+
+
+ANALYSES = {
+    "statistiques_descriptives": ("session3", _preparer_elections,
+                                  lambda d: statistiques.statistiquesDescriptives(d["contenu"], quantiles=(0.10, 0.25, 0.75, 0.90))),
+    "statistiques_flux": ("session3", _preparer_elections_csv, lambda d: flux.agregerParBlocs(d["chemin"])),
+    "concordance_spearman": ("session6", _preparer_monde,
+                             lambda d: rangs.PanelRangs.depuisDataFrame(d["monde"], "État", d["colonnes"]).matrice("spearman")),
+    "concordance_kendall": ("session6", _preparer_monde,
+                            lambda d: rangs.PanelRangs.depuisDataFrame(d["monde"], "État", d["colonnes"]).matrice("kendall")),
+    "rang_taille": ("session6", _preparer_tailles, lambda d: _rang_taille(d["tailles"])),
+    "regressions_annees": ("session7", _preparer_pib, lambda d: regression.regressionsLot(
+        regression.blocNumerique(d["data"], "Utilisation_d_energie_", d["annees"]),
+        regression.blocNumerique(d["data"], "PIB_", d["annees"]), d["annees"])),
+    "contingence": ("session8", _preparer_individus, lambda d: contingence.analyseContingence(
+        contingence.tableauDepuisEnregistrements(d["individus"]["Catégorie"], d["individus"]["Sexe"])["table"])),
+    "afc": ("session8", _preparer_afc, lambda d: afc.analyseCorrespondances(d["table"], k=2)),
+    "acp": ("session9", _preparer_temperatures, lambda d: _acp(d["X"])),
+    "acm": ("session9", _preparer_chiens, lambda d: acm.analyseCorrespondancesMultiples(d["variables"], k=8)),
+    "cah": ("session9", _preparer_cah, lambda d: classification.cah(
+        d["points"], n_centres=classification.N_CENTRES_PAR_DEFAUT, graine=42)),
+    "mco": ("session10", _preparer_geomarketing, lambda d: moindres_carres.MoindresCarres(d["X"], d["y"]).ajuster()),
+    "mco_par_enseigne": ("session10", _preparer_geomarketing, lambda d: moindres_carres.regressionsParGroupe(
+        d["geomarketing"], "ca", list(d["X"].columns[:10]), "enseigne")),
+    "selection_pas_a_pas": ("session10", _preparer_selection,
+                            lambda d: selection.selectionPasAPas(d["mco"], sens="avant", critere="bic")),
+}
+
+
+#Fonction pour décrire l'environnement de mesure (commit git, versions, machine)
+def environnement():
+    def git(*arguments):
+        try:
+            return subprocess.run(["git", *arguments], cwd=RACINE, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    import scipy
+    import sklearn
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "modifications_locales": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scipy": scipy.__version__,
+        "sklearn": sklearn.__version__,
+        "machine": platform.platform(),
+        "processeur": platform.processor() or platform.machine(),
+        "coeurs": os.cpu_count(),
+    }
+
+
+#Fonction pour chronométrer une analyse à une taille donnée (préparation non comptée)
+def mesurer(nom, n, repetitions=REPETITIONS_PAR_DEFAUT, graine=2024, memoire=False, dossier=None):
+    session, preparer, calculer = ANALYSES[nom]
+    dossier = dossier or tempfile.gettempdir()
+    debut = time.perf_counter()
+    donnees = preparer(n, graine, dossier)
+    preparation = time.perf_counter() - debut
+    temps, cpu = [], []
+    for _ in range(repetitions):
+        debut_reel, debut_cpu = time.perf_counter(), time.process_time()
+        calculer(donnees)
+        temps.append(time.perf_counter() - debut_reel)
+        cpu.append(time.process_time() - debut_cpu)
+    resultat = {
+        "analyse": nom,
+        "session": session,
+        "n": n,
+        "repetitions": repetitions,
+        "preparation": preparation,
+        "temps_min": min(temps),
+        "temps_median": float(np.median(temps)),
+        "cpu_median": float(np.median(cpu)),
+        "temps": temps,
+    }
+    if memoire:
+        tracemalloc.start()
+        calculer(donnees)
+        resultat["pic_tracemalloc"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return resultat
+
+
+#Fonction pour lancer toutes les mesures demandées (une erreur, par ex. mémoire insuffisante, n'arrête pas la série)
+def executer(analyses=None, tailles=TAILLES_PAR_DEFAUT, repetitions=REPETITIONS_PAR_DEFAUT, graine=2024, memoire=False):
+    dossier = tempfile.mkdtemp(prefix="performances-")
+    mesures = []
+    try:
+        for nom in analyses or list(ANALYSES):
+            for n in tailles:
+                try:
+                    mesure = mesurer(nom, n, repetitions, graine, memoire, dossier)
+                except (MemoryError, ValueError, np.linalg.LinAlgError) as erreur:
+                    mesure = {"analyse": nom, "session": ANALYSES[nom][0], "n": n, "erreur": f"{type(erreur).__name__}: {erreur}"}
+                mesures.append(mesure)
+                if "erreur" in mesure:
+                    print(f"{nom:28s} n={n:>10d}  erreur : {mesure['erreur']}")
+                else:
+                    print(f"{nom:28s} n={n:>10d}  min={mesure['temps_min']:.4f} s  médiane={mesure['temps_median']:.4f} s"
+                          + (f"  pic={mesure['pic_tracemalloc'] / 2 ** 20:.1f} Mo" if memoire else ""))
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
+    return {"environnement": environnement(), "graine": graine, "mesures": mesures}
+
+
+#Fonction pour comparer deux fichiers de résultats (rapport des temps minimaux, > 1 : plus lent qu'avant)
+def comparer(ancien, nouveau):
+    anciennes = {(m["analyse"], m["n"]): m for m in ancien["mesures"] if "erreur" not in m}
+    lignes = []
+    for mesure in nouveau["mesures"]:
+        cle = (mesure["analyse"], mesure["n"])
+        if "erreur" in mesure or cle not in anciennes:
+            continue
+        lignes.append({
+            "analyse": mesure["analyse"],
+            "n": mesure["n"],
+            "avant": anciennes[cle]["temps_min"],
+            "apres": mesure["temps_min"],
+            "rapport": mesure["temps_min"] / anciennes[cle]["temps_min"],
+        })
+    return pd.DataFrame(lignes, columns=["analyse", "n", "avant", "apres", "rapport"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure les chemins critiques des sessions sur des données synthétiques.")
+    parser.add_argument("--tailles", type=lambda v: int(float(v)), nargs="+", default=TAILLES_PAR_DEFAUT,
+                        help="nombres de lignes générées (ex. 1e3 1e5 1e7)")
+    parser.add_argument("--analyses", nargs="+", choices=list(ANALYSES), default=None, help="analyses à mesurer (par défaut : toutes)")
+    parser.add_argument("--repetitions", type=int, default=REPETITIONS_PAR_DEFAUT)
+    parser.add_argument("--graine", type=int, default=2024)
+    parser.add_argument("--memoire", action="store_true", help="mesurer aussi le pic d'allocation (exécution supplémentaire)")
+    parser.add_argument("--sortie", default=None, help="fichier JSON de résultats (par défaut : benchmarks/resultats/<date>-<commit>.json)")
+    parser.add_argument("--comparer", default=None, help="fichier JSON d'une exécution précédente à comparer")
+    arguments = parser.parse_args()
+
+    resultats = executer(arguments.analyses, arguments.tailles, arguments.repetitions, arguments.graine, arguments.memoire)
+    sortie = arguments.sortie
+    if sortie is None:
+        commit = (resultats["environnement"]["commit"] or "sans-git")[:10]
+        sortie = os.path.join(DOSSIER_RESULTATS, f"{time.strftime('%Y%m%d-%H%M%S')}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, "w", encoding="utf-8") as fichier:
+        json.dump(resultats, fichier, indent=2, ensure_ascii=False)
+    print("Résultats écrits dans", sortie)
+    if arguments.comparer:
+        with open(arguments.comparer, encoding="utf-8") as fichier:
+            print(comparer(json.load(fichier), resultats).to_string(index=False))
@@ -0,0 +1,321 @@
+# coding:utf8
+
+# Cache persistant des résultats d'ajustement (AFC, ACP, ACM, CAH, moindres carrés).
+# Un résultat est adressé par son contenu : la clé est l'empreinte SHA-256 de la fonction
+# appelée (module, nom, code source du module et des modules du dépôt qu'il importe, pour qu'une
+# modification de l'algorithme invalide le cache), des données d'entrée (octets des tableaux numpy,
+# des matrices creuses, hash pandas des DataFrame) et des paramètres. Les résultats (dictionnaires,
+# listes, tuples, scalaires, tableaux numpy, Series, DataFrame, matrices creuses) sont stockés au
+# format binaire .npz compressé, sans pickle, avec une description JSON (noms, index, types,
+# catégories, valeurs manquantes) qui permet de les reconstruire à l'identique ; un résultat qui ne
+# peut pas l'être (MultiIndex, objets quelconques...) n'est pas mis en cache. La taille totale du
+# dossier est bornée : au-delà, les fichiers les moins récemment utilisés (date de modification,
+# mise à jour à chaque lecture) sont supprimés.
+
+import os
+import sys
+import json
+import hashlib
+import inspect
+import numpy as np
+import pandas as pd
+import scipy.sparse
+
+from chargement import empreinteFichier
+from modules_depot import modulesImportes
+
+TAILLE_MAX_PAR_DEFAUT = 256 * 1024 * 1024
+SEPARATEUR = "|"
+# clé (vide) sous laquelle est rangé le résultat d'une fonction qui ne renvoie pas un dictionnaire
+RESULTAT_UNIQUE = ""
+# entrée portant la version du format : un fichier d'un format antérieur est ignoré (recalcul)
+FORMAT = "__format__"
+VERSION_FORMAT = 2
+_EMPREINTES_SOURCES = {}
+
+
+def _ajouter_empreinte(sha, valeur):
+    if isinstance(valeur, (pd.DataFrame, pd.Series)):
+        sha.update(type(valeur).__name__.encode("utf-8"))
+        noms = valeur.columns if isinstance(valeur, pd.DataFrame) else [valeur.name]
+        sha.update(json.dumps([str(nom) for nom in noms]).encode("utf-8"))
+        sha.update(pd.util.hash_pandas_object(valeur, index=True).to_numpy().tobytes())
+    elif scipy.sparse.issparse(valeur):
+        valeur = scipy.sparse.csr_matrix(valeur)
+        sha.update(f"creuse{valeur.shape}{valeur.dtype}".encode("utf-8"))
+        for partie in (valeur.data, valeur.indices, valeur.indptr):
+            sha.update(np.ascontiguousarray(partie).tobytes())
+    elif isinstance(valeur, np.ndarray):
+        sha.update(f"tableau{valeur.shape}{valeur.dtype}".encode("utf-8"))
+        if valeur.dtype == object:
+            sha.update(json.dumps(valeur.tolist(), default=str).encode("utf-8"))
+        else:
+            sha.update(np.ascontiguousarray(valeur).tobytes())
+    elif isinstance(valeur, (list, tuple)):
+        sha.update(f"liste{len(valeur)}".encode("utf-8"))
+        for element in valeur:
+            _ajouter_empreinte(sha, element)
+    else:
+        sha.update(json.dumps(valeur, sort_keys=True, default=str).encode("utf-8"))
+
+
+def _empreinte_source(source):
+    # code du module et des modules du dépôt qu'il importe (transitivement) : modifier afc.py invalide
+    # aussi les résultats d'acm.py ; calculée une fois par processus et par fichier
+    if source not in _EMPREINTES_SOURCES:
+        dossier, script = os.path.split(source)
+        sha = hashlib.sha256()
+        for fichier in [script] + [module + ".py" for module in modulesImportes(script, dossier)]:
+            sha.update(f"{fichier}\0{empreinteFichier(os.path.join(dossier, fichier))}\0".encode("utf-8"))
+        _EMPREINTES_SOURCES[source] = sha.hexdigest()
+    return _EMPREINTES_SOURCES[source]
+
+
+#Fonction pour calculer la clé d'un appel : fonction (et code de son module et des modules qu'il importe), données et paramètres
+def empreinteAppel(fonction, *arguments, **parametres):
+    sha = hashlib.sha256()
+    sha.update(f"{fonction.__module__}.{fonction.__qualname__}".encode("utf-8"))
+    module = sys.modules.get(fonction.__module__)
+    try:
+        source = inspect.getsourcefile(module) if module is not None else None
+    except TypeError:
+        source = None
+    if source is not None and os.path.exists(source):
+        sha.update(_empreinte_source(os.path.abspath(source)).encode("utf-8"))
+    for argument in arguments:
+        _ajouter_empreinte(sha, argument)
+    for cle in sorted(parametres):
+        sha.update(cle.encode("utf-8"))
+        _ajouter_empreinte(sha, parametres[cle])
+    return sha.hexdigest()
+
+
+def _nom(nom):
+    # noms d'index, de colonnes ou de Series : seuls les scalaires JSON sont conservés à l'identique
+    if nom is None or isinstance(nom, (str, bool, int, float)):
+        return nom
+    raise TypeError(f"Nom non enregistrable dans le cache : {nom!r}")
+
+
+def _manquant(valeur):
+    if valeur is None:
+        return 1
+    if valeur is pd.NA:
+        return 3
+    if isinstance(valeur, float) and np.isnan(valeur):
+        return 2
+    return 0
+
+
+def _decrire_vecteur(valeurs, ajouter):
+    # vecteur (tableau numpy, valeurs d'une colonne ou d'un index) : tableau numpy natif, catégories
+    # (codes + modalités) ou textes (chaînes + marqueurs des valeurs manquantes None / NaN / NA)
+    dtype = valeurs.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        valeurs = pd.Categorical(valeurs)
+        return {"categories": _decrire_index(valeurs.categories, ajouter), "codes": ajouter(valeurs.codes),
+                "ordonne": bool(valeurs.ordered)}
+    if isinstance(dtype, np.dtype) and dtype != object:
+        return {"tableau": ajouter(np.asarray(valeurs))}
+    if dtype == object or isinstance(dtype, pd.StringDtype):
+        objets = np.asarray(valeurs, dtype=object).ravel()
+        manquants = np.array([_manquant(v) for v in objets], dtype=np.int8)
+        textes = [v for v, m in zip(objets, manquants) if not m]
+        if not all(isinstance(v, str) for v in textes):
+            raise TypeError("Tableau d'objets non textuels non enregistrable dans le cache")
+        description = {"texte": ajouter(np.array([v if not m else "" for v, m in zip(objets, manquants)], dtype=str)
+                                        .reshape(np.shape(valeurs))), "dtype": str(dtype)}
+        if manquants.any():
+            description["manquants"] = ajouter(manquants)
+        return description
+    raise TypeError(f"Type de colonne non enregistrable dans le cache : {dtype}")
+
+
+def _decrire_index(index, ajouter):
+    if isinstance(index, pd.MultiIndex):
+        raise TypeError("MultiIndex non enregistrable dans le cache")
+    if isinstance(index, pd.RangeIndex):
+        return {"nom": _nom(index.name), "range": [index.start, index.stop, index.step]}
+    return {"nom": _nom(index.name), "valeurs": _decrire_vecteur(index, ajouter)}
+
+
+def _decrire(valeur, ajouter):
+    if valeur is None:
+        return {"type": "aucun"}
+    if isinstance(valeur, pd.DataFrame):
+        return {"type": "df", "index": _decrire_index(valeur.index, ajouter),
+                "colonnes": _decrire_index(valeur.columns, ajouter),
+                "valeurs": [_decrire_vecteur(valeur.iloc[:, i], ajouter) for i in range(valeur.shape[1])]}
+    if isinstance(valeur, pd.Series):
+        return {"type": "serie", "nom": _nom(valeur.name), "index": _decrire_index(valeur.index, ajouter),
+                "valeurs": _decrire_vecteur(valeur, ajouter)}
+    if scipy.sparse.issparse(valeur):
+        creuse = scipy.sparse.csr_matrix(valeur)
+        return {"type": "creuse", "format": valeur.format, "shape": list(creuse.shape),
+                "parties": [ajouter(creuse.data), ajouter(creuse.indices), ajouter(creuse.indptr)]}
+    if isinstance(valeur, np.ndarray):
+        return {"type": "tableau", "valeurs": _decrire_vecteur(valeur, ajouter)}
+    if isinstance(valeur, np.generic):
+        return {"type": "scalaire_numpy", "valeurs": {"tableau": ajouter(np.asarray(valeur))}}
+    if isinstance(valeur, (bool, int, float, str)):
+        return {"type": "scalaire", "valeur": valeur}
+    if isinstance(valeur, (list, tuple)):
+        return {"type": type(valeur).__name__, "elements": [_decrire(element, ajouter) for element in valeur]}
+    if isinstance(valeur, dict) and all(isinstance(cle, str) for cle in valeur):
+        return {"type": "dict", "cles": list(valeur), "valeurs": [_decrire(v, ajouter) for v in valeur.values()]}
+    raise TypeError(f"Type non enregistrable dans le cache : {type(valeur).__name__}")
+
+
+def _encoder(resultats):
+    tableaux = {FORMAT: np.asarray(VERSION_FORMAT)}
+
+    for cle, valeur in resultats.items():
+        if not isinstance(cle, str) or SEPARATEUR in cle:
+            raise TypeError(f"Clé de résultat non enregistrable dans le cache : {cle!r}")
+        numeros = []
+
+        def ajouter(tableau, cle=cle, numeros=numeros):
+            numeros.append(len(numeros))
+            tableaux[f"{cle}{SEPARATEUR}{numeros[-1]}"] = tableau
+            return numeros[-1]
+
+        description = _decrire(valeur, ajouter)
+        tableaux[f"{cle}{SEPARATEUR}description"] = np.asarray(json.dumps(description))
+    return tableaux
+
+
+def _reconstruire_vecteur(description, tableau):
+    if "categories" in description:
+        return pd.Categorical.from_codes(tableau(description["codes"]),
+                                         categories=_reconstruire_index(description["categories"], tableau),
+                                         ordered=description["ordonne"])
+    if "tableau" in description:
+        return tableau(description["tableau"])
+    textes = tableau(description["texte"])
+    objets = textes.astype(object)
+    if "manquants" in description:
+        manquants = tableau(description["manquants"]).reshape(objets.shape)
+        for code, valeur in ((1, None), (2, np.nan), (3, pd.NA)):
+            objets[manquants == code] = valeur
+    if description["dtype"] != "object":
+        return pd.array(objets.ravel(), dtype=description["dtype"])
+    return objets
+
+
+def _reconstruire_index(description, tableau):
+    if "range" in description:
+        return pd.RangeIndex(*description["range"], name=description["nom"])
+    valeurs = _reconstruire_vecteur(description["valeurs"], tableau)
+    return pd.Index(valeurs, name=description["nom"], dtype=getattr(valeurs, "dtype", None),
+                    tupleize_cols=False)
+
+
+def _reconstruire(description, tableau):
+    genre = description["type"]
+    if genre == "aucun":
+        return None
+    if genre == "df":
+        colonnes = _reconstruire_index(description["colonnes"], tableau)
+        index = _reconstruire_index(description["index"], tableau)
+        valeurs = {i: _reconstruire_vecteur(v, tableau) for i, v in enumerate(description["valeurs"])}
+        return pd.DataFrame(valeurs, index=index).set_axis(colonnes, axis=1)
+    if genre == "serie":
+        valeurs = _reconstruire_vecteur(description["valeurs"], tableau)
+        return pd.Series(valeurs, index=_reconstruire_index(description["index"], tableau), name=description["nom"],
+                         dtype=getattr(valeurs, "dtype", None))
+    if genre == "creuse":
+        data, indices, indptr = (tableau(i) for i in description["parties"])
+        creuse = scipy.sparse.csr_matrix((data, indices, indptr), shape=tuple(description["shape"]))
+        return creuse.asformat(description["format"])
+    if genre == "tableau":
+        return np.asarray(_reconstruire_vecteur(description["valeurs"], tableau))
+    if genre == "scalaire_numpy":
+        return tableau(description["valeurs"]["tableau"])[()]
+    if genre == "scalaire":
+        return description["valeur"]
+    if genre in ("list", "tuple"):
+        elements = [_reconstruire(element, tableau) for element in description["elements"]]
+        return tuple(elements) if genre == "tuple" else elements
+    if genre == "dict":
+        return {cle: _reconstruire(v, tableau) for cle, v in zip(description["cles"], description["valeurs"])}
+    raise ValueError(f"Type inconnu dans le cache : {genre}")
+
+
+def _decoder(tableaux):
+    if FORMAT not in tableaux.files or int(tableaux[FORMAT]) != VERSION_FORMAT:
+        raise ValueError("Format de cache obsolète")
+    resultats = {}
+    for nom in tableaux.files:
+        cle, _, partie = nom.rpartition(SEPARATEUR)
+        if partie != "description":
+            continue
+        description = json.loads(str(tableaux[nom]))
+        resultats[cle] = _reconstruire(description, lambda numero, cle=cle: tableaux[f"{cle}{SEPARATEUR}{numero}"])
+    return resultats
+
+
+#Classe pour mémoriser sur disque les résultats d'ajustement, avec éviction LRU au-delà d'une taille maximale
+class CacheResultats:
+    def __init__(self, dossier, taille_max=TAILLE_MAX_PAR_DEFAUT):
+        self.dossier = dossier
+        self.taille_max = taille_max
+        self.succes = 0
+        self.echecs = 0
+        os.makedirs(dossier, exist_ok=True)
+
+    def _chemin(self, cle):
+        return os.path.join(self.dossier, f"{cle}.npz")
+
+    #Méthode pour lire un résultat (None s'il est absent ou illisible) ; une lecture le rend "récent"
+    def lire(self, cle):
+        chemin = self._chemin(cle)
+        try:
+            with np.load(chemin, allow_pickle=False) as tableaux:
+                resultats = _decoder(tableaux)
+        except (OSError, ValueError, KeyError):
+            return None
+        os.utime(chemin)
+        return resultats
+
+    #Méthode pour écrire un résultat (écriture atomique) puis faire respecter la taille maximale
+    def ecrire(self, cle, resultats):
+        chemin = self._chemin(cle)
+        # nom provisoire propre au processus : des sessions lancées en parallèle (pipeline.py) peuvent écrire la même clé
+        provisoire = f"{chemin}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(provisoire, **_encoder(resultats))
+        os.replace(provisoire, chemin)
+        self.evincer()
+
+    #Méthode pour supprimer les résultats les moins récemment utilisés tant que le dossier dépasse la taille maximale
+    def evincer(self):
+        fichiers = []
+        for entree in os.scandir(self.dossier):
+            if entree.is_file() and entree.name.endswith(".npz") and not entree.name.endswith(".tmp.npz"):
+                statut = entree.stat()
+                fichiers.append((statut.st_mtime, statut.st_size, entree.path))
+        total = sum(taille for _, taille, _ in fichiers)
+        for _, taille, chemin in sorted(fichiers):
+            if total <= self.taille_max:
+                break
+            try:
+                os.remove(chemin)
+            except FileNotFoundError:
+                # déjà évincé par un autre processus
+                pass
+            total -= taille
+
+    #Méthode pour appeler une fonction en réutilisant son résultat si l'appel est déjà connu
+    def memoiser(self, fonction, *arguments, **parametres):
+        cle = empreinteAppel(fonction, *arguments, **parametres)
+        resultats = self.lire(cle)
+        if resultats is None:
+            self.echecs += 1
+            resultats = fonction(*arguments, **parametres)
+            try:
+                self.ecrire(cle, resultats if isinstance(resultats, dict) else {RESULTAT_UNIQUE: resultats})
+            except TypeError:
+                # résultat non reconstructible à l'identique : renvoyé sans être mis en cache
+                pass
+            return resultats
+        self.succes += 1
+        return resultats[RESULTAT_UNIQUE] if RESULTAT_UNIQUE in resultats else resultats
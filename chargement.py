@@ -0,0 +1,154 @@
+# coding:utf8
+
+# Couche de chargement commune à toutes les sessions.
+# Chaque CSV est lu une seule fois avec pandas, puis ses colonnes typées sont conservées
+# dans un cache binaire colonnaire (Parquet si pyarrow est installé, pickle sinon)
+# placé dans un dossier .cache à côté du fichier source. Le cache est invalidé dès que
+# la date de modification ou l'empreinte SHA-256 du fichier source change. Les fichiers du cache
+# sont écrits sous un nom temporaire unique puis renommés : plusieurs sessions lancées en parallèle
+# sur le même CSV ne peuvent pas publier un cache tronqué (un cache illisible est de toute façon
+# ignoré et reconstruit). L'index du DataFrame (index_col...) est conservé dans le cache ; un cache
+# écrit par une version antérieure du format (VERSION_CACHE) est reconstruit.
+
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    FORMAT_CACHE = "parquet"
+except ImportError:
+    FORMAT_CACHE = "pickle"
+
+OPTIONS_PAR_DEFAUT = {"encoding": "utf-8", "low_memory": False}
+VERSION_CACHE = 2
+
+
+#Fonction pour calculer l'empreinte SHA-256 d'un fichier (lecture par blocs de 1 Mo)
+def empreinteFichier(nom):
+    sha = hashlib.sha256()
+    with open(nom, "rb") as fichier:
+        for bloc in iter(lambda: fichier.read(1 << 20), b""):
+            sha.update(bloc)
+    return sha.hexdigest()
+
+
+#Fonction pour obtenir les chemins du cache (données + métadonnées) associés à un fichier et à des options de lecture
+def cheminsCache(nom, options):
+    dossier = os.path.join(os.path.dirname(os.path.abspath(nom)), ".cache")
+    cle_options = hashlib.sha1(json.dumps(options, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:10]
+    base = os.path.join(dossier, f"{os.path.basename(nom)}.{cle_options}")
+    return base + "." + FORMAT_CACHE, base + ".json"
+
+
+def _lire_meta(chemin_meta):
+    try:
+        with open(chemin_meta, "r", encoding="utf-8") as fichier:
+            return json.load(fichier)
+    except (OSError, ValueError):
+        return None
+
+
+def _temporaire(chemin):
+    # nom unique dans le dossier de destination (os.replace reste atomique), propre à chaque processus
+    descripteur, temporaire = tempfile.mkstemp(prefix=os.path.basename(chemin) + ".", suffix=".tmp",
+                                               dir=os.path.dirname(chemin))
+    os.close(descripteur)
+    return temporaire
+
+
+def _ecrire_meta(chemin_meta, meta):
+    temporaire = _temporaire(chemin_meta)
+    try:
+        with open(temporaire, "w", encoding="utf-8") as fichier:
+            json.dump(meta, fichier, default=str)
+        os.replace(temporaire, chemin_meta)
+    finally:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+
+
+def _lire_cache(chemin, format_cache):
+    if format_cache == "parquet":
+        return pd.read_parquet(chemin)
+    return pd.read_pickle(chemin)
+
+
+def _ecrire_cache(contenu, chemin):
+    temporaire = _temporaire(chemin)
+    try:
+        if FORMAT_CACHE == "parquet":
+            try:
+                # index=None : un RangeIndex est gardé en métadonnées, tout autre index en colonnes
+                contenu.to_parquet(temporaire, index=None)
+                os.replace(temporaire, chemin)
+                return "parquet"
+            except (ValueError, TypeError, ImportError, OSError):
+                # Colonnes non convertibles en Arrow (types mixtes, noms non textuels...) : repli sur pickle
+                pass
+        chemin = os.path.splitext(chemin)[0] + ".pickle"
+        contenu.to_pickle(temporaire)
+        os.replace(temporaire, chemin)
+        return "pickle"
+    finally:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+
+
+#Fonction pour savoir si le cache d'un fichier est encore valide (mtime puis empreinte)
+def cacheValide(nom, meta):
+    if meta is None or meta.get("version") != VERSION_CACHE:
+        return False
+    stat = os.stat(nom)
+    if meta.get("mtime_ns") == stat.st_mtime_ns and meta.get("taille") == stat.st_size:
+        return True
+    if meta.get("taille") != stat.st_size:
+        return False
+    # Date modifiée (copie, checkout git...) : on ne reparse que si le contenu a réellement changé
+    return meta.get("empreinte") == empreinteFichier(nom)
+
+
+#Fonction pour ouvrir les fichiers (CSV parsé une seule fois puis relu depuis le cache binaire)
+def ouvrirUnFichier(nom, cache=True, **options):
+    options = {**OPTIONS_PAR_DEFAUT, **options}
+    if not cache:
+        return pd.read_csv(nom, **options)
+
+    chemin_cache, chemin_meta = cheminsCache(nom, options)
+    meta = _lire_meta(chemin_meta)
+    if cacheValide(nom, meta):
+        chemin_donnees = os.path.splitext(chemin_cache)[0] + "." + meta["format"]
+        if os.path.exists(chemin_donnees):
+            stat = os.stat(nom)
+            try:
+                contenu = _lire_cache(chemin_donnees, meta["format"])
+            except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+                # cache illisible (écriture interrompue...) : le CSV est relu et le cache reconstruit
+                contenu = None
+            if contenu is not None:
+                if meta["mtime_ns"] != stat.st_mtime_ns:
+                    meta["mtime_ns"] = stat.st_mtime_ns
+                    _ecrire_meta(chemin_meta, meta)
+                return contenu
+
+    contenu = pd.read_csv(nom, **options)
+    try:
+        os.makedirs(os.path.dirname(chemin_cache), exist_ok=True)
+        stat = os.stat(nom)
+        format_ecrit = _ecrire_cache(contenu, chemin_cache)
+        _ecrire_meta(chemin_meta, {
+            "version": VERSION_CACHE,
+            "source": os.path.basename(nom),
+            "mtime_ns": stat.st_mtime_ns,
+            "taille": stat.st_size,
+            "empreinte": empreinteFichier(nom),
+            "format": format_ecrit,
+            "options": options,
+        })
+    except OSError:
+        # Dossier data en lecture seule : on travaille sans cache
+        pass
+    return contenu
@@ -0,0 +1,129 @@
+# coding:utf8
+
+# Classification ascendante hiérarchique (CAH, critère de Ward) pour de grands effectifs.
+# Ward est calculé par la méthode de la chaîne des plus proches voisins : seuls les centres et
+# les poids des classes actives sont gardés en mémoire (O(n)), les distances étant recalculées
+# à la demande depuis le dernier élément de la chaîne. Pour de très grands n, une classification
+# mixte est proposée : k-means en n_centres classes, puis Ward pondéré sur les centres.
+# L'arbre est rendu au format de scipy.cluster.hierarchy.linkage (fusions triées par hauteur,
+# classes renumérotées), ce qui permet d'utiliser fcluster et dendrogram ; le dendrogramme est
+# tronqué aux p dernières fusions.
+
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import fcluster, dendrogram
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+N_CENTRES_PAR_DEFAUT = 1000
+FEUILLES_DENDROGRAMME = 30
+
+
+def _format_scipy(fusions, n):
+    # fusions (représentant a, représentant b, hauteur, effectif) -> tri par hauteur et renumérotation (union-find)
+    fusions = sorted(fusions, key=lambda fusion: fusion[2])
+    parent = np.arange(n)
+    classe = np.arange(n)
+
+    def racine(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    Z = np.empty((len(fusions), 4))
+    for k, (a, b, hauteur, effectif) in enumerate(fusions):
+        ra, rb = racine(a), racine(b)
+        ca, cb = sorted((classe[ra], classe[rb]))
+        Z[k] = (ca, cb, hauteur, effectif)
+        parent[rb] = ra
+        classe[ra] = n + k
+    return Z
+
+
+#Fonction pour calculer la CAH de Ward de points (éventuellement pondérés) par la chaîne des plus proches voisins
+def wardChaine(points, poids=None):
+    centres = np.array(points, dtype=float)
+    n = len(centres)
+    poids = np.ones(n) if poids is None else np.asarray(poids, dtype=float).copy()
+    # effectifs = nombre de feuilles de chaque classe (colonne 4 du format scipy), poids = masse de Ward
+    effectifs = np.ones(n, dtype=np.int64)
+    actifs = np.ones(n, dtype=bool)
+    fusions = []
+    chaine = []
+    while len(fusions) < n - 1:
+        if not chaine:
+            chaine.append(int(np.flatnonzero(actifs)[0]))
+        a = chaine[-1]
+        ecarts = centres - centres[a]
+        distances = 2 * poids[a] * poids / (poids[a] + poids) * np.einsum("ij,ij->i", ecarts, ecarts)
+        distances[~actifs] = np.inf
+        distances[a] = np.inf
+        b = int(np.argmin(distances))
+        # à distance égale, on revient à l'élément précédent de la chaîne (fusion réciproque)
+        if len(chaine) > 1 and distances[chaine[-2]] <= distances[b]:
+            b = chaine[-2]
+        if len(chaine) > 1 and b == chaine[-2]:
+            chaine.pop()
+            chaine.pop()
+            total = poids[a] + poids[b]
+            fusions.append((a, b, float(np.sqrt(distances[b])), int(effectifs[a] + effectifs[b])))
+            centres[a] = (poids[a] * centres[a] + poids[b] * centres[b]) / total
+            poids[a] = total
+            effectifs[a] += effectifs[b]
+            actifs[b] = False
+        else:
+            chaine.append(b)
+    return _format_scipy(fusions, n)
+
+
+#Fonction pour réaliser la CAH de Ward, directe ou mixte (k-means en n_centres classes puis Ward pondéré des centres)
+def cah(points, n_centres=None, graine=None):
+    points = np.asarray(points, dtype=float)
+    if n_centres is None or len(points) <= n_centres:
+        return {"linkage": wardChaine(points), "affectation": np.arange(len(points)), "centres": points}
+    from sklearn.cluster import KMeans
+    kmeans = KMeans(n_clusters=n_centres, n_init=1, random_state=graine).fit(points)
+    effectifs = np.bincount(kmeans.labels_, minlength=n_centres)
+    return {
+        "linkage": wardChaine(kmeans.cluster_centers_, poids=effectifs),
+        "affectation": kmeans.labels_,
+        "centres": kmeans.cluster_centers_,
+    }
+
+
+#Fonction pour couper l'arbre en k classes et obtenir la classe (1..k) de chaque point
+def couperArbre(resultats, k):
+    return fcluster(resultats["linkage"], k, criterion="maxclust")[resultats["affectation"]]
+
+
+#Fonction pour décrire les classes : effectif, part, moyennes des variables et inertie intra-classe
+def decrireClasses(donnees, classes):
+    donnees = pd.DataFrame(donnees)
+    groupes = donnees.groupby(np.asarray(classes))
+    moyennes = groupes.mean()
+    centre = donnees.to_numpy() - moyennes.loc[np.asarray(classes)].to_numpy()
+    inertie = pd.Series((centre ** 2).sum(axis=1)).groupby(np.asarray(classes)).sum()
+    description = pd.DataFrame({
+        "effectif": groupes.size(),
+        "part": groupes.size() / len(donnees),
+        "inertie_intra": inertie,
+    })
+    description.index.name = "classe"
+    return description.join(moyennes)
+
+
+#Fonction pour dessiner le dendrogramme, tronqué aux p dernières fusions quand il y a plus de p feuilles
+def dessinerDendrogramme(resultats, chemin, etiquettes=None, p=FEUILLES_DENDROGRAMME, titre="CAH (Ward)"):
+    Z = resultats["linkage"]
+    figure = Figure(figsize=(10, 5))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    if len(Z) + 1 > p:
+        dendrogram(Z, truncate_mode="lastp", p=p, show_contracted=True, leaf_rotation=90, ax=axes)
+    else:
+        etiquettes = None if etiquettes is None or len(etiquettes) != len(Z) + 1 else list(etiquettes)
+        dendrogram(Z, labels=etiquettes, leaf_rotation=90, ax=axes)
+    axes.set_title(titre)
+    figure.tight_layout()
+    figure.savefig(chemin, dpi=150)
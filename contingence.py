@@ -0,0 +1,157 @@
+# coding:utf8
+
+# Tableaux de contingence creux.
+# Les tableaux sont construits directement à partir des enregistrements bruts (une modalité par
+# individu et par variable) : les modalités sont codées en entiers avec pd.factorize, puis les
+# effectifs sont cumulés dans une matrice scipy.sparse (COO -> CSR, les doublons étant sommés).
+# Plusieurs variables peuvent être croisées en lignes (ex. PCS x département) : seules les
+# combinaisons observées deviennent des lignes ; elles sont données par un DataFrame, une liste de
+# Series ou, avec donnees=, des noms de colonnes (une liste de valeurs isolées, ambiguë, est refusée).
+# Marges, chi2, phi2 et V de Cramér sont obtenus par des réductions sur les seules cellules non
+# vides : chi2 = n (somme o² / (r c)) - n. Comme
+# scipy.stats.chi2_contingency, la correction de continuité de Yates est appliquée au chi2 (et à
+# sa p-value) lorsqu'il n'y a qu'un degré de liberté ; phi2 et V de Cramér restent non corrigés.
+# Effectifs attendus et résidus standardisés (denses par nature) ne sont calculés qu'à la demande.
+
+import numpy as np
+import pandas as pd
+import scipy.sparse
+import scipy.stats
+
+
+#Fonction pour coder en entiers une ou plusieurs variables qualitatives (combinaisons observées seulement)
+def codesModalites(*variables):
+    codes, modalites = pd.factorize(pd.Series(variables[0]), sort=True)
+    if len(variables) == 1:
+        return codes, pd.Index(modalites)
+    codes_variables = [codes]
+    modalites_variables = [modalites]
+    for variable in variables[1:]:
+        codes, modalites = pd.factorize(pd.Series(variable), sort=True)
+        codes_variables.append(codes)
+        modalites_variables.append(modalites)
+    # une modalité manquante (code -1) dans une variable exclut l'individu du croisement
+    manquant = np.any([c < 0 for c in codes_variables], axis=0)
+    cles = np.ravel_multi_index([np.where(manquant, 0, c) for c in codes_variables],
+                                [len(m) for m in modalites_variables])
+    cles = np.where(manquant, -1, cles)
+    uniques, codes = np.unique(cles[~manquant], return_inverse=True)
+    codes_complets = np.full(len(cles), -1, dtype=np.int64)
+    codes_complets[~manquant] = codes
+    combinaisons = np.unravel_index(uniques, [len(m) for m in modalites_variables])
+    index = pd.MultiIndex.from_arrays([m[c] for m, c in zip(modalites_variables, combinaisons)])
+    return codes_complets, index
+
+
+def _variables(lignes):
+    # plusieurs variables : DataFrame (une par colonne) ou liste de Series / tableaux ; une liste de valeurs
+    # isolées serait lue comme une liste de variables d'un seul individu chacune : elle est refusée
+    if isinstance(lignes, pd.DataFrame):
+        return [lignes[c] for c in lignes.columns]
+    if isinstance(lignes, (list, tuple)):
+        if not lignes or not all(isinstance(v, (pd.Series, np.ndarray, pd.Index)) and np.ndim(v) == 1 for v in lignes):
+            raise TypeError("Variables ambiguës : passer une Series ou un tableau pour une variable, un DataFrame ou une "
+                            "liste de Series pour plusieurs, ou des noms de colonnes avec donnees=")
+        return list(lignes)
+    return [lignes]
+
+
+#Fonction pour construire un tableau de contingence creux à partir des enregistrements bruts
+#(lignes : une ou plusieurs variables, ou un ou plusieurs noms de colonnes de donnees)
+def tableauDepuisEnregistrements(lignes, colonnes, poids=None, donnees=None):
+    if donnees is not None:
+        noms = [lignes] if isinstance(lignes, str) else lignes
+        if (not isinstance(noms, (list, tuple)) or not noms or not all(isinstance(nom, str) for nom in noms)
+                or not isinstance(colonnes, str)):
+            raise TypeError("Avec donnees=, lignes et colonnes sont des noms de colonnes (str ou liste de str)")
+        lignes, colonnes = [donnees[nom] for nom in noms], donnees[colonnes]
+        poids = donnees[poids] if isinstance(poids, str) else poids
+    codes_lignes, modalites_lignes = codesModalites(*_variables(lignes))
+    codes_colonnes, modalites_colonnes = codesModalites(colonnes)
+    garder = (codes_lignes >= 0) & (codes_colonnes >= 0)
+    poids = np.ones(len(codes_lignes), dtype=np.int64) if poids is None else np.asarray(poids)
+    table = scipy.sparse.coo_matrix(
+        (poids[garder], (codes_lignes[garder], codes_colonnes[garder])),
+        shape=(len(modalites_lignes), len(modalites_colonnes)),
+    ).tocsr()
+    table.sum_duplicates()
+    return {"table": table, "lignes": modalites_lignes, "colonnes": modalites_colonnes}
+
+
+#Fonction pour construire un tableau de contingence creux à partir d'un tableau déjà croisé (DataFrame)
+def tableauDepuisCroise(tableau):
+    return {"table": scipy.sparse.csr_matrix(tableau.to_numpy()), "lignes": tableau.index, "colonnes": tableau.columns}
+
+
+#Fonction pour obtenir les marges (sommes des lignes, sommes des colonnes) et l'effectif total
+def marges(table):
+    if scipy.sparse.issparse(table):
+        lignes = np.asarray(table.sum(axis=1)).ravel()
+        colonnes = np.asarray(table.sum(axis=0)).ravel()
+    else:
+        table = np.asarray(table)
+        lignes = table.sum(axis=1)
+        colonnes = table.sum(axis=0)
+    return lignes, colonnes, lignes.sum()
+
+
+#Fonction pour calculer les effectifs attendus sous indépendance (tableau dense)
+def effectifsAttendus(table):
+    lignes, colonnes, n = marges(table)
+    return np.outer(lignes, colonnes) / n
+
+
+def _chi2_yates(table, lignes, colonnes, n):
+    # un seul degré de liberté : tableau 2 x 2 une fois les lignes et colonnes vides écartées
+    observes = table.toarray()[np.ix_(lignes > 0, colonnes > 0)]
+    attendus = np.outer(lignes[lignes > 0], colonnes[colonnes > 0]) / n
+    ecarts = observes - attendus
+    ecarts = np.sign(ecarts) * np.maximum(np.abs(ecarts) - 0.5, 0.0)
+    return float(np.sum(ecarts * ecarts / attendus))
+
+
+#Fonction pour calculer chi2, ddl, p-value, phi2 et V de Cramér sans densifier le tableau (correction de Yates si ddl = 1)
+def chi2Independance(table, correction=True):
+    table = scipy.sparse.coo_matrix(table)
+    lignes, colonnes, n = marges(table)
+    observes = table.data.astype(float)
+    somme = np.sum(observes * observes / (lignes[table.row].astype(float) * colonnes[table.col]))
+    chi2 = max(0.0, float(n * somme - n))
+    # lignes / colonnes vides ignorées dans les degrés de liberté
+    r = int(np.count_nonzero(lignes))
+    c = int(np.count_nonzero(colonnes))
+    ddl = (r - 1) * (c - 1)
+    phi2 = chi2 / n
+    if correction and ddl == 1:
+        chi2 = _chi2_yates(table.tocsr(), lignes, colonnes, n)
+    return {
+        "chi2": chi2,
+        "ddl": ddl,
+        "pvalue": float(scipy.stats.chi2.sf(chi2, ddl)) if ddl > 0 else np.nan,
+        "phi2": phi2,
+        "v_cramer": float(np.sqrt(phi2 / min(r - 1, c - 1))) if min(r, c) > 1 else np.nan,
+        "n": n,
+    }
+
+
+#Fonction pour calculer les résidus standardisés (o - e) / racine(e) et ajustés (dénominateur corrigé des marges)
+def residusStandardises(table):
+    lignes, colonnes, n = marges(table)
+    attendus = np.outer(lignes, colonnes) / n
+    observes = table.toarray() if scipy.sparse.issparse(table) else np.asarray(table)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        standardises = (observes - attendus) / np.sqrt(attendus)
+        ajustes = (observes - attendus) / np.sqrt(
+            attendus * np.outer(1 - lignes / n, 1 - colonnes / n)
+        )
+    return standardises, ajustes
+
+
+#Fonction pour réunir les résultats de l'analyse d'un tableau de contingence (residus=False pour rester en creux)
+def analyseContingence(table, residus=True, correction=True):
+    lignes, colonnes, n = marges(table)
+    resultats = {"marges_lignes": lignes, "marges_colonnes": colonnes, **chi2Independance(table, correction)}
+    if residus:
+        resultats["attendus"] = np.outer(lignes, colonnes) / n
+        resultats["residus_standardises"], resultats["residus_ajustes"] = residusStandardises(table)
+    return resultats
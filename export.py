@@ -0,0 +1,149 @@
+# coding:utf8
+
+# Export des tableaux et textes produits par une session, écrits en arrière-plan.
+# Les tableaux sont confiés à un objet Export au fur et à mesure du calcul : chaque écriture est
+# placée dans la file d'un fil d'exécution unique (ThreadPoolExecutor à un fil), ce qui laisse le
+# calcul continuer et garantit l'ordre des écritures. Formats :
+#  - CSV (mêmes options que DataFrame.to_csv) ;
+#  - Parquet (colonnaire) si pyarrow est installé ;
+#  - Excel : un seul classeur par exécution, une feuille par tableau, écrit par openpyxl en mode
+#    write-only (lignes envoyées en flux, sans garder les cellules en mémoire), au lieu d'un classeur
+#    complet ouvert par to_excel pour chaque tableau.
+# fermer() (ou la sortie du bloc with) attend la fin des écritures, enregistre le classeur et
+# relance la première erreur d'écriture rencontrée.
+
+import os
+import re
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_DISPONIBLE = True
+except ImportError:
+    PARQUET_DISPONIBLE = False
+
+FORMATS = ("csv", "parquet")
+LONGUEUR_NOM_FEUILLE = 31
+
+
+def _nom_feuille(nom, existants):
+    # noms de feuilles Excel : 31 caractères au plus, sans []:*?/\ , uniques dans le classeur
+    base = re.sub(r"[\[\]:*?/\\]", "_", nom)[:LONGUEUR_NOM_FEUILLE] or "Feuille"
+    candidat, numero = base, 1
+    while candidat.lower() in existants:
+        numero += 1
+        suffixe = f"_{numero}"
+        candidat = base[:LONGUEUR_NOM_FEUILLE - len(suffixe)] + suffixe
+    existants.add(candidat.lower())
+    return candidat
+
+
+def _cellule(valeur):
+    # valeurs manquantes laissées vides (comme to_excel), types numpy convertis en types Python
+    if valeur is None or (not isinstance(valeur, str) and pd.isna(valeur)):
+        return None
+    if isinstance(valeur, np.generic):
+        return valeur.item()
+    return valeur
+
+
+#Fonction pour produire les lignes d'un tableau (en-tête compris) à écrire dans une feuille Excel
+def lignesTableau(tableau, index=True):
+    tableau = tableau.to_frame() if isinstance(tableau, pd.Series) else tableau
+    noms_index = [nom if nom is not None else "" for nom in tableau.index.names] if index else []
+    yield noms_index + [str(colonne) for colonne in tableau.columns]
+    valeurs_index = tableau.index.tolist() if index else [()] * len(tableau)
+    for cle, ligne in zip(valeurs_index, tableau.itertuples(index=False, name=None)):
+        cle = list(cle) if isinstance(cle, tuple) else [cle]
+        yield [_cellule(v) for v in (cle if index else [])] + [_cellule(v) for v in ligne]
+
+
+#Classe pour collecter les tableaux d'une exécution et les écrire en arrière-plan (CSV, Parquet, classeur Excel unique)
+class Export:
+    def __init__(self, dossier, formats=("csv",), classeur=None):
+        inconnus = set(formats) - set(FORMATS)
+        if inconnus:
+            raise ValueError(f"Formats inconnus : {sorted(inconnus)}")
+        if "parquet" in formats and not PARQUET_DISPONIBLE:
+            warnings.warn("pyarrow n'est pas installé : export Parquet ignoré")
+            formats = tuple(f for f in formats if f != "parquet")
+        self.dossier = str(dossier)
+        self.formats = tuple(formats)
+        self.classeur = None if classeur is None else os.path.join(self.dossier, classeur)
+        self.fichiers = []
+        self._feuilles = set()
+        self._ecritures = []
+        self._executeur = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export")
+        self._workbook = None
+        os.makedirs(self.dossier, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_erreur, erreur, trace):
+        self.fermer(attendre_erreurs=type_erreur is None)
+
+    def _soumettre(self, fonction, *arguments, **options):
+        self._ecritures.append(self._executeur.submit(fonction, *arguments, **options))
+
+    def _chemin(self, nom):
+        chemin = os.path.join(self.dossier, nom)
+        self.fichiers.append(chemin)
+        return chemin
+
+    #Méthode pour ajouter un tableau (DataFrame ou Series) ; il ne doit plus être modifié ensuite
+    def ajouter(self, nom, tableau, excel=True, **options_csv):
+        if "csv" in self.formats:
+            self._soumettre(tableau.to_csv, self._chemin(f"{nom}.csv"), **options_csv)
+        if "parquet" in self.formats:
+            self._soumettre(self._ecrire_parquet, tableau, self._chemin(f"{nom}.parquet"), options_csv.get("index", True))
+        if excel and self.classeur is not None:
+            feuille = _nom_feuille(nom, self._feuilles)
+            self._soumettre(self._ecrire_feuille, feuille, tableau, options_csv.get("index", True))
+
+    #Méthode pour ajouter un texte (résumé de modèle...) écrit tel quel dans un fichier
+    def ajouterTexte(self, nom_fichier, texte):
+        self._soumettre(self._ecrire_texte, self._chemin(nom_fichier), str(texte))
+
+    @staticmethod
+    def _ecrire_texte(chemin, texte):
+        with open(chemin, "w", encoding="utf-8") as fichier:
+            fichier.write(texte)
+
+    @staticmethod
+    def _ecrire_parquet(tableau, chemin, index):
+        tableau = tableau.to_frame() if isinstance(tableau, pd.Series) else tableau
+        tableau = tableau.rename(columns=str)
+        tableau.to_parquet(chemin, index=index)
+
+    def _ecrire_feuille(self, feuille, tableau, index):
+        # exécuté dans le fil d'écriture : le classeur write-only n'est manipulé que par ce fil
+        if self._workbook is None:
+            from openpyxl import Workbook
+            self._workbook = Workbook(write_only=True)
+        onglet = self._workbook.create_sheet(feuille)
+        for ligne in lignesTableau(tableau, index=index):
+            onglet.append(ligne)
+
+    def _enregistrer_classeur(self):
+        if self._workbook is not None:
+            provisoire = self.classeur + ".tmp"
+            self._workbook.save(provisoire)
+            os.replace(provisoire, self.classeur)
+            self.fichiers.append(self.classeur)
+
+    #Méthode pour attendre la fin des écritures, enregistrer le classeur et signaler la première erreur
+    def fermer(self, attendre_erreurs=True):
+        if self._executeur is None:
+            return self.fichiers
+        if self.classeur is not None:
+            self._soumettre(self._enregistrer_classeur)
+        self._executeur.shutdown(wait=True)
+        self._executeur = None
+        erreurs = [ecriture.exception() for ecriture in self._ecritures if ecriture.exception() is not None]
+        if erreurs and attendre_erreurs:
+            raise erreurs[0]
+        return self.fichiers
@@ -0,0 +1,251 @@
+# coding:utf8
+
+# Agrégation en flux (lecture par blocs) des colonnes quantitatives d'un CSV.
+# Le fichier n'est jamais chargé en entier : chaque bloc met à jour des accumulateurs
+# de taille bornée, tous fusionnables (deux agrégations partielles peuvent être
+# combinées, par exemple une par fichier ou par processus) :
+#   - sommes, effectifs, minimum et maximum ;
+#   - moyenne et variance par l'algorithme de Welford (fusion de Chan et al.) ;
+#   - quantiles par une esquisse KLL (exacte tant que l'effectif reste sous sa capacité) ;
+#   - mode par des compteurs de capacité bornée (exact tant que le nombre de valeurs distinctes
+#     reste sous sa capacité ; au-delà, seules les valeurs les plus fréquentes sont conservées
+#     et le mode est approché, signalé par "mode_exact").
+# Le résultat a la même forme que statistiques.statistiquesDescriptives, ce qui permet de
+# produire les mêmes tableaux stats_colonnes et distances_colonnes.
+
+import numpy as np
+import pandas as pd
+
+from statistiques import QUANTILES_PAR_DEFAUT
+
+TAILLE_BLOC_PAR_DEFAUT = 50000
+
+
+#Classe pour accumuler effectif, somme, extrêmes, moyenne et variance (Welford / Chan)
+class Moments:
+    def __init__(self, entier=True):
+        self.entier = entier
+        self.n = 0
+        self.somme = 0
+        self.moyenne = 0.0
+        self.m2 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    def ajouter(self, valeurs):
+        valeurs = valeurs[~np.isnan(valeurs)]
+        if len(valeurs) == 0:
+            return
+        bloc = Moments(self.entier)
+        bloc.n = len(valeurs)
+        bloc.somme = int(valeurs.astype(np.int64).sum()) if self.entier else float(valeurs.sum())
+        bloc.moyenne = float(valeurs.mean())
+        bloc.m2 = float(((valeurs - bloc.moyenne) ** 2).sum())
+        bloc.minimum = float(valeurs.min())
+        bloc.maximum = float(valeurs.max())
+        self.fusionner(bloc)
+
+    def fusionner(self, autre):
+        if autre.n == 0:
+            return self
+        n = self.n + autre.n
+        delta = autre.moyenne - self.moyenne
+        self.moyenne += delta * autre.n / n
+        self.m2 += autre.m2 + delta ** 2 * self.n * autre.n / n
+        self.n = n
+        self.entier = self.entier and autre.entier
+        self.somme = self.somme + autre.somme if self.entier else float(self.somme) + float(autre.somme)
+        self.minimum = min(self.minimum, autre.minimum)
+        self.maximum = max(self.maximum, autre.maximum)
+        return self
+
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else np.nan
+
+
+#Classe pour estimer des quantiles en mémoire bornée (esquisse KLL, compacteurs de capacité décroissante)
+class EsquisseKLL:
+    def __init__(self, k=200, graine=0):
+        self.k = k
+        self.rng = np.random.default_rng(graine)
+        self.niveaux = [np.empty(0)]
+        self.n = 0
+
+    def _capacite(self, niveau):
+        profondeur = len(self.niveaux) - niveau - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** profondeur)))
+
+    def _compacter(self):
+        niveau = 0
+        while niveau < len(self.niveaux):
+            if len(self.niveaux[niveau]) > self._capacite(niveau):
+                if niveau + 1 == len(self.niveaux):
+                    self.niveaux.append(np.empty(0))
+                tries = np.sort(self.niveaux[niveau])
+                # un élément impair reste au niveau courant, les autres sont décimés d'un sur deux
+                reste = tries[:1] if len(tries) % 2 else tries[:0]
+                tries = tries[len(reste):]
+                gardes = tries[self.rng.integers(2)::2]
+                self.niveaux[niveau] = reste
+                self.niveaux[niveau + 1] = np.concatenate([self.niveaux[niveau + 1], gardes])
+            niveau += 1
+
+    def ajouter(self, valeurs):
+        valeurs = valeurs[~np.isnan(valeurs)]
+        self.n += len(valeurs)
+        self.niveaux[0] = np.concatenate([self.niveaux[0], valeurs])
+        self._compacter()
+
+    def fusionner(self, autre):
+        while len(self.niveaux) < len(autre.niveaux):
+            self.niveaux.append(np.empty(0))
+        for niveau, valeurs in enumerate(autre.niveaux):
+            self.niveaux[niveau] = np.concatenate([self.niveaux[niveau], valeurs])
+        self.n += autre.n
+        self._compacter()
+        return self
+
+    def exacte(self):
+        return len(self.niveaux) == 1
+
+    def quantile(self, p):
+        if self.n == 0:
+            return np.nan
+        if self.exacte():
+            # aucune compaction : interpolation linéaire identique à pandas
+            return float(np.quantile(self.niveaux[0], p))
+        valeurs = np.concatenate(self.niveaux)
+        poids = np.concatenate([np.full(len(v), 2.0 ** h) for h, v in enumerate(self.niveaux)])
+        ordre = np.argsort(valeurs, kind="stable")
+        cumul = np.cumsum(poids[ordre])
+        rang = p * (cumul[-1] - 1)
+        return float(valeurs[ordre][np.searchsorted(cumul - 1, rang, side="left").clip(0, len(valeurs) - 1)])
+
+
+#Classe pour suivre les valeurs les plus fréquentes (capacité bornée, compteurs les plus élevés conservés)
+class FrequencesBornees:
+    def __init__(self, capacite=1000):
+        self.capacite = capacite
+        self.compteurs = {}
+        self.exact = True
+
+    def _elaguer(self):
+        if len(self.compteurs) <= self.capacite:
+            return
+        self.exact = False
+        # on garde les capacite compteurs les plus élevés (plus petite valeur en cas d'égalité, comme mode()) :
+        # le dictionnaire n'est jamais vidé, même si toutes les valeurs n'apparaissent qu'une fois, et les
+        # compteurs conservés restent des minorants des effectifs réels
+        gardes = sorted(self.compteurs.items(), key=lambda vc: (-vc[1], vc[0]))[:self.capacite]
+        self.compteurs = dict(gardes)
+
+    def ajouter(self, valeurs):
+        valeurs, comptes = np.unique(valeurs[~np.isnan(valeurs)], return_counts=True)
+        for valeur, compte in zip(valeurs.tolist(), comptes.tolist()):
+            self.compteurs[valeur] = self.compteurs.get(valeur, 0) + compte
+        self._elaguer()
+
+    def fusionner(self, autre):
+        for valeur, compte in autre.compteurs.items():
+            self.compteurs[valeur] = self.compteurs.get(valeur, 0) + compte
+        self.exact = self.exact and autre.exact
+        self._elaguer()
+        return self
+
+    def mode(self):
+        if not self.compteurs:
+            return np.nan
+        maximum = max(self.compteurs.values())
+        return min(v for v, c in self.compteurs.items() if c == maximum)
+
+
+#Classe regroupant les accumulateurs d'une colonne quantitative
+class AccumulateurColonne:
+    def __init__(self, entier, k=200, capacite_mode=1000):
+        self.moments = Moments(entier)
+        self.esquisse = EsquisseKLL(k)
+        self.frequences = FrequencesBornees(capacite_mode)
+        self.ecart_absolu = 0.0
+
+    def ajouter(self, valeurs):
+        self.moments.ajouter(valeurs)
+        self.esquisse.ajouter(valeurs)
+        self.frequences.ajouter(valeurs)
+
+    def fusionner(self, autre):
+        self.moments.fusionner(autre.moments)
+        self.esquisse.fusionner(autre.esquisse)
+        self.frequences.fusionner(autre.frequences)
+        self.ecart_absolu += autre.ecart_absolu
+        return self
+
+
+#Fonction pour lire un CSV par blocs de taille bornée
+def lireParBlocs(nom, taille_bloc=TAILLE_BLOC_PAR_DEFAUT, **options):
+    options = {"encoding": "utf-8", **options}
+    return pd.read_csv(nom, chunksize=taille_bloc, **options)
+
+
+#Fonction pour agréger en flux les colonnes quantitatives (int64/float64) d'un CSV
+def agregerParBlocs(nom, taille_bloc=TAILLE_BLOC_PAR_DEFAUT, k=200, capacite_mode=1000, ecart_absolu=True, **options):
+    accumulateurs = {}
+    colonnes = None
+    apercu = None
+    n_lignes = 0
+    for bloc in lireParBlocs(nom, taille_bloc, **options):
+        if colonnes is None:
+            colonnes = list(bloc.columns)
+            apercu = bloc.head()
+            for colonne in colonnes:
+                if bloc[colonne].dtype in ("int64", "float64"):
+                    accumulateurs[colonne] = AccumulateurColonne(bloc[colonne].dtype == "int64", k, capacite_mode)
+        n_lignes += len(bloc)
+        for colonne in list(accumulateurs):
+            serie = bloc[colonne]
+            if serie.dtype not in ("int64", "float64"):
+                # une valeur non numérique (ex. "2A") : la colonne n'est pas quantitative sur le fichier entier
+                del accumulateurs[colonne]
+                continue
+            if serie.dtype != "int64":
+                accumulateurs[colonne].moments.entier = False
+            accumulateurs[colonne].ajouter(serie.to_numpy(dtype=float, na_value=np.nan))
+
+    if ecart_absolu and accumulateurs:
+        # L'écart absolu moyen a besoin de la moyenne finale : seconde lecture, toujours par blocs
+        moyennes = {colonne: a.moments.moyenne for colonne, a in accumulateurs.items()}
+        for bloc in lireParBlocs(nom, taille_bloc, **options):
+            for colonne, accumulateur in accumulateurs.items():
+                valeurs = bloc[colonne].to_numpy(dtype=float, na_value=np.nan)
+                accumulateur.ecart_absolu += float(np.nansum(np.abs(valeurs - moyennes[colonne])))
+
+    return resultatsAccumulateurs(accumulateurs, colonnes or [], n_lignes, apercu)
+
+
+#Fonction pour convertir des accumulateurs (éventuellement fusionnés) en résultats au format de statistiques.py
+def resultatsAccumulateurs(accumulateurs, colonnes, n_lignes, apercu=None, quantiles=QUANTILES_PAR_DEFAUT):
+    quantitatives = list(accumulateurs)
+    probabilites = sorted(set(quantiles) | {0.5})
+    moments = [accumulateurs[c].moments for c in quantitatives]
+    effectifs = np.array([m.n for m in moments])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ecart_absolu = np.array([accumulateurs[c].ecart_absolu for c in quantitatives]) / effectifs
+    return {
+        "colonnes": quantitatives,
+        "dtypes": ["int64" if m.entier else "float64" for m in moments],
+        "effectif": effectifs,
+        "somme": [np.int64(m.somme) if m.entier else np.float64(m.somme) for m in moments],
+        "moyenne": np.array([m.moyenne if m.n else np.nan for m in moments]),
+        "mediane": np.array([accumulateurs[c].esquisse.quantile(0.5) for c in quantitatives]),
+        "mode": np.array([accumulateurs[c].frequences.mode() for c in quantitatives]),
+        "ecart_type": np.sqrt([m.variance() for m in moments]),
+        "ecart_absolu_moyenne": ecart_absolu,
+        "etendue": np.array([m.maximum - m.minimum if m.n else np.nan for m in moments]),
+        "minimum": np.array([m.minimum for m in moments]),
+        "maximum": np.array([m.maximum for m in moments]),
+        "quantiles": {p: np.array([accumulateurs[c].esquisse.quantile(p) for c in quantitatives]) for p in probabilites},
+        "exact": {c: accumulateurs[c].esquisse.exacte() and accumulateurs[c].frequences.exact for c in quantitatives},
+        "mode_exact": {c: accumulateurs[c].frequences.exact for c in quantitatives},
+        "toutes_colonnes": colonnes,
+        "n_lignes": n_lignes,
+        "apercu": apercu,
+    }
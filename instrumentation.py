@@ -0,0 +1,162 @@
+# coding:utf8
+
+# Instrumentation des étapes des scripts de session.
+# etape(nom, **entrees) s'utilise comme gestionnaire de contexte ("with etape(...)") ou comme
+# décorateur ("@etape(...)"). Lorsque la variable d'environnement TRACE_ETAPES est définie, chaque
+# étape enregistre son temps réel, son temps CPU, le pic d'allocation Python (tracemalloc, étapes
+# imbriquées comprises), le pic de mémoire résidente du processus (ru_maxrss) et la taille de ses
+# entrées (forme et octets des tableaux, taille des fichiers). À la fin du script, un fichier JSON
+# et une trace au format Chrome (chrome://tracing, Perfetto) sont écrits dans le dossier indiqué
+# par TRACE_ETAPES (output/traces si TRACE_ETAPES=1). Sans la variable, etape ne mesure rien.
+
+import os
+import sys
+import json
+import time
+import atexit
+import tracemalloc
+import contextlib
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+VARIABLE = "TRACE_ETAPES"
+RACINE = os.path.dirname(os.path.abspath(__file__))
+DOSSIER_PAR_DEFAUT = os.path.join(RACINE, "output", "traces")
+
+_etapes = []
+_pile = []
+_debut = {}
+
+
+def _actif():
+    return bool(os.environ.get(VARIABLE))
+
+
+def _maxrss():
+    if resource is None:
+        return None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    return pic if sys.platform == "darwin" else pic * 1024
+
+
+#Fonction pour décrire la taille d'une entrée (forme et octets d'un tableau, taille d'un fichier, longueur)
+def taille(valeur):
+    if isinstance(valeur, (str, os.PathLike)) and os.path.isfile(valeur):
+        return {"fichier": os.fspath(valeur), "octets": os.path.getsize(valeur)}
+    description = {}
+    if hasattr(valeur, "shape"):
+        description["forme"] = [int(d) for d in valeur.shape]
+    if hasattr(valeur, "memory_usage") and callable(valeur.memory_usage):
+        octets = valeur.memory_usage(index=True)
+        description["octets"] = int(octets.sum() if hasattr(octets, "sum") else octets)
+    elif hasattr(valeur, "nbytes"):
+        description["octets"] = int(valeur.nbytes)
+    elif hasattr(valeur, "data") and hasattr(valeur, "nnz"):
+        # matrice creuse : octets des tableaux de stockage (données et indices)
+        description["octets"] = int(sum(getattr(valeur, partie).nbytes for partie in ("data", "indices", "indptr", "row", "col")
+                                        if hasattr(getattr(valeur, partie, None), "nbytes")))
+    elif isinstance(valeur, (int, float)):
+        description["valeur"] = valeur
+    elif hasattr(valeur, "__len__") and "forme" not in description:
+        description["longueur"] = len(valeur)
+    return description
+
+
+def _demarrer():
+    if _debut:
+        return
+    _debut.update(reel=time.perf_counter(), horodatage=time.time(), script=_nom_execution())
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    atexit.register(ecrireTraces)
+
+
+#Gestionnaire de contexte (et décorateur) pour mesurer une étape : temps, CPU, mémoire, tailles des entrées
+@contextlib.contextmanager
+def etape(nom, **entrees):
+    if not _actif():
+        yield {}
+        return
+    _demarrer()
+    enregistrement = {
+        "nom": nom,
+        "parent": _pile[-1]["nom"] if _pile else None,
+        "profondeur": len(_pile),
+        "entrees": {cle: taille(valeur) for cle, valeur in entrees.items()},
+    }
+    # le pic tracemalloc est remis à zéro pour l'étape ; celui de l'étape englobante est conservé à part
+    if _pile:
+        _pile[-1]["_pic"] = max(_pile[-1]["_pic"], tracemalloc.get_traced_memory()[1])
+    tracemalloc.reset_peak()
+    enregistrement["_pic"] = 0
+    _pile.append(enregistrement)
+    debut_reel, debut_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield enregistrement
+    except BaseException as erreur:
+        enregistrement["erreur"] = type(erreur).__name__
+        raise
+    finally:
+        fin_reel, fin_cpu = time.perf_counter(), time.process_time()
+        _pile.pop()
+        pic = max(enregistrement.pop("_pic"), tracemalloc.get_traced_memory()[1])
+        if _pile:
+            _pile[-1]["_pic"] = max(_pile[-1]["_pic"], pic)
+        enregistrement.update(
+            debut=debut_reel - _debut["reel"],
+            duree=fin_reel - debut_reel,
+            cpu=fin_cpu - debut_cpu,
+            pic_tracemalloc=pic,
+            maxrss=_maxrss(),
+        )
+        _etapes.append(enregistrement)
+
+
+def _nom_execution():
+    # lu au démarrage de la mesure : à la sortie de l'interpréteur, __main__.__file__ n'existe plus
+    script = getattr(sys.modules.get("__main__"), "__file__", None) or (sys.argv[0] if sys.argv and sys.argv[0] else "interactif")
+    return os.path.splitext(os.path.basename(script))[0].replace(" ", "_")
+
+
+#Fonction pour convertir les étapes au format Chrome trace (événements complets "X", temps en microsecondes)
+def traceChrome(etapes):
+    pid = os.getpid()
+    evenements = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": _debut.get("script")}}]
+    for e in etapes:
+        evenements.append({
+            "name": e["nom"],
+            "ph": "X",
+            "pid": pid,
+            "tid": 0,
+            "ts": round(e["debut"] * 1e6, 3),
+            "dur": round(e["duree"] * 1e6, 3),
+            "args": {cle: e[cle] for cle in ("cpu", "pic_tracemalloc", "maxrss", "entrees") if cle in e},
+        })
+    return {"traceEvents": evenements, "displayTimeUnit": "ms"}
+
+
+#Fonction pour écrire le fichier JSON des étapes et la trace Chrome de l'exécution (appelée à la sortie du script)
+def ecrireTraces(dossier=None):
+    if not _etapes:
+        return None
+    dossier = dossier or os.environ.get(VARIABLE)
+    if not dossier or dossier == "1":
+        dossier = DOSSIER_PAR_DEFAUT
+    os.makedirs(dossier, exist_ok=True)
+    base = os.path.join(dossier, f"{_debut['script']}-{time.strftime('%Y%m%d-%H%M%S', time.localtime(_debut['horodatage']))}-{os.getpid()}")
+    etapes = sorted(_etapes, key=lambda e: e["debut"])
+    with open(base + ".json", "w", encoding="utf-8") as fichier:
+        json.dump({
+            "script": _debut["script"],
+            "debut": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(_debut["horodatage"])),
+            "duree_totale": time.perf_counter() - _debut["reel"],
+            "maxrss": _maxrss(),
+            "etapes": etapes,
+        }, fichier, indent=2, ensure_ascii=False, default=str)
+    with open(base + ".trace.json", "w", encoding="utf-8") as fichier:
+        json.dump(traceChrome(etapes), fichier, ensure_ascii=False, default=str)
+    return base
@@ -4,49 +4,17 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import scipy
 import scipy.stats
-import math
-
-#Fonction pour ouvrir les fichiers
-def ouvrirUnFichier(nom):
-    with open(nom, "r", encoding="utf-8") as fichier:
-        contenu = pd.read_csv(fichier, low_memory=False)
-    return contenu
-
-#Fonction pour convertir les données en données logarithmiques
-def conversionLog(liste):
-    log = []
-    for element in liste:
-        log.append(math.log(element))
-    return log
-
-#Fonction pour trier par ordre décroissant les listes (îles et populations)
-def ordreDecroissant(liste):
-    liste.sort(reverse = True)
-    return liste
-
-#Fonction pour obtenir le classement des listes spécifiques aux populations
-def ordrePopulation(pop, etat):
-    ordrepop = []
-    for element in range(0, len(pop)):
-        if np.isnan(pop[element]) == False:
-            ordrepop.append([float(pop[element]), etat[element]])
-    ordrepop = ordreDecroissant(ordrepop)
-    for element in range(0, len(ordrepop)):
-        ordrepop[element] = [element + 1, ordrepop[element][1]]
-    return ordrepop
-
-#Fonction pour obtenir l'ordre défini entre deux classements (listes spécifiques aux populations)
-def classementPays(ordre1, ordre2):
-    classement = []
-    dict1 = {nom: rang for rang, nom in ordre1}
-    dict2 = {nom: rang for rang, nom in ordre2}
-    for nom, rang1 in dict1.items():
-        if nom in dict2:
-            classement.append([rang1, dict2[nom], nom])
-    return classement
+from chargement import ouvrirUnFichier
+import reechantillonnage
+from rangs import PanelRangs
+import rang_taille
+from export import Export
+from instrumentation import etape
+
 
 # Q1-2 - Partie sur les îles (chargement fichier)
-iles = pd.DataFrame(ouvrirUnFichier("./src/data/island-index.csv"))
+with etape("Q1-2 : chargement des îles", fichier="./src/data/island-index.csv"):
+    iles = pd.DataFrame(ouvrirUnFichier("./src/data/island-index.csv"))
 
 # Certaines colonnes contiennent des caractères spéciaux (km²) : on détecte la colonne Surface dynamiquement.
 surface_colonnes = [col for col in iles.columns if "Surface" in col]
@@ -54,15 +22,12 @@ surface_col = surface_colonnes[0]  # Q3 - colonne surface
 
 #Attention ! Il va falloir utiliser des fonctions natives de Python dans les fonctions locales que je vous propose pour faire l'exercice. Vous devez caster l'objet Pandas en list().
 
-surface_iles = list(iles[surface_col].astype(float))
-surface_iles.extend([
-    float(85545323),
-    float(37856841),
-    float(7768030),
-    float(7605049),
-])  # Q3 - ajouts continents
-surface_iles = ordreDecroissant(surface_iles)  # Q4 - tri décroissant
-rangs_iles = list(range(1, len(surface_iles) + 1))
+surface_iles = np.append(
+    iles[surface_col].to_numpy(dtype=float),
+    [85545323.0, 37856841.0, 7768030.0, 7605049.0],
+)  # Q3 - ajouts continents
+surface_iles = rang_taille.trierDecroissant(surface_iles)  # Q4 - tri décroissant (tableau NumPy, trié une seule fois)
+rangs_iles = np.arange(1, len(surface_iles) + 1)
 
 output_dir = os.path.join("src", "output", "img", "session6")
 os.makedirs(output_dir, exist_ok=True)
@@ -78,8 +43,7 @@ plt.savefig(os.path.join(output_dir, "rang_taille_lineaire.png"), dpi=150)
 plt.close()
 
 # Q6 - Visualisation rang-taille (échelle log-log)
-log_rangs_iles = conversionLog(rangs_iles)
-log_surface_iles = conversionLog(surface_iles)
+log_rangs_iles, log_surface_iles = rang_taille.logRangTaille(surface_iles)
 plt.figure(figsize=(8, 5))
 plt.plot(log_rangs_iles, log_surface_iles, "o-", markersize=4)
 plt.xlabel("log(Rang)")
@@ -89,6 +53,15 @@ plt.tight_layout()
 plt.savefig(os.path.join(output_dir, "rang_taille_loglog.png"), dpi=150)
 plt.close()
 
+# Bonus - exposant de la loi rang-taille : moindres carrés sur le log-log et maximum de vraisemblance (xmin de Clauset)
+with etape("Bonus : ajustements rang-taille", surfaces=surface_iles):
+    mco_iles = rang_taille.ajustementMCO(surface_iles)
+    mv_iles = rang_taille.ajustementMV(surface_iles)
+print("Rang-taille MCO log-log: pente={:.4f}, exposant de Zipf={:.4f}, R2={:.4f}".format(
+    mco_iles["pente"], mco_iles["exposant_zipf"], mco_iles["r2"]))
+print("Rang-taille MV Pareto: alpha={:.4f} (+/- {:.4f}), xmin={:.4g}, queue={} iles, KS={:.4f}, exposant de Zipf={:.4f}".format(
+    mv_iles["alpha"], mv_iles["erreur_type"], mv_iles["xmin"], mv_iles["n_queue"], mv_iles["ks"], mv_iles["exposant_zipf"]))
+
 # Q7 - Oui, on peut tester les rangs avec une corrélation de Spearman (scipy.stats.spearmanr).
 
 
@@ -98,7 +71,8 @@ plt.close()
 
 # Q8 - Partie sur les populations des États du monde
 #Source. Depuis 2007, tous les ans jusque 2025, M. Forriez a relevé l'intégralité du nombre d'habitants dans chaque États du monde proposé par un numéro hors-série du monde intitulé États du monde. Vous avez l'évolution de la population et de la densité par année.
-monde = pd.DataFrame(ouvrirUnFichier("./src/data/Le-Monde-HS-Etats-du-monde-2007-2025.csv"))
+with etape("Q8 : chargement des États du monde", fichier="./src/data/Le-Monde-HS-Etats-du-monde-2007-2025.csv"):
+    monde = pd.DataFrame(ouvrirUnFichier("./src/data/Le-Monde-HS-Etats-du-monde-2007-2025.csv"))
 
 #Attention ! Il va falloir utiliser des fonctions natives de Python dans les fonctions locales que je vous propose pour faire l'exercice. Vous devez caster l'objet Pandas en list().
 
@@ -112,32 +86,36 @@ densite_2007 = list(monde_selection["Densité 2007"])
 densite_2025 = list(monde_selection["Densité 2025"])
 
 
-# Q11 - classements décroissants pour population et densité (2007/2025)
-ordre_pop_2007 = ordrePopulation(pop_2007, etat)
-ordre_pop_2025 = ordrePopulation(pop_2025, etat)
-ordre_dens_2007 = ordrePopulation(densite_2007, etat)
-ordre_dens_2025 = ordrePopulation(densite_2025, etat)
-
+# Q11 - classements décroissants pour population et densité (toutes les années d'un coup, 2007/2025 ci-dessous)
+colonnes_pop = [c for c in monde.columns if c.startswith("Pop ")]
+colonnes_dens = [c for c in monde.columns if c.startswith("Densité ")]
+with etape("Q11 : rangs de toutes les années", monde=monde):
+    panel = PanelRangs.depuisDataFrame(monde, "État", colonnes_pop + colonnes_dens)
+ordre_pop_2007 = panel.classement("Pop 2007")
+ordre_pop_2025 = panel.classement("Pop 2025")
+ordre_dens_2007 = panel.classement("Densité 2007")
+ordre_dens_2025 = panel.classement("Densité 2025")
 
-# Q12 - rapprochement population/densité (2007) puis tri selon rang population 2007
-classement_2007 = classementPays(ordre_pop_2007, ordre_dens_2007)
-classement_2007.sort(key=lambda x: x[0])
 
-
-# Q13 - extraction des deux colonnes de rangs (pop vs densité)
-rang_pop_2007 = []
-rang_dens_2007 = []
-for ligne in classement_2007:
-    rang_pop_2007.append(ligne[0])
-    rang_dens_2007.append(ligne[1])
+# Q12-13 - rapprochement population/densité (2007), trié selon le rang population 2007, et extraction des deux colonnes de rangs
+rang_pop_2007, rang_dens_2007 = panel.rangsApparies("Pop 2007", "Densité 2007")
 
 
 # Q14 - corrélations de rangs (Spearman / Kendall)
-spearman_2007 = scipy.stats.spearmanr(rang_pop_2007, rang_dens_2007)
-kendall_2007 = scipy.stats.kendalltau(rang_pop_2007, rang_dens_2007)
+concordance_2007 = panel.concordanceVsReference("Pop 2007", ["Densité 2007"])["Densité 2007"]
+spearman_2007 = concordance_2007["spearman"]
+kendall_2007 = concordance_2007["kendall"]
 print("Spearman population vs densite 2007: rho={:.4f}, p={:.3e}".format(spearman_2007.statistic, spearman_2007.pvalue))
 print("Kendall population vs densite 2007: tau={:.4f}, p={:.3e}".format(kendall_2007.statistic, kendall_2007.pvalue))
 
+# Q14 bis - IC bootstrap et p-values de permutation (10 000 répliques) pour les deux corrélations de rangs
+with etape("Q14 bis : bootstrap et permutations", rangs_population=rang_pop_2007, rangs_densite=rang_dens_2007):
+    for nom_stat, statistique in [("Spearman", reechantillonnage.spearman), ("Kendall", reechantillonnage.kendall)]:
+        boot = reechantillonnage.bootstrap(statistique, rang_pop_2007, rang_dens_2007, graine=2007)
+        perm = reechantillonnage.permutation(statistique, rang_pop_2007, rang_dens_2007, graine=2007)
+        print("{} population vs densite 2007: IC95% bootstrap=[{:.4f}, {:.4f}], p permutation={:.3e}".format(
+            nom_stat, boot["ic_bas"], boot["ic_haut"], perm["pvalue"]))
+
 
 # Bonus - helpers génériques pour analyser les concordances de rangs
 def correlations_rangs(rang_a, rang_b):
@@ -182,39 +160,18 @@ if coast_cols:
     )
 
 
-def classements_annuels(df, prefix):
-    colonnes = [c for c in df.columns if c.startswith(prefix)]
-    rangs = {}
-    for col in colonnes:
-        valeurs = list(df[col])
-        rangs[col] = ordrePopulation(valeurs, etat)
-    return rangs
-
-
-classements_pop = classements_annuels(monde, "Pop ")
-classements_dens = classements_annuels(monde, "Densité ")
-
-# Concordance des rangs de chaque année avec 2007 (population et densité)
-def concordance_vs_ref(classements, annee_ref):
-    ref = classements.get(annee_ref, [])
-    ref_dict = {etat: rang for rang, etat in ref}
-    resultats = {}
-    for annee, classement in classements.items():
-        if annee == annee_ref:
-            continue
-        rang_ref = []
-        rang_cmp = []
-        for rang, nom in classement:
-            if nom in ref_dict:
-                rang_cmp.append(rang)
-                rang_ref.append(ref_dict[nom])
-        resultats[annee] = correlations_rangs(rang_ref, rang_cmp)
-    return resultats
-
-
-concordance_pop_vers_2007 = concordance_vs_ref(classements_pop, "Pop 2007")
-concordance_dens_vers_2007 = concordance_vs_ref(classements_dens, "Densité 2007")
+# Concordance des rangs de chaque année avec 2007 (population et densité), déjà calculée par le moteur de rangs
+with etape("Bonus : concordances avec 2007", panel=panel.rangs):
+    concordance_pop_vers_2007 = panel.concordanceVsReference("Pop 2007", colonnes_pop)
+    concordance_dens_vers_2007 = panel.concordanceVsReference("Densité 2007", colonnes_dens)
 print_concordance("Concordance des classements population vs 2007:", concordance_pop_vers_2007)
 print_concordance("Concordance des classements densite vs 2007:", concordance_dens_vers_2007)
 
-
+# Bonus - matrices complètes année x année (Spearman / Kendall) pour population et densité, exportées en CSV
+matrices_dir = os.path.join("src", "output", "session6")
+with etape("Bonus : matrices de concordance et export", panel=panel.rangs):
+    with Export(matrices_dir) as export:
+        for nom_groupe, colonnes_groupe in [("population", colonnes_pop), ("densite", colonnes_dens)]:
+            for mesure in ["spearman", "p_spearman", "kendall", "p_kendall"]:
+                export.ajouter("concordance_{}_{}".format(nom_groupe, mesure), panel.matrice(mesure, colonnes_groupe), encoding="utf-8")
+print("Matrices de concordance annee x annee exportees dans", matrices_dir)
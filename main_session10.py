@@ -1,19 +1,18 @@
 import os
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-from sklearn.linear_model import LinearRegression
-import statsmodels.api as sm
-from statsmodels.regression.linear_model import OLS
+from chargement import ouvrirUnFichier
+from moindres_carres import MoindresCarres, regressionsParGroupe
+import selection
+from cache_resultats import CacheResultats
+from export import Export
+from instrumentation import etape
 
+# Factorisations et régressions mémorisées sur disque : seules celles dont les données ont changé sont recalculées
+cache = CacheResultats(os.path.join("src", "output", "cache", "resultats"))
 
-def ouvrirUnFichier(nom):
-    with open(nom, "r", encoding="utf-8") as fichier:
-        contenu = pd.read_csv(fichier, low_memory=False)
-    return contenu
 
 # Question 1 : Partie sur les températures
-temperature = ouvrirUnFichier("./src/data/temperature.csv")
+with etape("Question 1 : chargement", fichier="./src/data/temperature.csv"):
+    temperature = ouvrirUnFichier("./src/data/temperature.csv")
 
 # Question 1a/b : corrélation et descriptives (on ignore la colonne Ville non numérique)
 cols_num = [c for c in temperature.columns if c != "Ville"]
@@ -27,25 +26,25 @@ ville = temperature["Ville"] if "Ville" in temperature.columns else temperature[
 y_temp = temperature["Température_en_janvier"]
 X_temp = temperature[["Latitude", "Longitude", "Altitude"]]
 
-# Question 1c/d/e : régression OLS statsmodels et paramètres
-X_sm = sm.add_constant(X_temp)
-modele_sm = sm.OLS(y_temp, X_sm).fit()
+# Question 1c/d/e : régression OLS (X factorisé une fois, résumé statsmodels construit à la demande) et paramètres
+with etape("Question 1c-e : régression MCO", X=X_temp, y=y_temp):
+    mco_temp = MoindresCarres(X_temp, y_temp, cache=cache)
+    modele_sm = mco_temp.ajuster()
 print("\nRégression OLS (statsmodels) :")
 print(modele_sm.summary())
 
 # Coeffs et R²
-print("Coefficients statsmodels :", modele_sm.params)
-print("R² statsmodels :", modele_sm.rsquared)
-print("p-values statsmodels :", modele_sm.pvalues)
+print("Coefficients MCO :", modele_sm.params)
+print("R² MCO :", modele_sm.rsquared)
+print("p-values MCO :", modele_sm.pvalues)
 
-# Question 1f : régression scikit-learn
-lr = LinearRegression()
-lr.fit(X_temp, y_temp)
-print("\nCoefficients sklearn :", lr.coef_)
-print("Intercept sklearn :", lr.intercept_)
+# Question 1f : coefficients et constante (mêmes valeurs que LinearRegression de scikit-learn, sans nouvel ajustement)
+print("\nCoefficients :", modele_sm.params.drop("const").to_numpy())
+print("Intercept :", modele_sm.params["const"])
 
 # Question 2 : Partie sur le géomarketing
-geomarketing = ouvrirUnFichier("./src/data/geomarketing.csv")
+with etape("Question 2 : chargement", fichier="./src/data/geomarketing.csv"):
+    geomarketing = ouvrirUnFichier("./src/data/geomarketing.csv")
 
 variables_signif = [
     "surface_totale",
@@ -61,31 +60,57 @@ variables_signif = [
 ]
 
 y_ca = geomarketing["ca"]
-X_ca = geomarketing[variables_signif]
 
-X_ca_sm = sm.add_constant(X_ca)
-modele_ca_sm = sm.OLS(y_ca, X_ca_sm).fit()
+# Une seule factorisation de toutes les variables numériques : le modèle sélectionné en est un sous-modèle
+X_ca_all = geomarketing.drop(columns=["ca"])
+X_ca_all_numeric = X_ca_all.select_dtypes(exclude=["object", "string"])
+with etape("Question 2 : factorisation MCO", X=X_ca_all_numeric, y=y_ca):
+    mco_ca = MoindresCarres(X_ca_all_numeric, y_ca, cache=cache)
+
+with etape("Question 2 : régression MCO (variables sélectionnées)", X=X_ca_all_numeric):
+    modele_ca_sm = mco_ca.ajuster(variables_signif)
 print("\nRégression géomarketing (variables sélectionnées) :")
 print(modele_ca_sm.summary())
 
-print("Coefficients statsmodels :", modele_ca_sm.params)
-print("R² statsmodels :", modele_ca_sm.rsquared)
-print("p-values statsmodels :", modele_ca_sm.pvalues)
+print("Coefficients MCO :", modele_ca_sm.params)
+print("R² MCO :", modele_ca_sm.rsquared)
+print("p-values MCO :", modele_ca_sm.pvalues)
 
 # Bonus : régression avec toutes les variables (numériques uniquement)
-X_ca_all = geomarketing.drop(columns=["ca"])
-X_ca_all_numeric = X_ca_all.select_dtypes(exclude=["object"])
-X_ca_all_sm = sm.add_constant(X_ca_all_numeric)
-modele_ca_all_sm = sm.OLS(y_ca, X_ca_all_sm).fit()
+with etape("Bonus : régression MCO (toutes variables)", X=X_ca_all_numeric):
+    modele_ca_all_sm = mco_ca.ajuster()
 print("\nRégression géomarketing (toutes variables numériques) :")
 print(modele_ca_all_sm.summary())
 
+# Bonus : sélection automatique des variables (pas à pas, meilleurs sous-ensembles, LASSO) sur les colonnes numériques
+print("\nSélection de variables (géomarketing) :")
+print(f"  variables_signif (choix manuel) : AIC={modele_ca_sm.aic:.2f}, BIC={modele_ca_sm.bic:.2f}")
+with etape("Bonus : sélection de variables", X=X_ca_all_numeric, y=y_ca):
+    selections = {
+        "pas à pas avant (AIC)": selection.selectionPasAPas(mco_ca, sens="avant", critere="aic"),
+        "pas à pas arrière (AIC)": selection.selectionPasAPas(mco_ca, sens="arriere", critere="aic"),
+        "pas à pas avant (CV)": selection.selectionPasAPas(mco_ca, sens="avant", critere="cv"),
+        "meilleurs sous-ensembles (BIC, 5 variables au plus)": selection.meilleursSousEnsembles(mco_ca, k_max=5, critere="bic"),
+        "LASSO (CV 5 plis)": selection.selectionLasso(X_ca_all_numeric, y_ca, critere="cv", graine=2022),
+    }
+for nom_selection, resultat in selections.items():
+    modele = mco_ca.ajuster(resultat["variables"])
+    print(f"  {nom_selection} : {len(resultat['variables'])} variables, AIC={modele.aic:.2f}, BIC={modele.bic:.2f}, "
+          f"R²={modele.rsquared:.4f}")
+    print(f"    {resultat['variables']}")
+    if resultat.get("exhaustif") is False:
+        print("    (recherche interrompue par le budget de noeuds : meilleur sous-ensemble non garanti)")
+
+# Bonus : une régression par enseigne (variables_signif), toutes les enseignes résolues en un seul appel
+with etape("Bonus : régressions MCO par enseigne", donnees=geomarketing):
+    coefficients_enseignes = cache.memoiser(regressionsParGroupe, geomarketing, "ca", variables_signif, "enseigne")
+print("\nRégressions par enseigne (variables sélectionnées) :")
+print(coefficients_enseignes[["enseigne", "variable", "coefficient", "erreur_type", "pvalue", "n_obs", "r2"]].to_string(index=False))
+
 # Sauvegarde des résumés dans un dossier output
 output_dir = os.path.join("src", "output", "session10")
-os.makedirs(output_dir, exist_ok=True)
-with open(os.path.join(output_dir, "temperature_ols_summary.txt"), "w", encoding="utf-8") as f:
-    f.write(str(modele_sm.summary()))
-with open(os.path.join(output_dir, "geomarketing_sel_ols_summary.txt"), "w", encoding="utf-8") as f:
-    f.write(str(modele_ca_sm.summary()))
-with open(os.path.join(output_dir, "geomarketing_all_ols_summary.txt"), "w", encoding="utf-8") as f:
-    f.write(str(modele_ca_all_sm.summary()))
+with Export(output_dir) as export:
+    export.ajouterTexte("temperature_ols_summary.txt", modele_sm.summary())
+    export.ajouterTexte("geomarketing_sel_ols_summary.txt", modele_ca_sm.summary())
+    export.ajouterTexte("geomarketing_all_ols_summary.txt", modele_ca_all_sm.summary())
+    export.ajouter("geomarketing_coefficients_par_enseigne", coefficients_enseignes, index=False, encoding="utf-8")
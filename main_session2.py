@@ -1,35 +1,56 @@
 # Session 2 : Les principes généraux de la statistique
 # Script converti depuis le notebook main_session2.ipynb
 
+import os
 import pandas as pd
-import matplotlib.pyplot as plt
-
-# Question 2 : charger le fichier CSV
-with open("./src/data/resultats-elections-presidentielles-2022-1er-tour.csv", "r", encoding="utf-8") as fichier:
-    contenu = pd.read_csv(fichier)
-
-# Question 5 : afficher le DataFrame
-df = pd.DataFrame(contenu)
-print(df)
-
-# Question 6 : nombre de lignes et de colonnes
-print(f"Nombre de colonnes : {len(df.columns)}")
-print(f"Nombre de lignes : {len(df)}")
-
-# Question 7 : types des colonnes
-print(df.dtypes)
-
-# Question 8 : affichage de la première ligne (noms de colonnes)
-print(df.head())
-
-# Question 9 : somme des inscrits
-print(f"Le nombre total d'inscrits est {df['Inscrits'].sum()}")
-
-# Question 10 : effectifs des colonnes quantitatives
-liste_effectifs = []
-for colonne in contenu.columns:
-    dtype = contenu[colonne].dtype
-    if dtype == "int64" or dtype == "float64":
-        somme_colonne = contenu[colonne].sum()
-        liste_effectifs.append(somme_colonne)
-print(f"Liste des effectifs {liste_effectifs}")
+from chargement import ouvrirUnFichier
+from flux import agregerParBlocs
+from instrumentation import etape
+
+FICHIER = "./src/data/resultats-elections-presidentielles-2022-1er-tour.csv"
+
+# Mode flux (MODE_FLUX=1) : lecture par blocs et accumulateurs, sans charger le fichier entier
+# (fichiers par bureau de vote). Seules les questions 6, 9 et 10 sont alors calculées.
+MODE_FLUX = os.environ.get("MODE_FLUX", "0") == "1"
+
+if MODE_FLUX:
+    with etape("Mode flux : agrégation par blocs", fichier=FICHIER):
+        resultats = agregerParBlocs(FICHIER, ecart_absolu=False)
+    print(resultats["apercu"])
+    print(f"Nombre de colonnes : {len(resultats['toutes_colonnes'])}")
+    print(f"Nombre de lignes : {resultats['n_lignes']}")
+    sommes = dict(zip(resultats["colonnes"], resultats["somme"]))
+    print(f"Le nombre total d'inscrits est {sommes['Inscrits']}")
+    liste_effectifs = resultats["somme"]
+    print(f"Liste des effectifs {liste_effectifs}")
+else:
+    # Question 2 : charger le fichier CSV
+    with etape("Question 2 : chargement", fichier=FICHIER):
+        contenu = ouvrirUnFichier(FICHIER)
+
+    # Question 5 : afficher le DataFrame
+    df = pd.DataFrame(contenu)
+    print(df)
+
+    # Question 6 : nombre de lignes et de colonnes
+    print(f"Nombre de colonnes : {len(df.columns)}")
+    print(f"Nombre de lignes : {len(df)}")
+
+    # Question 7 : types des colonnes
+    print(df.dtypes)
+
+    # Question 8 : affichage de la première ligne (noms de colonnes)
+    print(df.head())
+
+    # Question 9 : somme des inscrits
+    print(f"Le nombre total d'inscrits est {df['Inscrits'].sum()}")
+
+    # Question 10 : effectifs des colonnes quantitatives
+    with etape("Question 10 : effectifs des colonnes quantitatives", contenu=contenu):
+        liste_effectifs = []
+        for colonne in contenu.columns:
+            dtype = contenu[colonne].dtype
+            if dtype == "int64" or dtype == "float64":
+                somme_colonne = contenu[colonne].sum()
+                liste_effectifs.append(somme_colonne)
+    print(f"Liste des effectifs {liste_effectifs}")
@@ -4,17 +4,16 @@ import pandas as pd
 import math
 import numpy as np
 from scipy import stats
-
-def ouvrirUnFichier(nom):
-    with open(nom, "r") as fichier:
-        contenu = pd.read_csv(fichier)
-    return contenu
-
+from chargement import ouvrirUnFichier
+from simulation import couvertureIntervalles
+from ajustement import ajusterCatalogue, meilleureLoi, lois_ajustement
+from instrumentation import etape
 
 N_population = 2185
 pop_counts = np.array([852, 911, 422])  # Pour, Contre, Sans opinion
 
-donnees = pd.DataFrame(ouvrirUnFichier("./src/data/Echantillonnage-100-Echantillons.csv"))
+with etape("Chargement", fichier="./src/data/Echantillonnage-100-Echantillons.csv"):
+    donnees = pd.DataFrame(ouvrirUnFichier("./src/data/Echantillonnage-100-Echantillons.csv"))
 
 # 1) Théorie de l’échantillonnage
 # Moyennes par colonne (arrondies à 0 décimale avec round())
@@ -67,12 +66,30 @@ print("Taille du premier échantillon :", n1)
 print("Fréquences premier échantillon :", [round(p, 4) for p in freqs_premier])
 print("IC 95% (approx. normale, correction finie) pour le 1er échantillon :", ic_premier)
 
+# Bonus : simulation Monte-Carlo de 1 000 000 d'échantillons sans remise pour plusieurs tailles n
+# (couverture empirique des IC à 95 %, avec et sans correction de population finie)
+with etape("Bonus : simulation Monte-Carlo des intervalles", population=pop_counts):
+    couverture = couvertureIntervalles(
+        pop_counts,
+        tailles=[50, 100, 500, n, 1500],
+        n_simulations=1_000_000,
+        zC=zC,
+        categories=["Pour", "Contre", "Sans opinion"],
+        graine=2185,
+    )
+print("Couverture empirique des intervalles (1 000 000 d'échantillons par taille) :")
+print(couverture[["n", "categorie", "ecart_type_empirique", "ecart_type_theorique_fpc", "couverture_ic_fpc", "couverture_ic_sans_fpc"]])
+output_dir = os.path.join("src", "output", "session5")
+os.makedirs(output_dir, exist_ok=True)
+couverture.to_csv(os.path.join(output_dir, "couverture_intervalles.csv"), index=False)
+
 # 3) Théorie de la décision - test de Shapiro-Wilk sur deux fichiers
-f1 = pd.Series(ouvrirUnFichier("./src/data/Loi-normale-Test-1.csv").iloc[:, 0].dropna().astype(float).values)
-f2 = pd.Series(ouvrirUnFichier("./src/data/Loi-normale-Test-2.csv").iloc[:, 0].dropna().astype(float).values)
+with etape("Test de Shapiro-Wilk", fichier_1="./src/data/Loi-normale-Test-1.csv", fichier_2="./src/data/Loi-normale-Test-2.csv"):
+    f1 = pd.Series(ouvrirUnFichier("./src/data/Loi-normale-Test-1.csv").iloc[:, 0].dropna().astype(float).values)
+    f2 = pd.Series(ouvrirUnFichier("./src/data/Loi-normale-Test-2.csv").iloc[:, 0].dropna().astype(float).values)
 
-sh1 = stats.shapiro(f1)
-sh2 = stats.shapiro(f2)
+    sh1 = stats.shapiro(f1)
+    sh2 = stats.shapiro(f2)
 
 print("Shapiro Test - fichier 1: statistic={:.4f}, p={:.4g}".format(sh1.statistic, sh1.pvalue))
 print("Shapiro Test - fichier 2: statistic={:.4f}, p={:.4g}".format(sh2.statistic, sh2.pvalue))
@@ -89,22 +106,22 @@ else:
 
 # Bonus : identification de la loi la mieux ajustée pour la série non normale
 
-def best_fit_distribution(data, distributions=("norm", "expon", "uniform")):
-    best = {"dist": None, "pvalue": -1, "params": None}
-    for dist_name in distributions:
-        dist = getattr(stats, dist_name)
-        try:
-            params = dist.fit(data)
-            ks = stats.kstest(data, dist_name, args=params)
-            if ks.pvalue > best["pvalue"]:
-                best.update({"dist": dist_name, "pvalue": ks.pvalue, "params": params})
-        except Exception:
-            continue
-    return best
-
-
-for idx, (series, sh) in enumerate([(f1, sh1), (f2, sh2)], start=1):
-    if sh.pvalue <= 0.05:
-        best = best_fit_distribution(series.values)
-        print(f"Meilleure loi ajustée pour la série {idx} (non normale) : {best['dist']} with KS p-value={best['pvalue']:.4g} and params={best['params']}")
+def best_fit_distribution(data, distributions=lois_ajustement):
+    # catalogue complet ajusté en parallèle (délai par loi), paramètres mémorisés par empreinte des données ;
+    # la meilleure loi est celle de plus grande p-value KS, le classement affiché ensuite est celui de l'AIC
+    dossier_cache = os.path.join("src", "output", "cache", "ajustements")
+    classement = ajusterCatalogue(data, lois=distributions, critere="aic", dossier_cache=dossier_cache)
+    best = meilleureLoi(classement)
+    if best is None:
+        return {"dist": None, "pvalue": -1, "params": None, "classement": classement}
+    return {"dist": best["loi"], "pvalue": best["pvalue"], "params": tuple(best["params"]), "classement": classement}
+
+
+with etape("Bonus : ajustement du catalogue de lois", serie_1=f1, serie_2=f2):
+    for idx, (series, sh) in enumerate([(f1, sh1), (f2, sh2)], start=1):
+        if sh.pvalue <= 0.05:
+            best = best_fit_distribution(series.values)
+            print(f"Meilleure loi ajustée (KS) pour la série {idx} (non normale) : {best['dist']} with KS p-value={best['pvalue']:.4g} and params={best['params']}")
+            print(f"Classement AIC (5 premières lois) pour la série {idx} :")
+            print(best["classement"][["loi", "ks", "pvalue", "aic", "bic"]].head())
 
@@ -2,16 +2,17 @@
 import os
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import scipy
 import scipy.stats
+from chargement import ouvrirUnFichier
+from rendu import tacheRegression, rendre
+from regression import blocNumerique, regressionsLot
+from reechantillonnage import bootstrap, permutation, pente, pearson
+from instrumentation import etape
+from export import Export
 
-def ouvrirUnFichier(nom):
-    with open(nom, "r", encoding="utf-8") as fichier:
-        contenu = pd.read_csv(fichier, low_memory=False)
-    return contenu
-
-data = pd.DataFrame(ouvrirUnFichier("./src/data/pib-vs-energie.csv"))
+with etape("Chargement", fichier="./src/data/pib-vs-energie.csv"):
+    data = pd.DataFrame(ouvrirUnFichier("./src/data/pib-vs-energie.csv"))
 
 colonnes = ["PIB_2022", "Utilisation_d_energie_2022"]
 donnees = data[colonnes].copy()
@@ -37,24 +38,29 @@ print(f"Std err: {resultat_reg.stderr:.6f}")
 corr_pearson = donnees.corr(method="pearson").loc["PIB_2022", "Utilisation_d_energie_2022"]
 print(f"Corrélation de Pearson: {corr_pearson:.6f}")
 
+# Bonus : inférence par rééchantillonnage (IC bootstrap et p-value de permutation, 10 000 répliques)
+with etape("Bonus : bootstrap et permutations", x=x, y=y):
+    boot_pente = bootstrap(pente, x, y, graine=2022)
+    boot_r = bootstrap(pearson, x, y, graine=2022)
+    perm_r = permutation(pearson, x, y, graine=2022)
+    print(f"IC 95% bootstrap de la pente: [{boot_pente['ic_bas']:.6f}, {boot_pente['ic_haut']:.6f}]")
+    print(f"IC 95% bootstrap de r: [{boot_r['ic_bas']:.6f}, {boot_r['ic_haut']:.6f}]")
+    print(f"p-value de permutation (r): {perm_r['pvalue']:.6e} ({perm_r['n_repliques']} permutations)")
+
 # Question 5 : graphique avec droite de régression
 output_dir = os.path.join("src", "output", "img", "session7")
 os.makedirs(output_dir, exist_ok=True)
 
-plt.figure(figsize=(8, 5))
-plt.scatter(x, y, alpha=0.6, s=20, label="Observations")
-
-x_line = np.linspace(x.min(), x.max(), 200)
-y_line = resultat_reg.intercept + resultat_reg.slope * x_line
-plt.plot(x_line, y_line, color="red", label="Droite de régression")
-
-plt.xlabel("Consommation d'énergie 2022 (kg équivalent pétrole)")
-plt.ylabel("PIB 2022 (USD courants)")
-plt.title("PIB vs consommation d'énergie (2022)")
-plt.legend()
-plt.tight_layout()
-plt.savefig(os.path.join(output_dir, "pib_vs_energie_regression.png"), dpi=150)
-plt.close()
+taches_figures = [tacheRegression(
+    os.path.join(output_dir, "pib_vs_energie_regression.png"),
+    x,
+    y,
+    resultat_reg.slope,
+    resultat_reg.intercept,
+    titre="PIB vs consommation d'énergie (2022)",
+    xlabel="Consommation d'énergie 2022 (kg équivalent pétrole)",
+    ylabel="PIB 2022 (USD courants)",
+)]
 
 # Question 6 : commentaire d'interprétation
 """
@@ -72,61 +78,55 @@ plt.close()
 """
 
 # Bonus : généralisation 1962-2022
-bonus_resultats = []
 bonus_img_dir = os.path.join("src", "output", "img", "session7", "years")
 bonus_csv_dir = os.path.join("src", "output", "session7")
 os.makedirs(bonus_img_dir, exist_ok=True)
 os.makedirs(bonus_csv_dir, exist_ok=True)
 
-for annee in range(1962, 2023):
-    col_pib = f"PIB_{annee}"
-    col_energie = f"Utilisation_d_energie_{annee}"
-
-    if col_pib not in data.columns or col_energie not in data.columns:
-        continue
-
-    df_year = data[[col_pib, col_energie]].copy()
-    df_year[col_pib] = pd.to_numeric(df_year[col_pib], errors="coerce")
-    df_year[col_energie] = pd.to_numeric(df_year[col_energie], errors="coerce")
-    df_year = df_year.dropna(subset=[col_pib, col_energie])
-
-    if len(df_year) < 2:
-        continue
-
-    x_year = df_year[col_energie].values
-    y_year = df_year[col_pib].values
-
-    reg_year = scipy.stats.linregress(x_year, y_year)
-    corr_year = df_year.corr(method="pearson").loc[col_pib, col_energie]
-
-    bonus_resultats.append({
-        "annee": annee,
-        "n_obs": len(df_year),
-        "slope": reg_year.slope,
-        "intercept": reg_year.intercept,
-        "rvalue": reg_year.rvalue,
-        "pvalue": reg_year.pvalue,
-        "stderr": reg_year.stderr,
-        "corr_pearson": corr_year,
-    })
-
-    # Graphique par année
-    plt.figure(figsize=(8, 5))
-    plt.scatter(x_year, y_year, alpha=0.6, s=18, label="Observations")
-    x_line_year = np.linspace(x_year.min(), x_year.max(), 200)
-    y_line_year = reg_year.intercept + reg_year.slope * x_line_year
-    plt.plot(x_line_year, y_line_year, color="red", label="Droite de régression")
-    plt.xlabel(f"Consommation d'énergie {annee} (kg équivalent pétrole)")
-    plt.ylabel(f"PIB {annee} (USD courants)")
-    plt.title(f"PIB vs consommation d'énergie ({annee})")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(os.path.join(bonus_img_dir, f"pib_vs_energie_{annee}.png"), dpi=150)
-    plt.close()
+# Toutes les années en un seul calcul : blocs PIB_* et Utilisation_d_energie_* convertis une fois
+annees_bonus = list(range(1962, 2023))
+with etape("Bonus : régressions par année", donnees=data):
+    bloc_energie = blocNumerique(data, "Utilisation_d_energie_", annees_bonus)
+    bloc_pib = blocNumerique(data, "PIB_", annees_bonus)
+    df_bonus = regressionsLot(bloc_energie, bloc_pib, annees_bonus)
+
+with etape("Bonus : boucle des années (figures)", annees=df_bonus):
+    for reg_year in df_bonus.itertuples():
+        annee = reg_year.annee
+        colonne = annees_bonus.index(annee)
+        complets = ~np.isnan(bloc_energie[:, colonne]) & ~np.isnan(bloc_pib[:, colonne])
+        x_year = bloc_energie[complets, colonne]
+        y_year = bloc_pib[complets, colonne]
+
+        # Graphique par année (rendu en lot après la boucle)
+        taches_figures.append(tacheRegression(
+            os.path.join(bonus_img_dir, f"pib_vs_energie_{annee}.png"),
+            x_year,
+            y_year,
+            reg_year.slope,
+            reg_year.intercept,
+            titre=f"PIB vs consommation d'énergie ({annee})",
+            xlabel=f"Consommation d'énergie {annee} (kg équivalent pétrole)",
+            ylabel=f"PIB {annee} (USD courants)",
+            taille_points=18,
+        ))
+
+# Rendu parallèle des graphiques ; ceux dont les données n'ont pas changé ne sont pas redessinés
+with etape("Rendu des graphiques", figures=taches_figures):
+    statuts_figures = rendre(taches_figures)
+    print(f"Graphiques : {sum(st['statut'] == 'rendu' for st in statuts_figures)} rendus, "
+          f"{sum(st['statut'] == 'inchange' for st in statuts_figures)} inchangés")
 
 # Sauvegarde du tableau de synthèse des régressions par année
-if bonus_resultats:
-    df_bonus = pd.DataFrame(bonus_resultats)
-    df_bonus.to_csv(os.path.join(bonus_csv_dir, "regressions_par_annee.csv"), index=False)
-
-
+# (écriture en arrière-plan pendant le calcul des ajustements suivants, voir export.py)
+export = Export(bonus_csv_dir)
+if len(df_bonus):
+    export.ajouter("regressions_par_annee", df_bonus, index=False)
+
+
+# Même routine, sans boucle supplémentaire : ajustements log-log et fenêtres glissantes de 5 ans
+df_loglog = regressionsLot(bloc_energie, bloc_pib, annees_bonus, loglog=True)
+export.ajouter("regressions_loglog_par_annee", df_loglog, index=False)
+df_fenetres = regressionsLot(bloc_energie, bloc_pib, annees_bonus, fenetre=5)
+export.ajouter("regressions_fenetres_5ans", df_fenetres, index=False)
+export.fermer()
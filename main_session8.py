@@ -3,36 +3,25 @@ import numpy as np
 import pandas as pd
 import scipy
 import scipy.stats
-
-def ouvrirUnFichier(nom):
-    with open(nom, "r", encoding="utf-8") as fichier:
-        contenu = pd.read_csv(fichier, low_memory=False)
-    return contenu
+from chargement import ouvrirUnFichier
+import contingence
+import afc
+from cache_resultats import CacheResultats
+from export import Export
+from reechantillonnage import permutationContingence, bootstrapContingence, chi2Tables, phi2Tables
+from instrumentation import etape
 
 def tableauDeContingence(nom, donnees):
-    indexValeurs = {}
-    for element in range(0,len(nom)):
-        indexValeurs.update({element: nom[element]})
-    return pd.DataFrame(donnees).rename(index = indexValeurs)
+    return pd.DataFrame(donnees).set_axis(list(nom), axis=0)
 
 def sommeDesColonnes(tableau):
-    colonne = list(tableau.head(0))
-    sommeColonne = []
-    for element in colonne:
-        sommeColonne.append(tableau[element].sum())
-    return sommeColonne
+    return list(contingence.marges(tableau.to_numpy())[1])
 
 def sommeDesLignes(tableau):
-    colonne = list(tableau.head(0))
-    sommeLigne = []
-    for element1 in range(0,len(tableau)):
-        ligne = []
-        for element2 in range(0,len(colonne)):
-            ligne.append(tableau.iloc[element1, element2])
-        sommeLigne.append(np.sum(list(ligne)))
-    return sommeLigne
+    return list(contingence.marges(tableau.to_numpy())[0])
 
-data = pd.DataFrame(ouvrirUnFichier("./src/data/Socioprofessionnelle-vs-sexe.csv"))
+with etape("Chargement", fichier="./src/data/Socioprofessionnelle-vs-sexe.csv"):
+    data = pd.DataFrame(ouvrirUnFichier("./src/data/Socioprofessionnelle-vs-sexe.csv"))
 
 # Question 1 : création du tableau de contingence (le fichier est déjà un tableau croisé) & calculer les marges
 tab_cont = tableauDeContingence(data["Catégorie"], {"Femmes": data["Femmes"], "Hommes": data["Hommes"]})
@@ -54,56 +43,75 @@ if np.isclose(total_cols, total_rows):
 else:
     print("Totaux non identiques : vérifier les données")
 
-# Question 3 : test du chi2 avec Scipy.stats
+# Question 3 : test du chi2 (tableau creux, réductions vectorisées ; mêmes résultats que scipy.stats.chi2_contingency)
 print("Test du chi2")
-chi2, p_value, dof, expected = scipy.stats.chi2_contingency(tab_cont.values)
+with etape("Question 3 : test du chi2", tableau=tab_cont):
+    table_creuse = contingence.tableauDepuisCroise(tab_cont)["table"]
+    analyse = contingence.analyseContingence(table_creuse)
+    chi2, p_value, dof, expected = analyse["chi2"], analyse["pvalue"], analyse["ddl"], analyse["attendus"]
 print(f"Chi2: {chi2:.4f}, ddl: {dof}, p-value: {p_value:.6e}")
 print("Effectifs attendus :")
 print(expected)
 
 # Question 4 : intensité de liaison phi2 de Pearson
 print("Intensité de liaison phi2")
-n_total = tab_cont.values.sum()
-phi2 = chi2 / n_total
+n_total = analyse["n"]
+phi2 = analyse["phi2"]
 print(f"Phi2 de Pearson: {phi2:.6f}")
+print(f"V de Cramér: {analyse['v_cramer']:.6f}")
+print("Résidus standardisés (o - e) / racine(e) :")
+print(pd.DataFrame(analyse["residus_standardises"], index=tab_cont.index, columns=tab_cont.columns).round(2))
+
+# Bonus : p-value de permutation du chi2 (tableaux à marges fixes) et IC bootstrap du phi2
+with etape("Bonus : permutations et bootstrap du tableau", tableau=tab_cont):
+    perm_chi2 = permutationContingence(tab_cont.values, chi2Tables, graine=2024)
+    boot_phi2 = bootstrapContingence(tab_cont.values, phi2Tables, graine=2024)
+print(f"p-value de permutation (chi2): {perm_chi2['pvalue']:.6e} ({perm_chi2['n_repliques']} permutations)")
+print(f"IC 95% bootstrap du phi2: [{boot_phi2['ic_bas']:.6f}, {boot_phi2['ic_haut']:.6f}]")
 
 # Bonus : ANOVA sur Echantillonnage-100-Echantillons.csv & A.F.C. (analyse factorielle des correspondances)
-bonus_data = pd.DataFrame(ouvrirUnFichier("./src/data/Echantillonnage-100-Echantillons.csv"))
-anova_result = scipy.stats.f_oneway(bonus_data.iloc[:, 0], bonus_data.iloc[:, 1], bonus_data.iloc[:, 2])
+with etape("Bonus : ANOVA", fichier="./src/data/Echantillonnage-100-Echantillons.csv"):
+    bonus_data = pd.DataFrame(ouvrirUnFichier("./src/data/Echantillonnage-100-Echantillons.csv"))
+    anova_result = scipy.stats.f_oneway(bonus_data.iloc[:, 0], bonus_data.iloc[:, 1], bonus_data.iloc[:, 2])
 print("ANOVA (Pour vs Contre vs Sans opinion)")
 print(f"F = {anova_result.statistic:.4f}, p-value = {anova_result.pvalue:.6e}")
 
-def correspondence_analysis(table):
-    X = table.values.astype(float)
-    n = X.sum()
-    P = X / n
-    r = P.sum(axis=1, keepdims=True)
-    c = P.sum(axis=0, keepdims=True)
-    expected = r @ c
-    S = (P - expected) / np.sqrt(expected)
-    U, singular_vals, Vt = np.linalg.svd(S, full_matrices=False)
-    F = (1 / np.sqrt(r)) * (U * singular_vals)
-    G = (1 / np.sqrt(c.T)) * (Vt.T * singular_vals)
-    inertia = singular_vals ** 2
-    return F, G, inertia
-
-row_coords, col_coords, inertia = correspondence_analysis(tab_cont)
+# AFC mémorisées sur disque (empreinte du tableau et des paramètres) : recalculées seulement si le tableau change
+cache = CacheResultats(os.path.join("src", "output", "cache", "resultats"))
+
+def correspondence_analysis(table, k=None):
+    resultats = cache.memoiser(afc.analyseCorrespondances, table.values, k=k)
+    return resultats["coord_lignes"], resultats["coord_colonnes"], resultats["inertie"]
+
+with etape("Bonus : AFC", tableau=tab_cont):
+    row_coords, col_coords, inertia = correspondence_analysis(tab_cont)
 afc_dir = os.path.join("src", "output", "session8")
-os.makedirs(afc_dir, exist_ok=True)
-
-pd.DataFrame(row_coords, columns=["Dim1", "Dim2"] + [f"Dim{i}" for i in range(3, row_coords.shape[1] + 1)]).to_csv(
-    os.path.join(afc_dir, "afc_coord_lignes.csv"), index_label="Categorie"
-)
-pd.DataFrame(col_coords, columns=["Dim1", "Dim2"] + [f"Dim{i}" for i in range(3, col_coords.shape[1] + 1)]).to_csv(
-    os.path.join(afc_dir, "afc_coord_colonnes.csv"), index_label="Sexe"
-)
-pd.DataFrame({"inertie": inertia}).to_csv(
-    os.path.join(afc_dir, "afc_inertie.csv"), index_label="dimension"
-)
+
+with Export(afc_dir) as export:
+    export.ajouter(
+        "afc_coord_lignes",
+        pd.DataFrame(row_coords, columns=["Dim1", "Dim2"] + [f"Dim{i}" for i in range(3, row_coords.shape[1] + 1)]),
+        index_label="Categorie",
+    )
+    export.ajouter(
+        "afc_coord_colonnes",
+        pd.DataFrame(col_coords, columns=["Dim1", "Dim2"] + [f"Dim{i}" for i in range(3, col_coords.shape[1] + 1)]),
+        index_label="Sexe",
+    )
+    export.ajouter("afc_inertie", pd.DataFrame({"inertie": inertia}), index_label="dimension")
 
 print("AFC : inerties principales (variance expliquée par dimension)")
 print(inertia)
 
+# Bonus : AFC tronquée sur le tableau creux (premier axe seul, Lanczos) et projection d'une ligne supplémentaire
+with etape("Bonus : AFC tronquée et ligne supplémentaire", tableau=table_creuse):
+    afc_tronquee = cache.memoiser(afc.analyseCorrespondances, table_creuse, k=1)
+    print(f"AFC tronquée (k=1) : inertie axe 1 = {afc_tronquee['inertie'][0]:.6e}")
+    actives = tab_cont.drop(index="Non classés")
+    afc_actives = cache.memoiser(afc.analyseCorrespondances, actives.values, k=1)
+    coord_sup = afc.projeterLignes(afc_actives, tab_cont.loc[["Non classés"]].values)
+    print(f"Non classés (ligne supplémentaire) : coordonnée axe 1 = {coord_sup[0, 0]:.6f}")
+
 
 """
 χ² et liaison : la p-value (très faible, non affichée mais issue du test chi²) implique rejet de l'indépendance : la répartition Femmes/Hommes dépend de la catégorie socioprofessionnelle.
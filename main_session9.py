@@ -3,58 +3,119 @@
 import os
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-import scipy
-import scipy.stats
-import prince
 import matplotlib.pyplot as plt
-
-def ouvrirUnFichier(nom):
-    with open(nom, "r", encoding="utf-8") as fichier:
-        contenu = pd.read_csv(fichier, low_memory=False)
-    return contenu
+from chargement import ouvrirUnFichier
+from acp import acpParBlocs
+from acm import analyseCorrespondancesMultiples
+import classification
+from cache_resultats import CacheResultats
+from instrumentation import etape
 
 output_dir = os.path.join("src", "output", "img", "session9")
 os.makedirs(output_dir, exist_ok=True)
 
+# ACP, ACM et CAH mémorisées sur disque (empreinte des données et des paramètres) : recalculées seulement si les données changent
+cache = CacheResultats(os.path.join("src", "output", "cache", "resultats"))
+
+
+#Fonction pour ajuster l'ACP et ne garder que ses attributs appris (composantes, valeurs propres...)
+@etape("ACP : ajustement")
+def ajusterACP(X_std, n_composantes):
+    from sklearn.decomposition import PCA
+    pca = PCA(n_components=n_composantes).fit(X_std)
+    return {attribut: valeur for attribut, valeur in vars(pca).items() if attribut.endswith("_")}
+
 # 1. ACP sur les températures françaises
-temperature = ouvrirUnFichier("./src/data/france-temperatures.csv")
-
-# a/b : isoler individus et variables numériques
-villes = temperature["Villes"]
-X_num = temperature.drop(columns=["Villes"])
-
-# c : centrage-réduction
-scaler = StandardScaler()
-X_std = scaler.fit_transform(X_num)
-
-# d : ACP avec 12 facteurs
-pca = PCA(n_components=12)
-pca.fit(X_std)
-print("PCA fitted (12 composantes)")
-print(pca)
-
-# e : variances expliquées et valeurs propres
-var_exp = pca.explained_variance_ratio_
-var_exp_pct = var_exp * 100
-eig_vals = pca.explained_variance_
-print("Variance expliquée (ratio):", var_exp)
-print("Variance expliquée (%):", var_exp_pct)
-print("Valeurs propres:", eig_vals)
-
-# f : charges (loadings) sous forme de DataFrame
-loadings = pd.DataFrame(
-    pca.components_.T * np.sqrt(eig_vals),
-    index=X_num.columns,
-    columns=[f"Dim{i+1}" for i in range(pca.n_components_)],
-)
-print("Loadings (variables x composantes):")
-print(loadings)
-
-# g : coordonnées individus + mapping (Dim1/Dim2)
-scores = pca.transform(X_std)
-coords_df = pd.DataFrame(scores, index=villes, columns=[f"Dim{i+1}" for i in range(pca.n_components_)])
+# Mode flux (MODE_FLUX=1) : ACP par blocs (acp.py), coordonnées, contributions et cos² écrits sur disque
+FICHIER_TEMPERATURES = "./src/data/france-temperatures.csv"
+MODE_FLUX = os.environ.get("MODE_FLUX", "0") == "1"
+
+if MODE_FLUX:
+    acp = acpParBlocs(FICHIER_TEMPERATURES, "Villes", os.path.join("src", "output", "session9"), n_composantes=12)
+    print("ACP par blocs (12 composantes), individus :", acp["n"])
+
+    # e : variances expliquées et valeurs propres
+    var_exp = acp["ratio_variance"]
+    eig_vals = acp["valeurs_propres"]
+    print("Variance expliquée (ratio):", var_exp)
+    print("Variance expliquée (%):", var_exp * 100)
+    print("Valeurs propres:", eig_vals)
+
+    # f : charges (loadings)
+    loadings = acp["loadings"]
+    print("Loadings (variables x composantes):")
+    print(loadings)
+
+    # g/h : coordonnées, contributions et cos² des individus (relus depuis les fichiers écrits par blocs)
+    scores_df = pd.read_csv(acp["fichiers"]["scores"], index_col=0, encoding="utf-8")
+    villes = scores_df.index.to_series()
+    scores = scores_df.to_numpy()
+    print("Contributions individus (premières lignes):")
+    print(pd.read_csv(acp["fichiers"]["contributions"], index_col=0, nrows=5, encoding="utf-8"))
+    print("Cos² individus (premières lignes):")
+    print(pd.read_csv(acp["fichiers"]["cos2"], index_col=0, nrows=5, encoding="utf-8"))
+
+    # i : coordonnées des variables (cercle de corrélation)
+    corvar = acp["cercle_correlations"].to_numpy()
+    noms_variables = acp["colonnes"]
+else:
+    # sklearn n'est importé que sur ce chemin (le mode flux s'en passe)
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.decomposition import PCA
+    temperature = ouvrirUnFichier(FICHIER_TEMPERATURES)
+
+    # a/b : isoler individus et variables numériques
+    villes = temperature["Villes"]
+    X_num = temperature.drop(columns=["Villes"])
+
+    # c : centrage-réduction
+    scaler = StandardScaler()
+    X_std = scaler.fit_transform(X_num)
+
+    # d : ACP avec 12 facteurs
+    pca = PCA(n_components=12)
+    for attribut, valeur in cache.memoiser(ajusterACP, X_std, 12).items():
+        setattr(pca, attribut, valeur)
+    print("PCA fitted (12 composantes)")
+    print(pca)
+
+    # e : variances expliquées et valeurs propres
+    var_exp = pca.explained_variance_ratio_
+    var_exp_pct = var_exp * 100
+    eig_vals = pca.explained_variance_
+    print("Variance expliquée (ratio):", var_exp)
+    print("Variance expliquée (%):", var_exp_pct)
+    print("Valeurs propres:", eig_vals)
+
+    # f : charges (loadings) sous forme de DataFrame
+    loadings = pd.DataFrame(
+        pca.components_.T * np.sqrt(eig_vals),
+        index=X_num.columns,
+        columns=[f"Dim{i+1}" for i in range(pca.n_components_)],
+    )
+    print("Loadings (variables x composantes):")
+    print(loadings)
+
+    # g : coordonnées individus
+    scores = pca.transform(X_std)
+    coords_df = pd.DataFrame(scores, index=villes, columns=[f"Dim{i+1}" for i in range(pca.n_components_)])
+
+    # h : contributions et cos² des individus
+    n = X_std.shape[0]
+    contrib = (scores ** 2) / (n * eig_vals)
+    cos2 = (scores ** 2) / np.sum(scores ** 2, axis=1, keepdims=True)
+    contrib_df = pd.DataFrame(contrib, index=villes, columns=[f"Dim{i+1}" for i in range(pca.n_components_)])
+    cos2_df = pd.DataFrame(cos2, index=villes, columns=[f"Dim{i+1}" for i in range(pca.n_components_)])
+    print("Contributions individus (premières lignes):")
+    print(contrib_df.head())
+    print("Cos² individus (premières lignes):")
+    print(cos2_df.head())
+
+    # i : coordonnées des variables (cercle de corrélation)
+    corvar = pca.components_.T * np.sqrt(var_exp)
+    noms_variables = X_num.columns
+
+# g : mapping des individus (Dim1/Dim2)
 plt.figure(figsize=(7, 6))
 plt.scatter(scores[:, 0], scores[:, 1])
 for i, label in enumerate(villes):
@@ -68,26 +129,14 @@ plt.tight_layout()
 plt.savefig(os.path.join(output_dir, "acp_individus_dim12.png"), dpi=150)
 plt.close()
 
-# h : contributions et cos² des individus
-n = X_std.shape[0]
-contrib = (scores ** 2) / (n * eig_vals)
-cos2 = (scores ** 2) / np.sum(scores ** 2, axis=1, keepdims=True)
-contrib_df = pd.DataFrame(contrib, index=villes, columns=[f"Dim{i+1}" for i in range(pca.n_components_)])
-cos2_df = pd.DataFrame(cos2, index=villes, columns=[f"Dim{i+1}" for i in range(pca.n_components_)])
-print("Contributions individus (premières lignes):")
-print(contrib_df.head())
-print("Cos² individus (premières lignes):")
-print(cos2_df.head())
-
-# i : coordonnées des variables (cercle de corrélation)
-corvar = pca.components_.T * np.sqrt(var_exp)
+# i : cercle de corrélation
 plt.figure(figsize=(6, 6))
 plt.axhline(0, color="grey", linewidth=0.8)
 plt.axvline(0, color="grey", linewidth=0.8)
 circle = plt.Circle((0, 0), 1, color="grey", fill=False, linestyle="--")
 plt.gca().add_artist(circle)
 plt.scatter(corvar[:, 0], corvar[:, 1])
-for i, label in enumerate(X_num.columns):
+for i, label in enumerate(noms_variables):
     plt.text(corvar[i, 0], corvar[i, 1], label, fontsize=8)
 plt.xlabel("Dim1")
 plt.ylabel("Dim2")
@@ -104,17 +153,15 @@ if os.path.exists(chiens_path):
     # a/b : individus et variables
     races = chiens["Race"]
     vars_cat = chiens[["Taille","Poids","Vitesse","Intelligence","Affection","Agressivité","Fonction","Origine"]]
-    # c : TDC
-    tdc = pd.get_dummies(vars_cat)
-    # d : ACM 8 facteurs
-    mca = prince.MCA(n_components=8, random_state=42)
-    mca = mca.fit(tdc)
+    # c/d : ACM 8 facteurs sur le TDC creux construit à partir des codes des modalités (une seule SVD tronquée)
+    mca = cache.memoiser(analyseCorrespondancesMultiples, vars_cat, k=8)
+    tdc = mca["tableau_disjonctif"]
     # e : valeurs propres
-    eig_mca = mca.eigenvalues_
+    eig_mca = mca["valeurs_propres"]
     print("MCA eigenvalues:", eig_mca)
     # f : coordonnées lignes/colonnes
-    rows_mca = mca.row_coordinates(tdc)
-    cols_mca = mca.column_coordinates(tdc)
+    rows_mca = mca["coord_lignes"]
+    cols_mca = mca["coord_colonnes"]
     # g : mapping Dim1/Dim2
     plt.figure(figsize=(7,6))
     plt.scatter(rows_mca[0], rows_mca[1], alpha=0.6)
@@ -129,8 +176,8 @@ if os.path.exists(chiens_path):
     plt.savefig(os.path.join(output_dir, "acm_races_dim12.png"), dpi=150)
     plt.close()
     # h : cos² lignes/colonnes
-    rows_cos2 = mca.row_cosine_similarities(tdc)
-    cols_cos2 = mca.column_cosine_similarities(tdc)
+    rows_cos2 = mca["cos2_lignes"]
+    cols_cos2 = mca["cos2_colonnes"]
     print("ACM cos² lignes (extrait):")
     print(rows_cos2.head())
     print("ACM cos² colonnes (extrait):")
@@ -138,14 +185,11 @@ if os.path.exists(chiens_path):
 else:
     print("Fichier chiens.csv introuvable dans ./src/data, ACM non exécutée.")
 
-# Bonus : C.A.H. sur les scores ACP (Ward)
-from scipy.cluster.hierarchy import linkage, dendrogram
-Z = linkage(scores, method="ward")
-plt.figure(figsize=(10, 5))
-dendrogram(Z, labels=villes.tolist(), leaf_rotation=90)
-plt.title("CAH (Ward) sur les scores ACP")
-plt.tight_layout()
-plt.savefig(os.path.join(output_dir, "cah_acp.png"), dpi=150)
-plt.close()
-
-
+# Bonus : C.A.H. sur les scores ACP (Ward par chaîne des plus proches voisins ; classification mixte k-means + Ward au-delà de N_CENTRES_PAR_DEFAUT individus)
+arbre = cache.memoiser(classification.cah, scores, n_centres=classification.N_CENTRES_PAR_DEFAUT, graine=42)
+classification.dessinerDendrogramme(arbre, os.path.join(output_dir, "cah_acp.png"), etiquettes=villes.tolist(),
+                                    titre="CAH (Ward) sur les scores ACP")
+classes_villes = classification.couperArbre(arbre, 3)
+print("CAH : description des 3 classes (scores Dim1/Dim2)")
+print(classification.decrireClasses(pd.DataFrame(scores[:, :2], columns=["Dim1", "Dim2"]), classes_villes))
+print(pd.Series(classes_villes, index=villes, name="classe").sort_values())
@@ -0,0 +1,32 @@
+# coding:utf8
+
+# Modules du dépôt dont dépend un script : lecture des instructions import (ast, sans exécuter
+# le code), en suivant les modules du dépôt trouvés de proche en proche. Sert aux empreintes de
+# pipeline.py (tâches) et de cache_resultats.py (résultats mémorisés).
+
+import os
+import ast
+
+RACINE = os.path.dirname(os.path.abspath(__file__))
+
+
+#Fonction pour trouver les modules du dépôt importés (transitivement) par un script
+def modulesImportes(script, racine=RACINE):
+    vus = set()
+    a_lire = [os.path.join(racine, script)]
+    while a_lire:
+        with open(a_lire.pop(), encoding="utf-8") as fichier:
+            arbre = ast.parse(fichier.read())
+        for noeud in ast.walk(arbre):
+            if isinstance(noeud, ast.Import):
+                noms = [alias.name for alias in noeud.names]
+            elif isinstance(noeud, ast.ImportFrom) and noeud.level == 0 and noeud.module:
+                noms = [noeud.module]
+            else:
+                continue
+            for nom in noms:
+                chemin = os.path.join(racine, nom.split(".")[0] + ".py")
+                if nom not in vus and os.path.exists(chemin):
+                    vus.add(nom)
+                    a_lire.append(chemin)
+    return sorted(vus)
@@ -0,0 +1,200 @@
+# coding:utf8
+
+# Moindres carrés ordinaires avec factorisation réutilisée.
+# La matrice X (constante en première colonne) est équilibrée (colonnes divisées par leur norme)
+# puis factorisée une seule fois : X = Q R. Pour un sous-ensemble S de colonnes, la régression
+# se déduit de la seule petite matrice R[:, S] (p x |S|) et du vecteur Q'y : une QR de R[:, S]
+# donne les coefficients, et la somme des carrés des résidus s'obtient à partir de celle du
+# modèle complet, sans revenir aux n observations. Coefficients, erreurs standard, t, p-values,
+# R², AIC et BIC suivent les conventions de statsmodels ; le résumé statsmodels (coûteux) n'est
+# construit que lorsqu'il est demandé. Une colonne linéairement dépendante des précédentes (élément
+# diagonal de R quasi nul) est écartée du modèle, comme dans lm de R, et listée dans colonnes_ecartees.
+# La factorisation peut être mémorisée sur disque (cache_resultats.py) : un même couple (X, y)
+# n'est alors factorisé qu'une fois d'une exécution à l'autre.
+# Les régressions par groupe (une par enseigne, région...) cumulent les équations normales de
+# chaque groupe (X'X et X'y, un np.bincount par couple de colonnes, mémoire en O(n + groupes x p²))
+# et les résolvent toutes en un seul appel numpy.linalg.
+
+import numpy as np
+import pandas as pd
+import scipy.linalg
+import scipy.stats
+
+
+#Classe pour porter les résultats d'un ajustement (mêmes noms d'attributs que statsmodels)
+class ResultatsMCO:
+    def __init__(self, moindres_carres, indices, **resultats):
+        self._moindres_carres = moindres_carres
+        self._indices = indices
+        self._resume = None
+        self.__dict__.update(resultats)
+
+    #Méthode pour construire (une seule fois, à la demande) le résumé statsmodels du même modèle
+    def summary(self):
+        if self._resume is None:
+            import statsmodels.api as sm
+            X = pd.DataFrame(self._moindres_carres.X[:, self._indices], index=self._moindres_carres.index,
+                             columns=self.params.index)
+            self._resume = sm.OLS(self._moindres_carres.y, X).fit().summary()
+        return self._resume
+
+
+#Fonction pour factoriser X équilibrée (X = Q R) et calculer les quantités dont dépendent tous les sous-modèles
+def _factoriser(valeurs, y):
+    echelle = np.linalg.norm(valeurs, axis=0)
+    echelle[echelle == 0] = 1.0
+    Q, R = np.linalg.qr(valeurs / echelle)
+    qty = Q.T @ y
+    residus = y - Q @ qty
+    return {
+        "echelle": echelle,
+        "Q": Q,
+        "R": R,
+        "qty": qty,
+        "rss_complet": float(residus @ residus),
+        "somme_carres_centree": float(np.sum((y - y.mean()) ** 2)),
+        "somme_carres": float(y @ y),
+    }
+
+
+#Fonction pour écarter d'un sous-ensemble les colonnes linéairement dépendantes des précédentes (|R_jj| quasi nul)
+def colonnesIndependantes(R, indices):
+    diagonale = np.abs(np.diag(np.linalg.qr(R[:, indices], mode="r")))
+    tolerance = diagonale.max(initial=0.0) * max(R.shape[0], len(indices)) * np.finfo(float).eps
+    return indices[diagonale > tolerance]
+
+
+#Classe pour factoriser X une fois et ajuster rapidement des modèles emboîtés (sous-ensembles de colonnes)
+class MoindresCarres:
+    def __init__(self, X, y, constante=True, cache=None):
+        X = pd.DataFrame(X)
+        self.noms = (["const"] if constante else []) + [str(c) for c in X.columns]
+        self.index = X.index
+        valeurs = X.to_numpy(dtype=float)
+        if constante:
+            valeurs = np.column_stack([np.ones(len(valeurs)), valeurs])
+        self.X = valeurs
+        self.y = pd.Series(y, index=self.index) if not isinstance(y, pd.Series) else y
+        y = self.y.to_numpy(dtype=float)
+        self.constante = constante
+        self.n = len(y)
+
+        facteurs = _factoriser(valeurs, y) if cache is None else cache.memoiser(_factoriser, valeurs, y)
+        self.__dict__.update(facteurs)
+
+    def _indices(self, colonnes):
+        if colonnes is None:
+            return np.arange(len(self.noms))
+        indices = [self.noms.index(str(c)) for c in colonnes]
+        if self.constante and 0 not in indices:
+            indices = [0] + indices
+        return np.array(indices)
+
+    #Méthode pour ajuster le modèle sur un sous-ensemble de colonnes (None = toutes ; la constante est toujours gardée)
+    def ajuster(self, colonnes=None):
+        demandes = self._indices(colonnes)
+        indices = colonnesIndependantes(self.R, demandes)
+        Q, R = np.linalg.qr(self.R[:, indices])
+        z = Q.T @ self.qty
+        coefficients = scipy.linalg.solve_triangular(R, z) / self.echelle[indices]
+        rss = max(self.rss_complet + float(self.qty @ self.qty - z @ z), 0.0)
+
+        k = len(indices)
+        ddl = self.n - k
+        sigma2 = rss / ddl
+        inverse_R = scipy.linalg.solve_triangular(R, np.eye(k))
+        erreurs = np.sqrt(sigma2 * np.sum(inverse_R ** 2, axis=1)) / self.echelle[indices]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = coefficients / erreurs
+        avec_constante = 0 in indices and self.constante
+        totale = self.somme_carres_centree if avec_constante else self.somme_carres
+        ddl_modele = k - 1 if avec_constante else k
+        r2 = 1 - rss / totale
+        log_vraisemblance = -self.n / 2 * (np.log(2 * np.pi) + np.log(rss / self.n) + 1)
+
+        noms = [self.noms[i] for i in indices]
+        return ResultatsMCO(
+            self, indices,
+            params=pd.Series(coefficients, index=noms),
+            bse=pd.Series(erreurs, index=noms),
+            tvalues=pd.Series(t, index=noms),
+            pvalues=pd.Series(2 * scipy.stats.t.sf(np.abs(t), ddl), index=noms),
+            rsquared=r2,
+            rsquared_adj=1 - (1 - r2) * (self.n - (1 if avec_constante else 0)) / ddl,
+            fvalue=(totale - rss) / ddl_modele / sigma2 if ddl_modele else np.nan,
+            ssr=rss,
+            df_resid=ddl,
+            df_model=ddl_modele,
+            nobs=self.n,
+            llf=log_vraisemblance,
+            aic=-2 * log_vraisemblance + 2 * k,
+            bic=-2 * log_vraisemblance + np.log(self.n) * k,
+            colonnes_ecartees=[self.noms[i] for i in demandes if i not in indices],
+        )
+
+
+#Fonction pour ajuster une régression par groupe (enseigne, région...) en un seul appel : équations normales empilées et résolues en lot
+def regressionsParGroupe(data, cible, colonnes, groupe, constante=True):
+    codes, groupes = pd.factorize(data[groupe], sort=True)
+    garder = codes >= 0
+    X = data.loc[garder, list(colonnes)].to_numpy(dtype=float)
+    if constante:
+        X = np.column_stack([np.ones(len(X)), X])
+    y = data.loc[garder, cible].to_numpy(dtype=float)
+    codes = codes[garder]
+    noms = (["const"] if constante else []) + [str(c) for c in colonnes]
+    echelle = np.abs(X).max(axis=0)
+    echelle[echelle == 0] = 1.0
+    X = X / echelle
+
+    # équations normales cumulées par groupe : aucun tenseur groupes x n_max x p n'est construit
+    effectifs = np.bincount(codes, minlength=len(groupes))
+    n_groupes, p = len(groupes), X.shape[1]
+    XtX = np.empty((n_groupes, p, p))
+    Xty = np.empty((n_groupes, p))
+    for i in range(p):
+        Xty[:, i] = np.bincount(codes, weights=X[:, i] * y, minlength=n_groupes)
+        for j in range(i, p):
+            XtX[:, i, j] = XtX[:, j, i] = np.bincount(codes, weights=X[:, i] * X[:, j], minlength=n_groupes)
+    # rang évalué une seule fois par groupe, sur X'X ramenée à une diagonale unité (D^-1/2 X'X D^-1/2) : les écarts
+    # d'échelle entre colonnes d'un groupe ne comptent plus dans le conditionnement, et le seuil est relatif à la
+    # plus grande valeur propre du groupe. Groupes de rang incomplet (trop peu d'observations, colonne constante...) :
+    # pseudo-inverse
+    diagonale = np.diagonal(XtX, axis1=1, axis2=2)
+    normes = np.sqrt(np.where(diagonale > 0, diagonale, 1.0))
+    equilibree = XtX / (normes[:, :, None] * normes[:, None, :])
+    valeurs_propres = np.linalg.eigvalsh(equilibree)
+    tolerance = valeurs_propres[:, -1:] * p * np.finfo(float).eps
+    k = np.sum(valeurs_propres > tolerance, axis=1)
+    plein_rang = k == p
+    inverses = np.empty_like(XtX)
+    if plein_rang.any():
+        inverses[plein_rang] = np.linalg.solve(equilibree[plein_rang], np.broadcast_to(np.eye(p), XtX[plein_rang].shape))
+    if (~plein_rang).any():
+        inverses[~plein_rang] = np.linalg.pinv(equilibree[~plein_rang], rcond=p * np.finfo(float).eps, hermitian=True)
+    inverses /= normes[:, :, None] * normes[:, None, :]
+    coefficients = np.einsum("gpq,gq->gp", inverses, Xty)
+
+    residus = y - np.einsum("np,np->n", X, coefficients[codes])
+    rss = np.bincount(codes, weights=residus * residus, minlength=n_groupes)
+    ddl = effectifs - k
+    moyennes = np.bincount(codes, weights=y, minlength=len(groupes)) / effectifs
+    totale = np.bincount(codes, weights=(y - moyennes[codes]) ** 2, minlength=len(groupes))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sigma2 = np.where(ddl > 0, rss / np.maximum(ddl, 1), np.nan)
+        erreurs = np.sqrt(sigma2[:, None] * np.diagonal(inverses, axis1=1, axis2=2))
+        t = coefficients / erreurs
+        r2 = 1 - rss / totale if constante else 1 - rss / np.bincount(codes, weights=y ** 2, minlength=len(groupes))
+    pvalues = 2 * scipy.stats.t.sf(np.abs(t), np.maximum(ddl, 1)[:, None])
+
+    return pd.DataFrame({
+        groupe: np.repeat(np.asarray(groupes), p),
+        "variable": np.tile(noms, len(groupes)),
+        "coefficient": (coefficients / echelle).ravel(),
+        "erreur_type": (erreurs / echelle).ravel(),
+        "t": t.ravel(),
+        "pvalue": pvalues.ravel(),
+        "n_obs": np.repeat(effectifs, p),
+        "r2": np.repeat(r2, p),
+        "plein_rang": np.repeat(plein_rang, p),
+    })
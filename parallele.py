@@ -0,0 +1,44 @@
+# coding:utf8
+
+# Répartition de tâches indépendantes sur un pool de processus.
+# Les scripts de session font leur travail au niveau du module (sans garde
+# if __name__ == "__main__") : un pool en mode "spawn" réexécuterait le script entier
+# dans chaque processus. On n'utilise donc le pool qu'avec le démarrage "fork" et on
+# retombe sur une exécution séquentielle ailleurs (Windows) ou si processus <= 1.
+# Un fork ne copie que le fil appelant : si d'autres fils Python tournent (écritures d'Export...),
+# les verrous qu'ils détiennent (imports, E/S) resteraient pris dans les processus fils, qui
+# pourraient se bloquer. L'exécution reste alors séquentielle.
+
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+#Fonction pour connaître le nombre de processus à utiliser (None : tous les cœurs)
+def nombreProcessus(processus=None):
+    if processus is None:
+        processus = os.cpu_count() or 1
+    if "fork" not in multiprocessing.get_all_start_methods() or threading.active_count() > 1:
+        return 1
+    return max(1, int(processus))
+
+
+#Fonction pour créer un pool de processus (démarrage fork), ou None si l'exécution doit rester séquentielle
+def creerPool(processus=None):
+    processus = nombreProcessus(processus)
+    if processus <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=processus, mp_context=multiprocessing.get_context("fork"))
+
+
+#Fonction pour appliquer une fonction à une liste de tâches, en parallèle si possible (résultats dans l'ordre des tâches)
+def repartir(fonction, taches, processus=None, taille_lot=1):
+    taches = list(taches)
+    if len(taches) <= 1:
+        return [fonction(tache) for tache in taches]
+    pool = creerPool(min(nombreProcessus(processus), len(taches)))
+    if pool is None:
+        return [fonction(tache) for tache in taches]
+    with pool:
+        return list(pool.map(fonction, taches, chunksize=taille_lot))
@@ -0,0 +1,271 @@
+# coding:utf8
+
+# Exécution des scripts de session comme un graphe de tâches (DAG).
+# Chaque session est une tâche qui déclare ses entrées (fichiers de data/), ses sorties
+# (dossiers output/sessionN, output/img/sessionN ; "sorties_mode_flux" pour celles qui n'existent
+# qu'avec MODE_FLUX=1) et les caches partagés qu'elle alimente (data/.cache, output/cache/...).
+# Une tâche dépend d'une autre dès que l'une de ses entrées se trouve dans les sorties de l'autre ;
+# les caches n'entrent ni dans les dépendances ni dans le contrôle d'existence des sorties, et
+# supportent des écritures concurrentes (noms temporaires uniques puis renommage atomique).
+# Les tâches sont des scripts entiers et non des étapes : les scripts travaillent au niveau du
+# module, sans fonctions d'étape à appeler séparément, et aucune session ne lit aujourd'hui ce
+# qu'une autre produit. Le graphe n'a donc pas d'arête entre les sessions actuelles ; le gain vient
+# de l'exécution parallèle et du saut des tâches inchangées. L'empreinte d'une tâche couvre le code
+# du script, les modules du dépôt qu'il importe (transitivement), le contenu de ses entrées et
+# les variables d'environnement qui changent son comportement (MODE_FLUX) : une tâche dont
+# l'empreinte n'a pas changé depuis la dernière exécution réussie, et dont les sorties existent,
+# est sautée. L'état est conservé dans output/.pipeline.json.
+# Les tâches prêtes sont lancées en parallèle sur un pool de processus "spawn" avec un processus
+# neuf par tâche (max_tasks_per_child=1) : les scripts travaillent au niveau du module et
+# modifient l'état global (matplotlib, sys.modules), ils ne doivent donc pas partager d'interprète.
+# Comme en exécution manuelle, chaque script tourne depuis le dossier parent du dépôt (chemins
+# "./src/data" et "src/output") ; sa sortie est écrite dans output/journaux/<tâche>.log.
+#
+# Utilisation : python src/pipeline.py [tâches...] [--forcer] [--processus N] [--liste]
+
+import os
+import sys
+import json
+import time
+import runpy
+import hashlib
+import argparse
+import traceback
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from chargement import empreinteFichier
+from modules_depot import modulesImportes
+
+RACINE = os.path.dirname(os.path.abspath(__file__))
+FICHIER_ETAT = os.path.join(RACINE, "output", ".pipeline.json")
+
+# chemins relatifs au dépôt ; "environnement" : variables dont la valeur entre dans l'empreinte
+TACHES = {
+    "session2": {
+        "script": "main_session2.py",
+        "entrees": ["data/resultats-elections-presidentielles-2022-1er-tour.csv"],
+        "sorties": [],
+        "caches": ["data/.cache"],
+        "environnement": ["MODE_FLUX"],
+    },
+    "session3": {
+        "script": "main_session3.py",
+        "entrees": ["data/resultats-elections-presidentielles-2022-1er-tour.csv", "data/island-index.csv"],
+        "sorties": ["output/session3", "output/img/session3"],
+        "caches": ["data/.cache"],
+        "environnement": ["MODE_FLUX"],
+    },
+    "session4": {
+        "script": "main_session4.py",
+        "entrees": [],
+        "sorties": ["output/img/session4"],
+    },
+    "session5": {
+        "script": "main_session5.py",
+        "entrees": ["data/Echantillonnage-100-Echantillons.csv", "data/Loi-normale-Test-1.csv",
+                    "data/Loi-normale-Test-2.csv"],
+        "sorties": ["output/session5"],
+        "caches": ["data/.cache", "output/cache/ajustements"],
+    },
+    "session6": {
+        "script": "main _session6.py",
+        "entrees": ["data/island-index.csv", "data/Le-Monde-HS-Etats-du-monde-2007-2025.csv"],
+        "sorties": ["output/session6", "output/img/session6"],
+        "caches": ["data/.cache"],
+    },
+    "session7": {
+        "script": "main_session7.py",
+        "entrees": ["data/pib-vs-energie.csv"],
+        "sorties": ["output/session7", "output/img/session7"],
+        "caches": ["data/.cache"],
+    },
+    "session8": {
+        "script": "main_session8.py",
+        "entrees": ["data/Socioprofessionnelle-vs-sexe.csv", "data/Echantillonnage-100-Echantillons.csv"],
+        "sorties": ["output/session8"],
+        "caches": ["data/.cache", "output/cache/resultats"],
+    },
+    "session9": {
+        "script": "main_session9.py",
+        "entrees": ["data/france-temperatures.csv", "data/chiens.csv"],
+        "sorties": ["output/img/session9"],
+        "sorties_mode_flux": ["output/session9"],
+        "caches": ["data/.cache", "output/cache/resultats"],
+        "environnement": ["MODE_FLUX"],
+    },
+    "session10": {
+        "script": "main_session10.py",
+        "entrees": ["data/temperature.csv", "data/geomarketing.csv"],
+        "sorties": ["output/session10"],
+        "caches": ["data/.cache", "output/cache/resultats"],
+    },
+}
+
+
+#Fonction pour calculer l'empreinte d'une tâche (code du script et de ses modules, entrées, environnement)
+def empreinteTache(nom, taches=TACHES, racine=RACINE):
+    tache = taches[nom]
+    sha = hashlib.sha256()
+    fichiers = [tache["script"]] + [module + ".py" for module in modulesImportes(tache["script"], racine)]
+    for chemin in fichiers + list(tache["entrees"]):
+        complet = os.path.join(racine, chemin)
+        contenu = empreinteFichier(complet) if os.path.exists(complet) else "absent"
+        sha.update(f"{chemin}\0{contenu}\0".encode("utf-8"))
+    for variable in tache.get("environnement", []):
+        sha.update(f"{variable}={os.environ.get(variable, '')}\0".encode("utf-8"))
+    return sha.hexdigest()
+
+
+#Fonction pour obtenir les sorties d'une tâche dans l'environnement courant (sorties du mode flux comprises si MODE_FLUX=1)
+def sortiesTache(tache):
+    sorties = list(tache["sorties"])
+    if os.environ.get("MODE_FLUX", "0") == "1":
+        sorties += tache.get("sorties_mode_flux", [])
+    return sorties
+
+
+#Fonction pour construire les dépendances : une entrée située dans les sorties d'une autre tâche
+def dependances(taches=TACHES):
+    graphe = {}
+    for nom, tache in taches.items():
+        graphe[nom] = {
+            autre for autre, producteur in taches.items() if autre != nom
+            for entree in tache["entrees"] for sortie in producteur["sorties"] + producteur.get("sorties_mode_flux", [])
+            if os.path.normpath(entree) == os.path.normpath(sortie)
+            or os.path.normpath(entree).startswith(os.path.normpath(sortie) + os.sep)
+        }
+    return graphe
+
+
+#Fonction pour ordonner les tâches de façon compatible avec leurs dépendances (erreur si cycle)
+def ordreTopologique(graphe):
+    ordre, restantes = [], dict(graphe)
+    while restantes:
+        pretes = sorted(nom for nom, amont in restantes.items() if not amont & set(restantes))
+        if not pretes:
+            raise ValueError(f"Dépendances circulaires entre les tâches : {sorted(restantes)}")
+        ordre += pretes
+        for nom in pretes:
+            del restantes[nom]
+    return ordre
+
+
+def _lire_etat(chemin):
+    try:
+        with open(chemin, encoding="utf-8") as fichier:
+            return json.load(fichier)
+    except (OSError, ValueError):
+        return {}
+
+
+def _ecrire_etat(chemin, etat):
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    provisoire = chemin + ".tmp"
+    with open(provisoire, "w", encoding="utf-8") as fichier:
+        json.dump(etat, fichier, indent=2, sort_keys=True)
+    os.replace(provisoire, chemin)
+
+
+#Fonction exécutée dans un processus neuf : lance un script depuis le dossier parent du dépôt
+def executerScript(script, racine, journal):
+    os.chdir(os.path.dirname(racine))
+    sys.path.insert(0, racine)
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    debut = time.perf_counter()
+    with open(journal, "w", encoding="utf-8") as sortie, \
+            contextlib.redirect_stdout(sortie), contextlib.redirect_stderr(sortie):
+        try:
+            runpy.run_path(os.path.join(racine, script), run_name="__main__")
+        except BaseException:
+            traceback.print_exc()
+            raise RuntimeError(f"{script} a échoué (voir {journal})") from None
+    return time.perf_counter() - debut
+
+
+#Fonction pour exécuter le graphe : tâches sautées si inchangées, tâches prêtes lancées en parallèle
+def executer(noms=None, forcer=False, processus=None, taches=TACHES, racine=RACINE, fichier_etat=None):
+    fichier_etat = fichier_etat or os.path.join(racine, "output", ".pipeline.json")
+    dossier_journaux = os.path.join(racine, "output", "journaux")
+    os.makedirs(dossier_journaux, exist_ok=True)
+    graphe = dependances(taches)
+    # les tâches demandées entraînent leurs dépendances amont
+    selection = set(taches if not noms else noms)
+    inconnues = selection - set(taches)
+    if inconnues:
+        raise KeyError(f"Tâches inconnues : {sorted(inconnues)}")
+    a_voir = list(selection)
+    while a_voir:
+        for amont in graphe[a_voir.pop()]:
+            if amont not in selection:
+                selection.add(amont)
+                a_voir.append(amont)
+    ordre = [nom for nom in ordreTopologique(graphe) if nom in selection]
+
+    etat = _lire_etat(fichier_etat)
+    bilan = {}
+    relancees = set()
+    en_cours = {}
+    processus = processus or os.cpu_count() or 1
+    contexte = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max(1, min(processus, len(ordre) or 1)), mp_context=contexte,
+                             max_tasks_per_child=1) as pool:
+        attente = list(ordre)
+        while attente or en_cours:
+            for nom in list(attente):
+                amont = graphe[nom] & selection
+                if any(bilan.get(a) in ("echec", "annulee") for a in amont):
+                    bilan[nom] = "annulee"
+                    attente.remove(nom)
+                    continue
+                if not all(a in bilan for a in amont):
+                    continue
+                attente.remove(nom)
+                empreinte = empreinteTache(nom, taches, racine)
+                sorties_presentes = all(os.path.exists(os.path.join(racine, s)) for s in sortiesTache(taches[nom]))
+                if not forcer and not amont & relancees and sorties_presentes and etat.get(nom, {}).get("empreinte") == empreinte:
+                    bilan[nom] = "inchangee"
+                    print(f"[{nom}] inchangée, sautée")
+                    continue
+                journal = os.path.join(dossier_journaux, f"{nom}.log")
+                print(f"[{nom}] lancée ({taches[nom]['script']})")
+                en_cours[pool.submit(executerScript, taches[nom]["script"], racine, journal)] = (nom, empreinte)
+            if not en_cours:
+                continue
+            terminees, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+            for futur in terminees:
+                nom, empreinte = en_cours.pop(futur)
+                try:
+                    duree = futur.result()
+                except Exception as erreur:
+                    bilan[nom] = "echec"
+                    etat.pop(nom, None)
+                    print(f"[{nom}] échec : {erreur}")
+                else:
+                    bilan[nom] = "executee"
+                    relancees.add(nom)
+                    etat[nom] = {"empreinte": empreinte, "duree": round(duree, 3), "date": time.strftime("%Y-%m-%dT%H:%M:%S")}
+                    print(f"[{nom}] terminée en {duree:.1f} s")
+                _ecrire_etat(fichier_etat, etat)
+    return bilan
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exécute les scripts de session comme un graphe de tâches.")
+    parser.add_argument("taches", nargs="*", help="tâches à exécuter (par défaut : toutes)")
+    parser.add_argument("--forcer", action="store_true", help="ignorer les empreintes et tout réexécuter")
+    parser.add_argument("--processus", type=int, default=None, help="nombre de processus (par défaut : tous les cœurs)")
+    parser.add_argument("--liste", action="store_true", help="afficher les tâches et leurs dépendances sans rien exécuter")
+    arguments = parser.parse_args()
+    if arguments.liste:
+        graphe = dependances()
+        etat = _lire_etat(FICHIER_ETAT)
+        for nom in ordreTopologique(graphe):
+            a_jour = etat.get(nom, {}).get("empreinte") == empreinteTache(nom)
+            print(f"{nom:10s} {TACHES[nom]['script']:20s} modules={','.join(modulesImportes(TACHES[nom]['script']))} "
+                  f"dépend de={','.join(sorted(graphe[nom])) or '-'} {'à jour' if a_jour else 'à exécuter'}")
+    else:
+        bilan = executer(arguments.taches or None, forcer=arguments.forcer, processus=arguments.processus)
+        print("Bilan :", ", ".join(f"{nom}={statut}" for nom, statut in bilan.items()))
+        sys.exit(1 if "echec" in bilan.values() else 0)
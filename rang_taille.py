@@ -0,0 +1,120 @@
+# coding:utf8
+
+# Analyse rang-taille (loi de Zipf / Pareto) sur des tableaux NumPy, éventuellement projetés en
+# mémoire (np.memmap / .npy ouvert avec mmap_mode) pour les inventaires de plusieurs millions
+# d'objets. Les tailles sont triées une seule fois ; les logarithmes et les sommes utiles aux
+# ajustements sont calculés par blocs vectorisés, sans liste Python intermédiaire.
+#
+# Deux estimations de l'exposant :
+#   - moindres carrés sur log(taille) = a + b log(rang) (exposant de Zipf = -b) ;
+#   - maximum de vraisemblance de la queue de Pareto continue (Clauset, Shalizi & Newman 2009) :
+#     alpha(xmin) = 1 + n / somme(log(x / xmin)), xmin choisi parmi une grille de candidats
+#     comme celui qui minimise la distance de Kolmogorov-Smirnov.
+
+import numpy as np
+
+TAILLE_BLOC_PAR_DEFAUT = 1_000_000
+N_CANDIDATS_PAR_DEFAUT = 200
+N_QUEUE_MIN_PAR_DEFAUT = 10
+
+
+#Fonction pour ouvrir un tableau de tailles enregistré sur disque (.npy) sans le charger en mémoire
+def ouvrirTailles(chemin):
+    return np.load(chemin, mmap_mode="r")
+
+
+#Fonction pour trier les tailles par ordre décroissant (NaN écartés) ; avec chemin_tri, le tri est fait dans un .npy projeté en mémoire
+def trierDecroissant(tailles, chemin_tri=None):
+    if chemin_tri is None:
+        triees = np.sort(np.asarray(tailles, dtype=float))
+    else:
+        triees = np.lib.format.open_memmap(chemin_tri, mode="w+", dtype=float, shape=(len(tailles),))
+        for debut in range(0, len(tailles), TAILLE_BLOC_PAR_DEFAUT):
+            triees[debut:debut + TAILLE_BLOC_PAR_DEFAUT] = tailles[debut:debut + TAILLE_BLOC_PAR_DEFAUT]
+        triees.sort()
+        triees.flush()
+    # np.sort place les NaN en fin : on ne garde que la partie renseignée
+    renseignees = np.searchsorted(triees, np.inf, side="right")
+    return triees[:renseignees][::-1]
+
+
+#Fonction pour calculer log(rang) et log(taille) d'une série triée par ordre décroissant
+def logRangTaille(tailles_decroissantes):
+    log_rangs = np.log(np.arange(1, len(tailles_decroissantes) + 1, dtype=float))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_tailles = np.log(tailles_decroissantes)
+    return log_rangs, log_tailles
+
+
+#Fonction pour ajuster log(taille) = ordonnee + pente * log(rang) par moindres carrés (sommes accumulées par blocs)
+def ajustementMCO(tailles_decroissantes, taille_bloc=TAILLE_BLOC_PAR_DEFAUT):
+    n = 0
+    sx = sy = sxx = sxy = syy = 0.0
+    for debut in range(0, len(tailles_decroissantes), taille_bloc):
+        bloc = np.asarray(tailles_decroissantes[debut:debut + taille_bloc], dtype=float)
+        x = np.log(np.arange(debut + 1, debut + len(bloc) + 1, dtype=float))
+        garder = bloc > 0
+        x, y = x[garder], np.log(bloc[garder])
+        n += len(x)
+        sx += x.sum()
+        sy += y.sum()
+        sxx += x @ x
+        sxy += x @ y
+        syy += y @ y
+    cxx = sxx - sx * sx / n
+    cxy = sxy - sx * sy / n
+    cyy = syy - sy * sy / n
+    pente = cxy / cxx
+    return {
+        "pente": pente,
+        "ordonnee": (sy - pente * sx) / n,
+        "r2": cxy * cxy / (cxx * cyy),
+        "exposant_zipf": -pente,
+        "n": n,
+    }
+
+
+def _distance_ks(queue, xmin, alpha):
+    # queue triée par ordre croissant ; distance entre fonction de répartition empirique et Pareto ajustée
+    m = len(queue)
+    theorique = 1.0 - (queue / xmin) ** (1.0 - alpha)
+    empirique_haut = np.arange(1, m + 1) / m
+    return max(np.max(empirique_haut - theorique), np.max(theorique - (empirique_haut - 1.0 / m)))
+
+
+#Fonction pour estimer l'exposant de Pareto par maximum de vraisemblance avec recherche de xmin (méthode de Clauset)
+def ajustementMV(tailles_decroissantes, n_candidats=N_CANDIDATS_PAR_DEFAUT, n_queue_min=N_QUEUE_MIN_PAR_DEFAUT,
+                 taille_bloc=TAILLE_BLOC_PAR_DEFAUT):
+    croissantes = tailles_decroissantes[::-1]
+    croissantes = croissantes[np.searchsorted(croissantes, 0.0, side="right"):]
+    n = len(croissantes)
+    # somme des log(x) de chaque queue x[k:], par somme cumulée inverse calculée bloc par bloc
+    sommes_log = np.empty(n + 1)
+    sommes_log[n] = 0.0
+    for fin in range(n, 0, -taille_bloc):
+        debut = max(0, fin - taille_bloc)
+        bloc = np.log(np.asarray(croissantes[debut:fin], dtype=float))
+        sommes_log[debut:fin] = sommes_log[fin] + np.cumsum(bloc[::-1])[::-1]
+
+    # grille de candidats : valeurs distinctes réparties sur les quantiles, queue d'au moins n_queue_min éléments
+    positions = np.unique(np.linspace(0, max(0, n - n_queue_min), n_candidats).astype(np.int64))
+    positions = np.unique(np.searchsorted(croissantes, croissantes[positions], side="left"))
+    xmins = np.asarray(croissantes[positions], dtype=float)
+    n_queues = n - positions
+    with np.errstate(divide="ignore", invalid="ignore"):
+        alphas = 1.0 + n_queues / (sommes_log[positions] - n_queues * np.log(xmins))
+
+    meilleur = None
+    for position, xmin, alpha in zip(positions, xmins, alphas):
+        if not np.isfinite(alpha):
+            continue
+        ks = _distance_ks(np.asarray(croissantes[position:], dtype=float), xmin, alpha)
+        if meilleur is None or ks < meilleur["ks"]:
+            meilleur = {"alpha": alpha, "xmin": xmin, "ks": ks, "n_queue": int(n - position)}
+    if meilleur is None:
+        return {"alpha": np.nan, "xmin": np.nan, "ks": np.nan, "n_queue": 0, "erreur_type": np.nan,
+                "exposant_zipf": np.nan}
+    meilleur["erreur_type"] = (meilleur["alpha"] - 1.0) / np.sqrt(meilleur["n_queue"])
+    # taille ~ rang^(-1 / (alpha - 1)) dans la queue
+    meilleur["exposant_zipf"] = 1.0 / (meilleur["alpha"] - 1.0)
+    return meilleur
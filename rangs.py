@@ -0,0 +1,229 @@
+# coding:utf8
+
+# Moteur de classements pour des panels unités x années (États du monde, territoires...).
+# Les rangs de toutes les colonnes sont obtenus par un seul argsort sur la matrice
+# complète (rang 1 = plus grande valeur, unités sans valeur non classées, égalités départagées
+# par nom décroissant comme ordrePopulation). Les concordances Spearman et Kendall de toutes
+# les paires de colonnes sont calculées en lot : pour chaque paire, seules les unités classées
+# dans les deux colonnes sont comparées. L'ajout d'une colonne (nouvelle année) ne calcule
+# que ses rangs et ses concordances avec les colonnes existantes.
+#
+# Le tau-b de Kendall est obtenu en O(n log n) (méthode de Knight) : tri selon x, puis comptage
+# des inversions de y par fusions successives, toutes les paires d'un lot étant fusionnées
+# ensemble ; les égalités et la p-value asymptotique suivent scipy.stats.kendalltau.
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import scipy.stats
+
+# Même interface que les résultats de scipy.stats.spearmanr / kendalltau
+Correlation = namedtuple("Correlation", ["statistic", "pvalue"])
+
+PAIRES_PAR_LOT = 256
+
+
+#Fonction pour classer chaque colonne d'une matrice par ordre décroissant (rangs 1..k, NaN si valeur absente)
+def rangsDecroissants(valeurs, ordre_unites=None):
+    valeurs = np.asarray(valeurs, dtype=float)
+    if ordre_unites is None:
+        ordre_unites = np.arange(valeurs.shape[0])
+    # tri stable sur les lignes pré-ordonnées : les égalités gardent l'ordre ordre_unites
+    cles = -valeurs[ordre_unites]
+    ordre = ordre_unites[np.argsort(cles, axis=0, kind="stable")]
+    rangs = np.full(valeurs.shape, np.nan)
+    np.put_along_axis(rangs, ordre, np.arange(1, valeurs.shape[0] + 1, dtype=float)[:, None], axis=0)
+    rangs[np.isnan(valeurs)] = np.nan
+    return rangs
+
+
+#Fonction pour reclasser des rangs sur les seules unités communes à deux colonnes (lots de paires)
+def rangsCommuns(a, b):
+    commun = ~np.isnan(a) & ~np.isnan(b)
+    a = np.where(commun, a, np.inf)
+    b = np.where(commun, b, np.inf)
+    ra = np.argsort(np.argsort(a, axis=1), axis=1).astype(float) + 1
+    rb = np.argsort(np.argsort(b, axis=1), axis=1).astype(float) + 1
+    ra[~commun] = np.nan
+    rb[~commun] = np.nan
+    return ra, rb, commun.sum(axis=1)
+
+
+#Fonction pour calculer rho de Spearman et p-value (loi de Student, comme scipy) pour un lot de paires
+def spearmanLot(a, b):
+    ra, rb, n = rangsCommuns(a, b)
+    ra = ra - np.nanmean(ra, axis=1, keepdims=True)
+    rb = rb - np.nanmean(rb, axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rho = np.nansum(ra * rb, axis=1) / np.sqrt(np.nansum(ra * ra, axis=1) * np.nansum(rb * rb, axis=1))
+        rho = np.clip(rho, -1.0, 1.0)
+        t = rho * np.sqrt((n - 2) / ((1.0 - rho) * (1.0 + rho)))
+    return rho, 2 * scipy.stats.t.sf(np.abs(t), n - 2)
+
+
+def _sommes_egalites(tries, valides):
+    # Pour chaque élément, k = nombre d'éléments égaux qui le précèdent dans la série triée ;
+    # les sommes sur les groupes d'égalités de t(t-1)/2, t(t-1)(t-2) et t(t-1)(2t+5) se télescopent en sommes sur k.
+    debut = np.ones(tries.shape, dtype=bool)
+    debut[:, 1:] = tries[:, 1:] != tries[:, :-1]
+    indices = np.broadcast_to(np.arange(tries.shape[1]), tries.shape)
+    k = (indices - np.maximum.accumulate(np.where(debut, indices, 0), axis=1)).astype(float)
+    k[~valides] = 0
+    return k.sum(axis=1), (3 * k * (k - 1)).sum(axis=1), (6 * k * k + 12 * k).sum(axis=1)
+
+
+def _decalages(forme, hauteur):
+    # décalage propre à chaque (ligne, bloc) pour faire un seul searchsorted sur tous les blocs aplatis
+    return (np.arange(forme[0] * forme[1]).reshape(forme[0], forme[1], 1) * hauteur)
+
+
+#Fonction pour trier chaque ligne d'entiers par fusions successives en comptant les inversions (paires i < j avec y_i > y_j)
+def inversionsFusion(y):
+    y = np.asarray(y, dtype=np.int64)
+    lignes, n = y.shape
+    largeur_totale = 1 << max(0, int(n - 1).bit_length())
+    hauteur = int(y.max(initial=0)) + 2
+    # complétion à une puissance de deux par des valeurs maximales placées en fin : aucune inversion ajoutée
+    y = np.concatenate([y, np.full((lignes, largeur_totale - n), hauteur - 1, dtype=np.int64)], axis=1)
+    inversions = np.zeros(lignes, dtype=np.int64)
+    largeur = 1
+    while largeur < largeur_totale:
+        blocs = y.reshape(lignes, -1, 2, largeur)
+        gauche = blocs[:, :, 0, :] + _decalages(blocs.shape, hauteur)
+        droite = blocs[:, :, 1, :] + _decalages(blocs.shape, hauteur)
+        debuts = (np.arange(lignes * blocs.shape[1]) * largeur).reshape(lignes, -1, 1)
+        # éléments de gauche <= chaque élément de droite (et < pour placer les éléments de gauche)
+        droite_dans_gauche = np.searchsorted(gauche.ravel(), droite.ravel(), side="right").reshape(droite.shape) - debuts
+        gauche_dans_droite = np.searchsorted(droite.ravel(), gauche.ravel(), side="left").reshape(gauche.shape) - debuts
+        inversions += (largeur - droite_dans_gauche).sum(axis=(1, 2))
+        rang = np.arange(largeur)
+        fusion = np.empty_like(blocs.reshape(lignes, -1, 2 * largeur))
+        np.put_along_axis(fusion, rang + gauche_dans_droite, blocs[:, :, 0, :], axis=2)
+        np.put_along_axis(fusion, rang + droite_dans_gauche, blocs[:, :, 1, :], axis=2)
+        y = fusion.reshape(lignes, -1)
+        largeur *= 2
+    return inversions, y[:, :n]
+
+
+#Fonction pour calculer tau-b de Kendall et p-value (approximation normale corrigée des égalités) par tri-fusion, pour un lot de paires
+def kendallTri(x, y, ordre=None):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valides = ~np.isnan(x) & ~np.isnan(y)
+    n = valides.sum(axis=1).astype(float)
+    # unités incomplètes rejetées en fin de tri (x = +inf, y = max + 1)
+    x = np.where(valides, x, np.inf)
+    y = np.where(valides, y, np.inf)
+    if ordre is None:
+        ordre = np.lexsort((y, x), axis=1)
+    else:
+        # ordre de x déjà connu (partagé entre les paires) : on place simplement les unités incomplètes en fin
+        ordre = np.take_along_axis(ordre, np.argsort(~np.take_along_axis(valides, ordre, axis=1), axis=1, kind="stable"), axis=1)
+    x = np.take_along_axis(x, ordre, axis=1)
+    y = np.take_along_axis(y, ordre, axis=1)
+    if not np.array_equal(y[np.isfinite(y)], np.round(y[np.isfinite(y)])):
+        y = scipy.stats.rankdata(y, method="dense", axis=1)
+    codes = np.where(np.isfinite(y), y, np.nanmax(np.where(np.isfinite(y), y, np.nan), initial=0) + 1).astype(np.int64)
+
+    valides = np.arange(x.shape[1]) < n[:, None]
+    swaps, y_tries = inversionsFusion(codes)
+    xtie, x0, x1 = _sommes_egalites(x, valides)
+    ytie, y0, y1 = _sommes_egalites(y_tries, valides)
+    jointes = np.ones(x.shape, dtype=bool)
+    jointes[:, 1:] = (x[:, 1:] != x[:, :-1]) | (y[:, 1:] != y[:, :-1])
+    ntie = _sommes_egalites(np.cumsum(jointes, axis=1), valides)[0]
+
+    tot = n * (n - 1) / 2
+    con_moins_dis = tot - xtie - ytie + ntie - 2 * swaps
+    m = n * (n - 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tau = np.clip(con_moins_dis / np.sqrt((tot - xtie) * (tot - ytie)), -1.0, 1.0)
+        variance = ((m * (2 * n + 5) - x1 - y1) / 18 + 2 * xtie * ytie / m
+                    + x0 * y0 / (9 * m * (n - 2)))
+        z = con_moins_dis / np.sqrt(variance)
+    return tau, 2 * scipy.stats.norm.sf(np.abs(z))
+
+
+#Classe pour classer toutes les colonnes d'un panel et comparer tous les classements entre eux
+class PanelRangs:
+    def __init__(self, valeurs, unites, colonnes):
+        self.unites = list(unites)
+        self.colonnes = []
+        self.valeurs = np.empty((len(self.unites), 0))
+        self.rangs = np.empty((len(self.unites), 0))
+        self.ordres = np.empty((len(self.unites), 0), dtype=np.intp)
+        self.resultats = {mesure: np.empty((0, 0)) for mesure in ("spearman", "p_spearman", "kendall", "p_kendall")}
+        # égalités départagées par nom décroissant (comme le tri de listes [valeur, nom] en ordre inverse)
+        self._ordre_unites = np.argsort(np.array(self.unites, dtype=str), kind="stable")[::-1].copy()
+        self.ajouterColonnes(valeurs, colonnes)
+
+    @classmethod
+    def depuisDataFrame(cls, df, colonne_unites, colonnes):
+        valeurs = df[colonnes].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        return cls(valeurs, df[colonne_unites], colonnes)
+
+    #Méthode pour ajouter des colonnes : seuls leurs rangs et leurs paires avec les autres colonnes sont calculés
+    def ajouterColonnes(self, valeurs, colonnes):
+        valeurs = np.asarray(valeurs, dtype=float).reshape(len(self.unites), -1)
+        anciennes = len(self.colonnes)
+        self.colonnes += list(colonnes)
+        self.valeurs = np.hstack([self.valeurs, valeurs])
+        nouveaux_rangs = rangsDecroissants(valeurs, self._ordre_unites)
+        self.rangs = np.hstack([self.rangs, nouveaux_rangs])
+        # ordre de chaque nouvelle colonne (unités non classées en fin), trié une seule fois et partagé par toutes ses paires
+        nouveaux_ordres = np.argsort(np.where(np.isnan(nouveaux_rangs), np.inf, nouveaux_rangs), axis=0, kind="stable")
+        self.ordres = np.hstack([self.ordres, nouveaux_ordres])
+
+        total = len(self.colonnes)
+        for mesure, ancienne in self.resultats.items():
+            matrice = np.full((total, total), np.nan)
+            matrice[:anciennes, :anciennes] = ancienne
+            self.resultats[mesure] = matrice
+        paires = [(i, j) for j in range(anciennes, total) for i in range(j + 1)]
+        for debut in range(0, len(paires), PAIRES_PAR_LOT):
+            lot = paires[debut:debut + PAIRES_PAR_LOT]
+            i, j = np.array(lot).T
+            a, b = self.rangs[:, i].T, self.rangs[:, j].T
+            for (stat, p), (nom, nom_p) in zip([spearmanLot(a, b), kendallTri(a, b, self.ordres[:, i].T)],
+                                                [("spearman", "p_spearman"), ("kendall", "p_kendall")]):
+                self.resultats[nom][i, j] = self.resultats[nom][j, i] = stat
+                self.resultats[nom_p][i, j] = self.resultats[nom_p][j, i] = p
+
+    def ajouterColonne(self, valeurs, colonne):
+        self.ajouterColonnes(np.asarray(valeurs, dtype=float)[:, None], [colonne])
+
+    #Méthode pour obtenir le classement d'une colonne sous forme de liste [rang, unité] triée par rang
+    def classement(self, colonne):
+        k = self.colonnes.index(colonne)
+        classes = np.flatnonzero(~np.isnan(self.rangs[:, k]))
+        classes = classes[np.argsort(self.rangs[classes, k])]
+        return [[int(self.rangs[u, k]), self.unites[u]] for u in classes]
+
+    #Méthode pour obtenir les rangs de deux colonnes sur les unités classées dans les deux (triés par la première)
+    def rangsApparies(self, colonne_a, colonne_b):
+        a = self.rangs[:, self.colonnes.index(colonne_a)]
+        b = self.rangs[:, self.colonnes.index(colonne_b)]
+        commun = np.flatnonzero(~np.isnan(a) & ~np.isnan(b))
+        commun = commun[np.argsort(a[commun])]
+        return a[commun].astype(int), b[commun].astype(int)
+
+    #Méthode pour obtenir une matrice colonnes x colonnes ("spearman", "p_spearman", "kendall", "p_kendall")
+    def matrice(self, mesure="spearman", colonnes=None):
+        colonnes = self.colonnes if colonnes is None else list(colonnes)
+        indices = [self.colonnes.index(c) for c in colonnes]
+        return pd.DataFrame(self.resultats[mesure][np.ix_(indices, indices)], index=colonnes, columns=colonnes)
+
+    #Méthode pour obtenir les concordances de plusieurs colonnes avec une colonne de référence
+    def concordanceVsReference(self, reference, colonnes):
+        r = self.colonnes.index(reference)
+        resultats = {}
+        for colonne in colonnes:
+            if colonne == reference:
+                continue
+            k = self.colonnes.index(colonne)
+            resultats[colonne] = {
+                "spearman": Correlation(self.resultats["spearman"][r, k], self.resultats["p_spearman"][r, k]),
+                "kendall": Correlation(self.resultats["kendall"][r, k], self.resultats["p_kendall"][r, k]),
+            }
+        return resultats
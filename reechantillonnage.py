@@ -0,0 +1,181 @@
+# coding:utf8
+
+# Inférence par rééchantillonnage (bootstrap et permutations).
+# Les répliques sont générées par lots avec un numpy.random.Generator initialisé par une
+# graine : chaque lot reçoit sa propre graine dérivée (SeedSequence.spawn), si bien que les
+# résultats ne dépendent pas du nombre de processus. Dans un lot, les indices rééchantillonnés
+# forment une matrice (répliques x observations) et la statistique est évaluée d'un coup sur
+# toutes les répliques. Les lots sont répartis sur un pool de processus (parallele.py).
+#
+# Statistiques disponibles (première dimension = répliques) :
+#   - données appariées x, y de forme (B, n) : pente, pearson, spearman, kendall ;
+#   - tableaux de contingence de forme (B, R, C) : chi2Tables, phi2Tables.
+
+import numpy as np
+import scipy.stats
+
+from parallele import repartir
+
+N_REPLIQUES_PAR_DEFAUT = 10000
+TAILLE_LOT_PAR_DEFAUT = 500
+
+
+#Fonction pour calculer la pente des moindres carrés y ~ x de chaque réplique
+def pente(x, y):
+    dx = x - x.mean(axis=1, keepdims=True)
+    dy = y - y.mean(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+
+
+#Fonction pour calculer le coefficient de corrélation de Pearson de chaque réplique
+def pearson(x, y):
+    dx = x - x.mean(axis=1, keepdims=True)
+    dy = y - y.mean(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (dx * dy).sum(axis=1) / np.sqrt((dx * dx).sum(axis=1) * (dy * dy).sum(axis=1))
+
+
+#Fonction pour calculer le rho de Spearman de chaque réplique (Pearson sur les rangs moyens, comme scipy)
+def spearman(x, y):
+    return pearson(scipy.stats.rankdata(x, axis=1), scipy.stats.rankdata(y, axis=1))
+
+
+#Fonction pour calculer le tau-b de Kendall de chaque réplique (matrices de signes, par sous-lots pour borner la mémoire)
+def kendall(x, y, cellules_max=20_000_000):
+    n = x.shape[1]
+    pas = max(1, cellules_max // max(n * n, 1))
+    resultats = np.empty(x.shape[0])
+    for debut in range(0, x.shape[0], pas):
+        bx = x[debut:debut + pas]
+        by = y[debut:debut + pas]
+        sx = (bx[:, :, None] > bx[:, None, :]).astype(np.int8) - (bx[:, :, None] < bx[:, None, :])
+        sy = (by[:, :, None] > by[:, None, :]).astype(np.int8) - (by[:, :, None] < by[:, None, :])
+        concordance = np.einsum("bij,bij->b", sx, sy, dtype=np.int64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            resultats[debut:debut + pas] = concordance / np.sqrt(
+                np.count_nonzero(sx, axis=(1, 2)) * np.count_nonzero(sy, axis=(1, 2)).astype(float)
+            )
+    return resultats
+
+
+#Fonction pour calculer le chi2 d'indépendance de chaque tableau de contingence
+def chi2Tables(tables):
+    tables = tables.astype(float)
+    n = tables.sum(axis=(1, 2), keepdims=True)
+    attendus = tables.sum(axis=2, keepdims=True) * tables.sum(axis=1, keepdims=True) / n
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.nansum((tables - attendus) ** 2 / attendus, axis=(1, 2))
+
+
+#Fonction pour calculer le phi2 de Pearson (chi2 / effectif) de chaque tableau de contingence
+def phi2Tables(tables):
+    return chi2Tables(tables) / tables.sum(axis=(1, 2))
+
+
+#Fonction pour tirer des tableaux de marges fixes (équivalent à permuter les modalités colonnes entre individus)
+def tablesMargesFixes(table, taille, rng):
+    table = np.asarray(table, dtype=np.int64)
+    reste_lignes = np.broadcast_to(table.sum(axis=1), (taille, table.shape[0])).copy()
+    tables = np.zeros((taille,) + table.shape, dtype=np.int64)
+    for j, total_colonne in enumerate(table.sum(axis=0)[:-1]):
+        a_placer = np.full(taille, total_colonne, dtype=np.int64)
+        restant = reste_lignes.sum(axis=1)
+        for i in range(table.shape[0]):
+            # loi hypergéométrique conditionnelle : cellule (i, j) sachant les cellules déjà tirées
+            restant = restant - reste_lignes[:, i]
+            if i < table.shape[0] - 1:
+                tirage = rng.hypergeometric(reste_lignes[:, i], np.maximum(restant, 0), a_placer)
+            else:
+                tirage = a_placer
+            tables[:, i, j] = tirage
+            a_placer = a_placer - tirage
+        reste_lignes -= tables[:, :, j]
+    tables[:, :, -1] = reste_lignes
+    return tables
+
+
+def _lot(tache):
+    mode, statistique, donnees, taille, graine = tache
+    rng = np.random.default_rng(graine)
+    if mode == "bootstrap":
+        x, y = donnees
+        indices = rng.integers(0, len(x), size=(taille, len(x)))
+        return statistique(x[indices], y[indices])
+    if mode == "permutation":
+        x, y = donnees
+        indices = rng.permuted(np.tile(np.arange(len(y)), (taille, 1)), axis=1)
+        return statistique(np.broadcast_to(x, (taille, len(x))), y[indices])
+    table = donnees
+    if mode == "multinomial":
+        tirages = rng.multinomial(table.sum(), (table / table.sum()).ravel(), size=taille)
+        return statistique(tirages.reshape((taille,) + table.shape))
+    return statistique(tablesMargesFixes(table, taille, rng))
+
+
+#Fonction pour générer toutes les répliques d'une statistique, lot par lot, en parallèle
+def repliques(mode, statistique, donnees, n_repliques=N_REPLIQUES_PAR_DEFAUT, graine=None,
+              taille_lot=TAILLE_LOT_PAR_DEFAUT, processus=None):
+    tailles = [taille_lot] * (n_repliques // taille_lot)
+    if n_repliques % taille_lot:
+        tailles.append(n_repliques % taille_lot)
+    graines = np.random.SeedSequence(graine).spawn(len(tailles))
+    taches = [(mode, statistique, donnees, taille, g) for taille, g in zip(tailles, graines)]
+    return np.concatenate(repartir(_lot, taches, processus))
+
+
+def _intervalle(estimation, valeurs, niveau):
+    alpha = (1 - niveau) / 2
+    bas, haut = np.nanpercentile(valeurs, [100 * alpha, 100 * (1 - alpha)])
+    return {"estimation": float(estimation), "ic_bas": float(bas), "ic_haut": float(haut),
+            "erreur_type": float(np.nanstd(valeurs, ddof=1)), "niveau": niveau, "n_repliques": len(valeurs)}
+
+
+def _pvalue(observee, valeurs, alternative):
+    valeurs = valeurs[~np.isnan(valeurs)]
+    if alternative == "superieure":
+        extremes = np.sum(valeurs >= observee)
+    elif alternative == "inferieure":
+        extremes = np.sum(valeurs <= observee)
+    else:
+        extremes = np.sum(np.abs(valeurs) >= abs(observee))
+    return {"statistique": float(observee), "pvalue": float((extremes + 1) / (len(valeurs) + 1)),
+            "alternative": alternative, "n_repliques": len(valeurs)}
+
+
+#Fonction pour obtenir l'intervalle de confiance bootstrap (percentiles) d'une statistique sur données appariées
+def bootstrap(statistique, x, y, n_repliques=N_REPLIQUES_PAR_DEFAUT, niveau=0.95, graine=None,
+              taille_lot=TAILLE_LOT_PAR_DEFAUT, processus=None):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    estimation = statistique(x[None, :], y[None, :])[0]
+    valeurs = repliques("bootstrap", statistique, (x, y), n_repliques, graine, taille_lot, processus)
+    return _intervalle(estimation, valeurs, niveau)
+
+
+#Fonction pour obtenir la p-value de permutation d'une statistique d'association sur données appariées
+def permutation(statistique, x, y, n_repliques=N_REPLIQUES_PAR_DEFAUT, alternative="bilaterale", graine=None,
+                taille_lot=TAILLE_LOT_PAR_DEFAUT, processus=None):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    observee = statistique(x[None, :], y[None, :])[0]
+    valeurs = repliques("permutation", statistique, (x, y), n_repliques, graine, taille_lot, processus)
+    return _pvalue(observee, valeurs, alternative)
+
+
+#Fonction pour obtenir l'intervalle de confiance bootstrap d'une statistique de tableau (tirage multinomial des individus)
+def bootstrapContingence(table, statistique=chi2Tables, n_repliques=N_REPLIQUES_PAR_DEFAUT, niveau=0.95, graine=None,
+                         taille_lot=TAILLE_LOT_PAR_DEFAUT, processus=None):
+    table = np.asarray(table, dtype=np.int64)
+    estimation = statistique(table[None])[0]
+    valeurs = repliques("multinomial", statistique, table, n_repliques, graine, taille_lot, processus)
+    return _intervalle(estimation, valeurs, niveau)
+
+
+#Fonction pour obtenir la p-value de permutation (marges fixes) d'une statistique de tableau de contingence
+def permutationContingence(table, statistique=chi2Tables, n_repliques=N_REPLIQUES_PAR_DEFAUT, graine=None,
+                           taille_lot=TAILLE_LOT_PAR_DEFAUT, processus=None):
+    table = np.asarray(table, dtype=np.int64)
+    observee = statistique(table[None])[0]
+    valeurs = repliques("marges", statistique, table, n_repliques, graine, taille_lot, processus)
+    return _pvalue(observee, valeurs, "superieure")
@@ -0,0 +1,76 @@
+# coding:utf8
+
+# Régressions linéaires simples en lot.
+# Les blocs de colonnes (une colonne par année) sont convertis en numérique une seule fois,
+# puis pente, ordonnée à l'origine, r, p-value et erreur standard sont calculés pour toutes
+# les années en même temps par des réductions NumPy masquées (un couple n'est retenu que si
+# x et y sont renseignés). Les mêmes formules servent aux fenêtres glissantes d'années
+# (observations regroupées sur plusieurs années consécutives) et aux ajustements log-log.
+
+import numpy as np
+import pandas as pd
+import scipy.stats
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+#Fonction pour extraire et convertir en numérique un bloc de colonnes préfixe + année
+def blocNumerique(data, prefixe, annees):
+    colonnes = [f"{prefixe}{annee}" for annee in annees]
+    bloc = data.reindex(columns=colonnes).apply(pd.to_numeric, errors="coerce")
+    return bloc.to_numpy(dtype=float)
+
+
+#Fonction pour calculer les régressions y ~ x de chaque colonne (ou fenêtre de colonnes) d'un coup
+def regressionsLot(X, Y, etiquettes, fenetre=1, loglog=False):
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    if loglog:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            X = np.where(X > 0, np.log(X), np.nan)
+            Y = np.where(Y > 0, np.log(Y), np.nan)
+
+    # (unités, années) -> (fenêtres, unités x fenêtre) : chaque ligne regroupe les observations d'une fenêtre
+    X = sliding_window_view(X, fenetre, axis=1).transpose(1, 0, 2).reshape(X.shape[1] - fenetre + 1, -1)
+    Y = sliding_window_view(Y, fenetre, axis=1).transpose(1, 0, 2).reshape(Y.shape[1] - fenetre + 1, -1)
+
+    masque = ~np.isnan(X) & ~np.isnan(Y)
+    n = masque.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        moyenne_x = np.where(masque, X, 0).sum(axis=1) / n
+        moyenne_y = np.where(masque, Y, 0).sum(axis=1) / n
+        dx = np.where(masque, X - moyenne_x[:, None], 0)
+        dy = np.where(masque, Y - moyenne_y[:, None], 0)
+        sxx = (dx * dx).sum(axis=1)
+        syy = (dy * dy).sum(axis=1)
+        sxy = (dx * dy).sum(axis=1)
+
+        pente = sxy / sxx
+        ordonnee = moyenne_y - pente * moyenne_x
+        r = np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+        r = np.where((sxx == 0) | (syy == 0), 0.0, r)
+        ddl = n - 2
+        t = r * np.sqrt(ddl / ((1.0 - r) * (1.0 + r)))
+        pvalue = 2 * scipy.stats.t.sf(np.abs(t), ddl)
+        erreur = np.sqrt((1 - r ** 2) * syy / sxx / ddl)
+
+    # Deux points seulement : même convention que scipy.stats.linregress
+    deux = n == 2
+    pvalue = np.where(deux, np.where(syy == 0, 1.0, 0.0), pvalue)
+    erreur = np.where(deux, 0.0, erreur)
+
+    etiquettes = list(etiquettes)
+    resultats = pd.DataFrame({
+        "annee": etiquettes[fenetre - 1:],
+        "n_obs": n,
+        "slope": pente,
+        "intercept": ordonnee,
+        "rvalue": r,
+        "pvalue": pvalue,
+        "stderr": erreur,
+        "corr_pearson": r,
+    })
+    if fenetre > 1:
+        resultats.insert(1, "annee_debut", etiquettes[:len(etiquettes) - fenetre + 1])
+    # comme dans la boucle d'origine, on écarte les années sans au moins deux couples complets
+    return resultats[resultats["n_obs"] >= 2].reset_index(drop=True)
+
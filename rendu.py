@@ -0,0 +1,147 @@
+# coding:utf8
+
+# Rendu des figures par lots.
+# Les figures sont construites avec l'API objet de matplotlib (Figure + FigureCanvasAgg,
+# sans pyplot ni état global) ; chaque processus garde un gabarit figure/axes par type
+# de graphique et le réutilise d'une image à l'autre. Les tâches sont réparties sur un
+# pool de processus (voir parallele.py). Chaque image est associée à l'empreinte des
+# données tracées, conservée dans un fichier .empreintes.json de son dossier : une image
+# dont les données et les options n'ont pas changé n'est pas redessinée.
+
+import os
+import json
+import hashlib
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from parallele import repartir
+
+FICHIER_EMPREINTES = ".empreintes.json"
+
+TAILLES = {
+    "boxplot": (6, 4),
+    "regression": (8, 5),
+}
+
+# Gabarits figure/axes propres à chaque processus, réutilisés d'un rendu à l'autre
+_gabarits = {}
+
+
+#Fonction pour décrire une boîte à moustaches (série complète, ou statistiques déjà calculées via "stats")
+def tacheBoxplot(chemin, titre, ylabel, serie=None, stats=None):
+    donnees = {"serie": np.asarray(serie, dtype=float)} if stats is None else {"stats": stats}
+    return {"type": "boxplot", "chemin": str(chemin), "donnees": donnees,
+            "options": {"titre": titre, "ylabel": ylabel}}
+
+
+#Fonction pour décrire un nuage de points avec sa droite de régression
+def tacheRegression(chemin, x, y, pente, ordonnee, titre, xlabel, ylabel, taille_points=20):
+    return {"type": "regression", "chemin": str(chemin),
+            "donnees": {"x": np.asarray(x, dtype=float), "y": np.asarray(y, dtype=float)},
+            "options": {"pente": float(pente), "ordonnee": float(ordonnee), "titre": titre,
+                        "xlabel": xlabel, "ylabel": ylabel, "taille_points": taille_points}}
+
+
+#Fonction pour calculer l'empreinte d'une tâche (type, options et octets des données tracées)
+def empreinteTache(tache):
+    sha = hashlib.sha256()
+    sha.update(tache["type"].encode("utf-8"))
+    sha.update(json.dumps(tache["options"], sort_keys=True, default=str).encode("utf-8"))
+    for cle in sorted(tache["donnees"]):
+        valeur = tache["donnees"][cle]
+        sha.update(cle.encode("utf-8"))
+        if isinstance(valeur, np.ndarray):
+            sha.update(str(valeur.shape).encode("utf-8"))
+            sha.update(np.ascontiguousarray(valeur).tobytes())
+        else:
+            sha.update(json.dumps(valeur, sort_keys=True, default=str).encode("utf-8"))
+    return sha.hexdigest()
+
+
+def _gabarit(type_figure):
+    if type_figure not in _gabarits:
+        figure = Figure(figsize=TAILLES[type_figure])
+        FigureCanvasAgg(figure)
+        _gabarits[type_figure] = (figure, figure.add_subplot())
+    figure, axes = _gabarits[type_figure]
+    axes.clear()
+    return figure, axes
+
+
+def _dessiner_boxplot(figure, axes, donnees, options):
+    if "stats" in donnees:
+        axes.bxp([{**donnees["stats"], "fliers": donnees["stats"].get("fliers", [])}])
+    else:
+        axes.boxplot(donnees["serie"])
+    axes.set_title(options["titre"])
+    axes.set_ylabel(options["ylabel"])
+    return {"bbox_inches": "tight"}
+
+
+def _dessiner_regression(figure, axes, donnees, options):
+    x, y = donnees["x"], donnees["y"]
+    axes.scatter(x, y, alpha=0.6, s=options["taille_points"], label="Observations")
+    x_ligne = np.linspace(x.min(), x.max(), 200)
+    axes.plot(x_ligne, options["ordonnee"] + options["pente"] * x_ligne, color="red", label="Droite de régression")
+    axes.set_xlabel(options["xlabel"])
+    axes.set_ylabel(options["ylabel"])
+    axes.set_title(options["titre"])
+    axes.legend()
+    figure.tight_layout()
+    return {}
+
+
+DESSINS = {
+    "boxplot": _dessiner_boxplot,
+    "regression": _dessiner_regression,
+}
+
+
+#Fonction pour dessiner et enregistrer une tâche (exécutée dans un processus du pool)
+def rendreTache(tache):
+    figure, axes = _gabarit(tache["type"])
+    options_sauvegarde = DESSINS[tache["type"]](figure, axes, tache["donnees"], tache["options"])
+    figure.savefig(tache["chemin"], dpi=150, **options_sauvegarde)
+    return tache["chemin"]
+
+
+def _lire_empreintes(dossier):
+    try:
+        with open(os.path.join(dossier, FICHIER_EMPREINTES), "r", encoding="utf-8") as fichier:
+            return json.load(fichier)
+    except (OSError, ValueError):
+        return {}
+
+
+def _ecrire_empreintes(dossier, empreintes):
+    chemin = os.path.join(dossier, FICHIER_EMPREINTES)
+    with open(chemin + ".tmp", "w", encoding="utf-8") as fichier:
+        json.dump(empreintes, fichier, indent=0, sort_keys=True)
+    os.replace(chemin + ".tmp", chemin)
+
+
+#Fonction pour rendre un lot de figures en parallèle, en sautant celles dont les données n'ont pas changé
+def rendre(taches, processus=None, ignorer_inchanges=True):
+    empreintes = {}
+    a_rendre = []
+    statuts = []
+    for tache in taches:
+        dossier, nom = os.path.split(os.path.abspath(tache["chemin"]))
+        if dossier not in empreintes:
+            empreintes[dossier] = _lire_empreintes(dossier)
+        empreinte = empreinteTache(tache)
+        inchange = empreintes[dossier].get(nom) == empreinte and os.path.exists(tache["chemin"])
+        if ignorer_inchanges and inchange:
+            statuts.append({"chemin": tache["chemin"], "statut": "inchange"})
+            continue
+        a_rendre.append((tache, dossier, nom, empreinte))
+        statuts.append({"chemin": tache["chemin"], "statut": "rendu"})
+
+    repartir(rendreTache, [tache for tache, _, _, _ in a_rendre], processus, taille_lot=4)
+
+    for _, dossier, nom, empreinte in a_rendre:
+        empreintes[dossier][nom] = empreinte
+    for dossier in {dossier for _, dossier, _, _ in a_rendre}:
+        _ecrire_empreintes(dossier, empreintes[dossier])
+    return statuts
@@ -0,0 +1,375 @@
+# coding:utf8
+
+# Sélection de variables pour les régressions linéaires (géomarketing).
+# Toutes les recherches partent de la factorisation X = QR de moindres_carres.MoindresCarres :
+#   - pas à pas (avant / arrière) : à chaque étape, tous les candidats sont évalués d'un coup.
+#     Ajouter la colonne j revient à une mise à jour de rang un de la base orthonormée du modèle
+#     courant (RSS - (u_j'Q'y)²), retirer j augmente la RSS de beta_j² / [(X'X)^-1]_jj ;
+#   - meilleurs sous-ensembles : énumération complète tant que le nombre de sous-ensembles reste sous
+#     enumeration_max (équations normales réduites à la constante, systèmes résolus par lots de
+#     plusieurs centaines de milliers) ; au-delà, séparation et évaluation (leaps and bounds : la RSS
+#     d'un ensemble minore celle de tous ses sous-ensembles) avec un budget total de noeuds, le
+#     résultat étant alors marqué exhaustif=False si le budget est atteint. Les lots et les branches
+#     de premier niveau sont répartis sur un pool de processus (parallele.py) ;
+#   - chemin du LASSO par descente de coordonnées sur la matrice de Gram (variables centrées-réduites),
+#     le paramètre étant choisi par validation croisée (plis répartis sur le pool) ou par AIC / BIC.
+# Critères : AIC et BIC (conventions statsmodels), "cv" = erreur quadratique moyenne de validation
+# croisée leave-one-out, obtenue sans réajustement par les leviers (PRESS / n).
+
+import math
+import itertools
+import numpy as np
+import pandas as pd
+
+from parallele import repartir
+
+CRITERES = ("aic", "bic", "cv")
+ENUMERATION_MAX_PAR_DEFAUT = 20_000_000
+TAILLE_LOT_ENUMERATION = 200_000
+NOEUDS_MAX_PAR_DEFAUT = 200_000
+N_LAMBDAS_PAR_DEFAUT = 100
+
+
+#Fonction pour calculer AIC et BIC (conventions statsmodels) à partir de la RSS et du nombre de paramètres
+def criteresInformation(rss, n, k):
+    log_vraisemblance = -n / 2 * (np.log(2 * np.pi) + np.log(np.asarray(rss, dtype=float) / n) + 1)
+    return -2 * log_vraisemblance + 2 * k, -2 * log_vraisemblance + np.log(n) * k
+
+
+def _score(critere, rss, press, n, k):
+    if critere == "cv":
+        return np.asarray(press) / n
+    aic, bic = criteresInformation(rss, n, k)
+    return aic if critere == "aic" else bic
+
+
+def _base(R, indices):
+    # colonnes linéairement dépendantes des précédentes écartées (sinon une direction arbitraire de Q fausserait la RSS)
+    Q, Rs = np.linalg.qr(R[:, indices])
+    diagonale = np.abs(np.diag(Rs))
+    garder = diagonale > diagonale.max(initial=0.0) * max(R.shape[0], len(indices)) * np.finfo(float).eps
+    if not garder.all():
+        Q, _ = np.linalg.qr(R[:, np.asarray(indices)[garder]])
+    return Q
+
+
+def _rss(R, qty, rss_complet, indices):
+    z = _base(R, indices).T @ qty
+    return max(rss_complet + float(qty @ qty - z @ z), 0.0)
+
+
+#Fonction pour calculer la RSS et la somme PRESS (validation croisée leave-one-out) d'un sous-modèle
+def rssEtPress(moindres_carres, indices):
+    base = moindres_carres.Q @ _base(moindres_carres.R, indices)
+    y = moindres_carres.y.to_numpy(dtype=float)
+    residus = y - base @ (base.T @ y)
+    leviers = np.einsum("ij,ij->i", base, base)
+    return float(residus @ residus), float(np.sum((residus / (1 - leviers)) ** 2))
+
+
+def _ajouts(moindres_carres, indices, candidats, critere):
+    # évaluation vectorisée de tous les ajouts possibles (mise à jour de rang un de la base du modèle)
+    R, qty = moindres_carres.R, moindres_carres.qty
+    base = _base(R, indices)
+    W = R[:, candidats] - base @ (base.T @ R[:, candidats])
+    normes = np.linalg.norm(W, axis=0)
+    valides = normes > 1e-10 * np.linalg.norm(R[:, candidats], axis=0)
+    U = W / np.where(valides, normes, 1.0)
+    gains = (U.T @ qty) ** 2
+    rss_courant = _rss(R, qty, moindres_carres.rss_complet, indices)
+    rss = np.maximum(rss_courant - gains, 0.0)
+    press = None
+    if critere == "cv":
+        y = moindres_carres.y.to_numpy(dtype=float)
+        base_n = moindres_carres.Q @ base
+        residus = y - base_n @ (base_n.T @ y)
+        leviers = np.einsum("ij,ij->i", base_n, base_n)
+        nouvelles = moindres_carres.Q @ U
+        residus = residus[:, None] - nouvelles * (nouvelles.T @ y)[None, :]
+        leviers = leviers[:, None] + nouvelles ** 2
+        press = np.sum((residus / (1 - leviers)) ** 2, axis=0)
+    scores = _score(critere, rss, press, moindres_carres.n, len(indices) + 1)
+    return np.where(valides, scores, np.inf)
+
+
+def _retraits(moindres_carres, indices, critere):
+    # évaluation vectorisée de tous les retraits possibles (hors constante)
+    R, qty = moindres_carres.R, moindres_carres.qty
+    Q, Rs = np.linalg.qr(R[:, indices])
+    beta = np.linalg.solve(Rs, Q.T @ qty)
+    inverse = np.linalg.inv(Rs)
+    rss = _rss(R, qty, moindres_carres.rss_complet, indices) + beta ** 2 / np.sum(inverse ** 2, axis=1)
+    if critere == "cv":
+        press = np.array([rssEtPress(moindres_carres, np.delete(indices, i))[1] for i in range(len(indices))])
+    else:
+        press = None
+    scores = _score(critere, rss, press, moindres_carres.n, len(indices) - 1)
+    if moindres_carres.constante:
+        scores[list(indices).index(0)] = np.inf
+    return scores
+
+
+def _score_modele(moindres_carres, indices, critere):
+    rss, press = rssEtPress(moindres_carres, indices)
+    return float(_score(critere, rss, press, moindres_carres.n, len(indices)))
+
+
+#Fonction pour sélectionner les variables pas à pas (sens "avant" ou "arriere") selon un critère (aic, bic, cv)
+def selectionPasAPas(moindres_carres, candidats=None, sens="avant", critere="bic"):
+    candidats = moindres_carres.noms[1 if moindres_carres.constante else 0:] if candidats is None else list(candidats)
+    toutes = [moindres_carres.noms.index(c) for c in candidats]
+    base = [0] if moindres_carres.constante else []
+    indices = list(base) if sens == "avant" else base + toutes
+    score = _score_modele(moindres_carres, indices, critere) if indices else np.inf
+    historique = [{"etape": 0, "action": "depart", "variable": None, critere: score, "n_variables": len(indices) - len(base)}]
+    while True:
+        if sens == "avant":
+            restants = [j for j in toutes if j not in indices]
+            if not restants:
+                break
+            scores = _ajouts(moindres_carres, indices, restants, critere)
+            meilleur = int(np.argmin(scores))
+            if not scores[meilleur] < score:
+                break
+            indices.append(restants[meilleur])
+            variable, action = restants[meilleur], "ajout"
+        else:
+            if len(indices) <= len(base) + 1:
+                break
+            scores = _retraits(moindres_carres, indices, critere)
+            meilleur = int(np.argmin(scores))
+            if not scores[meilleur] < score:
+                break
+            variable, action = indices.pop(meilleur), "retrait"
+        score = float(scores[meilleur])
+        historique.append({"etape": len(historique), "action": action, "variable": moindres_carres.noms[variable],
+                           critere: score, "n_variables": len(indices) - len(base)})
+    return {
+        "variables": [moindres_carres.noms[i] for i in indices if i not in base],
+        "critere": critere,
+        "score": score,
+        "historique": pd.DataFrame(historique),
+    }
+
+
+def _branche(tache):
+    R, qty, rss_complet, base, inclus, disponibles, k_max, meilleures_rss, noeuds_max = tache
+    meilleures_rss = np.array(meilleures_rss, dtype=float)
+    meilleurs = [None] * len(meilleures_rss)
+    pile = [(list(inclus), list(disponibles))]
+    noeuds = 0
+    while pile and noeuds < noeuds_max:
+        inclus, disponibles = pile.pop()
+        noeuds += 1
+        taille = len(inclus)
+        rss = _rss(R, qty, rss_complet, base + inclus)
+        if rss < meilleures_rss[taille]:
+            meilleures_rss[taille] = rss
+            meilleurs[taille] = list(inclus)
+        if not disponibles or taille >= k_max:
+            continue
+        # la RSS de inclus + disponibles minore celle de tous les modèles de cette branche
+        borne = _rss(R, qty, rss_complet, base + inclus + disponibles)
+        atteignables = range(taille + 1, min(taille + len(disponibles), k_max) + 1)
+        if all(borne >= meilleures_rss[s] for s in atteignables):
+            continue
+        pile.append((inclus, disponibles[1:]))
+        pile.append((inclus + [disponibles[0]], disponibles[1:]))
+    return meilleures_rss, meilleurs, not pile
+
+
+def _equations_reduites(moindres_carres, base, candidats):
+    # équations normales des candidats, la base (constante) étant éliminée par complément de Schur :
+    # RSS(base + S) = RSS(base) - g_S' G_SS^-1 g_S
+    M = moindres_carres.R.T @ moindres_carres.R
+    v = moindres_carres.R.T @ moindres_carres.qty
+    G, g = M[np.ix_(candidats, candidats)], v[candidats]
+    if base:
+        projection = np.linalg.solve(M[np.ix_(base, base)], M[np.ix_(base, candidats)])
+        G = G - M[np.ix_(candidats, base)] @ projection
+        g = g - projection.T @ v[base]
+    return G, g
+
+
+def _enumeration(tache):
+    # tous les sous-ensembles de taille donnée commençant par le candidat premier, évalués par lots
+    G, g, taille, premier, lot = tache
+    suivants = range(premier + 1, len(g))
+    combinaisons = itertools.combinations(suivants, taille - 1)
+    meilleur_gain, meilleur = -np.inf, None
+    while True:
+        if taille == 1:
+            S = np.array([[premier]])
+        else:
+            reste = np.fromiter(itertools.chain.from_iterable(itertools.islice(combinaisons, lot)), dtype=np.intp)
+            if not len(reste):
+                break
+            reste = reste.reshape(-1, taille - 1)
+            S = np.column_stack([np.full(len(reste), premier), reste])
+        GS, gS = G[S[:, :, None], S[:, None, :]], g[S]
+        try:
+            solutions = np.linalg.solve(GS, gS[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            solutions = np.einsum("nij,nj->ni", np.linalg.pinv(GS), gS)
+        gains = np.einsum("ni,ni->n", gS, solutions)
+        i = int(np.argmax(gains))
+        if gains[i] > meilleur_gain:
+            meilleur_gain, meilleur = float(gains[i]), S[i].tolist()
+        if taille == 1:
+            break
+    return taille, meilleur_gain, meilleur
+
+
+#Fonction pour chercher les meilleurs sous-ensembles de 1 à k_max variables (énumération complète si elle reste
+#raisonnable, sinon séparation et évaluation avec un budget total de noeuds ; lots répartis sur le pool)
+def meilleursSousEnsembles(moindres_carres, candidats=None, k_max=8, critere="bic", noeuds_max=NOEUDS_MAX_PAR_DEFAUT,
+                           enumeration_max=ENUMERATION_MAX_PAR_DEFAUT, processus=None):
+    candidats = moindres_carres.noms[1 if moindres_carres.constante else 0:] if candidats is None else list(candidats)
+    base = [0] if moindres_carres.constante else []
+    R, qty, rss_complet = moindres_carres.R, moindres_carres.qty, moindres_carres.rss_complet
+    colonnes = [moindres_carres.noms.index(c) for c in candidats]
+    k_max = min(k_max, len(colonnes))
+
+    if sum(math.comb(len(colonnes), taille) for taille in range(1, k_max + 1)) <= enumeration_max:
+        # énumération complète, vectorisée : un lot par (taille, premier candidat)
+        G, g = _equations_reduites(moindres_carres, base, colonnes)
+        taches = [(G, g, taille, premier, TAILLE_LOT_ENUMERATION)
+                  for taille in range(1, k_max + 1) for premier in range(len(colonnes) - taille + 1)]
+        gains = [-np.inf] * (k_max + 1)
+        meilleurs = [[] for _ in range(k_max + 1)]
+        for taille, gain, sous_ensemble in repartir(_enumeration, taches, processus, taille_lot=8):
+            if gain > gains[taille]:
+                gains[taille], meilleurs[taille] = gain, [colonnes[i] for i in sous_ensemble]
+        # RSS des meilleurs modèles recalculées par QR (plus précise que les équations normales)
+        meilleures_rss = [_rss(R, qty, rss_complet, base + variables) if base + variables else moindres_carres.somme_carres
+                          for variables in meilleurs]
+        exhaustif = True
+    else:
+        # bornes de départ : modèles de la sélection avant (RSS minimale à chaque taille trouvée pas à pas)
+        indices = list(base)
+        restants = list(colonnes)
+        meilleures_rss = [_rss(R, qty, rss_complet, base) if base else np.inf]
+        meilleurs = [[]]
+        while len(meilleurs) <= k_max and restants:
+            scores = _ajouts(moindres_carres, indices, restants, "aic")
+            j = restants.pop(int(np.argmin(scores)))
+            indices.append(j)
+            meilleures_rss.append(_rss(R, qty, rss_complet, indices))
+            meilleurs.append(indices[len(base):])
+
+        # variables les plus utiles en premier : les bonnes solutions sont trouvées tôt dans chaque branche ;
+        # le budget total de noeuds est partagé entre les branches de premier niveau
+        ordre = indices[len(base):] + restants
+        noeuds_branche = max(1, noeuds_max // len(ordre))
+        taches = [(R, qty, rss_complet, base, [ordre[i]], ordre[i + 1:], k_max, meilleures_rss, noeuds_branche)
+                  for i in range(len(ordre))]
+        exhaustif = True
+        for rss_branche, meilleurs_branche, complete in repartir(_branche, taches, processus):
+            exhaustif &= complete
+            for taille, rss in enumerate(rss_branche):
+                if meilleurs_branche[taille] is not None and rss < meilleures_rss[taille]:
+                    meilleures_rss[taille] = rss
+                    meilleurs[taille] = meilleurs_branche[taille]
+
+    lignes = []
+    for taille in range(1, k_max + 1):
+        variables = meilleurs[taille]
+        aic, bic = criteresInformation(meilleures_rss[taille], moindres_carres.n, taille + len(base))
+        press = rssEtPress(moindres_carres, base + variables)[1] if critere == "cv" else np.nan
+        lignes.append({"n_variables": taille, "rss": meilleures_rss[taille], "aic": aic, "bic": bic,
+                       "cv": press / moindres_carres.n, "variables": [moindres_carres.noms[i] for i in variables]})
+    tableau = pd.DataFrame(lignes)
+    meilleur = tableau.loc[tableau[critere].idxmin()]
+    return {"variables": list(meilleur["variables"]), "critere": critere, "score": float(meilleur[critere]),
+            "par_taille": tableau, "exhaustif": exhaustif}
+
+
+def _descente_coordonnees(G, c, lambdas, tolerance=1e-7, iterations_max=1000):
+    p = len(c)
+    beta = np.zeros(p)
+    chemin = np.zeros((len(lambdas), p))
+    diagonale = np.diag(G)
+    for l, lam in enumerate(lambdas):
+        actives = np.arange(p)
+        while True:
+            for _ in range(iterations_max):
+                ecart_max = 0.0
+                for j in actives:
+                    rho = c[j] - G[j] @ beta + diagonale[j] * beta[j]
+                    nouveau = np.sign(rho) * max(abs(rho) - lam, 0.0) / diagonale[j]
+                    if nouveau != beta[j]:
+                        ecart_max = max(ecart_max, abs(nouveau - beta[j]))
+                        beta[j] = nouveau
+                if ecart_max < tolerance:
+                    break
+                actives = np.flatnonzero(beta)
+            # vérification des conditions d'optimalité sur toutes les variables (retour au cycle complet si besoin)
+            gradient = c - G @ beta
+            hors = (beta == 0) & (np.abs(gradient) > lam * (1 + 1e-6))
+            if not hors.any():
+                break
+            actives = np.arange(p)
+        chemin[l] = beta
+    return chemin
+
+
+def _gram(X, y):
+    moyennes = X.mean(axis=0)
+    ecarts = X.std(axis=0)
+    ecarts[ecarts == 0] = 1.0
+    Xs = (X - moyennes) / ecarts
+    yc = y - y.mean()
+    return Xs.T @ Xs / len(y), Xs.T @ yc / len(y), moyennes, ecarts, y.mean()
+
+
+def _pli(tache):
+    X, y, test, lambdas = tache
+    apprentissage = np.ones(len(y), dtype=bool)
+    apprentissage[test] = False
+    G, c, moyennes, ecarts, moyenne_y = _gram(X[apprentissage], y[apprentissage])
+    chemin = _descente_coordonnees(G, c, lambdas) / ecarts
+    predictions = moyenne_y + (X[test] - moyennes) @ chemin.T
+    return np.mean((y[test][:, None] - predictions) ** 2, axis=0)
+
+
+#Fonction pour calculer le chemin du LASSO (coefficients à l'échelle d'origine pour chaque lambda)
+def cheminLasso(X, y, n_lambdas=N_LAMBDAS_PAR_DEFAUT, ratio=1e-3, lambdas=None):
+    X = pd.DataFrame(X)
+    G, c, moyennes, ecarts, moyenne_y = _gram(X.to_numpy(dtype=float), np.asarray(y, dtype=float))
+    if lambdas is None:
+        lambda_max = np.max(np.abs(c))
+        lambdas = lambda_max * np.logspace(0, np.log10(ratio), n_lambdas)
+    chemin = _descente_coordonnees(G, c, lambdas)
+    coefficients = pd.DataFrame(chemin / ecarts, columns=X.columns)
+    coefficients.insert(0, "const", moyenne_y - coefficients.to_numpy() @ moyennes)
+    coefficients.insert(0, "lambda", lambdas)
+    # RSS du LASSO sur données standardisées, à partir de la seule matrice de Gram
+    yc = np.asarray(y, dtype=float) - moyenne_y
+    rss = yc @ yc - 2 * len(yc) * chemin @ c + len(yc) * np.einsum("lj,jk,lk->l", chemin, G, chemin)
+    return {"lambdas": lambdas, "coefficients": coefficients, "rss": np.maximum(rss, 0.0),
+            "n_variables": np.count_nonzero(chemin, axis=1)}
+
+
+#Fonction pour choisir le lambda du LASSO (validation croisée en k plis répartis sur le pool, ou aic / bic)
+def selectionLasso(X, y, critere="cv", n_plis=5, n_lambdas=N_LAMBDAS_PAR_DEFAUT, graine=None, processus=None):
+    X = pd.DataFrame(X)
+    chemin = cheminLasso(X, y, n_lambdas=n_lambdas)
+    n = len(X)
+    if critere == "cv":
+        plis = np.array_split(np.random.default_rng(graine).permutation(n), n_plis)
+        taches = [(X.to_numpy(dtype=float), np.asarray(y, dtype=float), test, chemin["lambdas"]) for test in plis]
+        erreurs = np.mean(repartir(_pli, taches, processus), axis=0)
+        scores = erreurs
+    else:
+        aic, bic = criteresInformation(chemin["rss"], n, chemin["n_variables"] + 1)
+        scores = aic if critere == "aic" else bic
+    meilleur = int(np.argmin(scores))
+    coefficients = chemin["coefficients"].iloc[meilleur].drop(["lambda", "const"])
+    return {
+        "variables": list(coefficients.index[coefficients != 0]),
+        "critere": critere,
+        "lambda": float(chemin["lambdas"][meilleur]),
+        "score": float(scores[meilleur]),
+        "scores": scores,
+        "chemin": chemin,
+    }
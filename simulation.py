@@ -0,0 +1,81 @@
+# coding:utf8
+
+# Simulation Monte-Carlo de l'échantillonnage sans remise dans une population finie.
+# Pour une taille d'échantillon n, on tire des échantillons par blocs de taille bornée avec
+# des tirages hypergéométriques multivariés vectorisés (un bloc = une matrice échantillons x
+# catégories). Pour chaque bloc, on mesure la couverture des intervalles de confiance à
+# approximation normale, avec et sans correction de population finie (fpc), puis on
+# accumule les résultats : la mémoire ne dépend que de la taille des blocs.
+
+import math
+import numpy as np
+import pandas as pd
+
+from parallele import repartir
+
+TAILLE_BLOC_PAR_DEFAUT = 100_000
+
+
+#Fonction pour calculer le facteur de correction de population finie
+def correctionPopulationFinie(N, n):
+    return math.sqrt(max(0.0, (N - n) / (N - 1)))
+
+
+def _bloc(tache):
+    pop_counts, n, taille, zC, graine = tache
+    rng = np.random.default_rng(graine)
+    N = pop_counts.sum()
+    p = pop_counts / N
+    comptes = rng.multivariate_hypergeometric(pop_counts, n, size=taille)
+    p_hat = comptes / n
+    se = np.sqrt(p_hat * (1 - p_hat) / n)
+    ecart = np.abs(p_hat - p)
+    return {
+        "couverts_fpc": np.sum(ecart <= zC * se * correctionPopulationFinie(N, n), axis=0),
+        "couverts_sans_fpc": np.sum(ecart <= zC * se, axis=0),
+        # intervalle de fluctuation autour de la vraie fréquence (formule de la session 5)
+        "fluctuation": np.sum(ecart <= zC * np.sqrt(p * (1 - p) / n) * correctionPopulationFinie(N, n), axis=0),
+        "somme": p_hat.sum(axis=0),
+        "somme_carres": ((p_hat - p) ** 2).sum(axis=0),
+        "taille": taille,
+    }
+
+
+#Fonction pour simuler des tirages sans remise et mesurer la couverture des intervalles pour chaque taille n
+def couvertureIntervalles(pop_counts, tailles, n_simulations=1_000_000, zC=1.96, categories=None,
+                          taille_bloc=TAILLE_BLOC_PAR_DEFAUT, graine=None, processus=None):
+    pop_counts = np.asarray(pop_counts, dtype=np.int64)
+    N = int(pop_counts.sum())
+    p = pop_counts / N
+    if categories is None:
+        categories = [f"categorie_{i + 1}" for i in range(len(pop_counts))]
+    tailles = [int(n) for n in tailles]
+    blocs = [taille_bloc] * (n_simulations // taille_bloc)
+    if n_simulations % taille_bloc:
+        blocs.append(n_simulations % taille_bloc)
+    graines = np.random.SeedSequence(graine).spawn(len(tailles) * len(blocs))
+    taches = [(pop_counts, n, taille, zC, graines[i * len(blocs) + j])
+              for i, n in enumerate(tailles) for j, taille in enumerate(blocs)]
+    resultats = repartir(_bloc, taches, processus)
+
+    lignes = []
+    for i, n in enumerate(tailles):
+        partiels = resultats[i * len(blocs):(i + 1) * len(blocs)]
+        total = sum(r["taille"] for r in partiels)
+        cumul = {cle: sum(r[cle] for r in partiels)
+                 for cle in ("couverts_fpc", "couverts_sans_fpc", "fluctuation", "somme", "somme_carres")}
+        fpc = correctionPopulationFinie(N, n)
+        for k, categorie in enumerate(categories):
+            lignes.append({
+                "n": n,
+                "categorie": categorie,
+                "p_population": p[k],
+                "moyenne_p_hat": cumul["somme"][k] / total,
+                "ecart_type_empirique": math.sqrt(cumul["somme_carres"][k] / total),
+                "ecart_type_theorique_fpc": math.sqrt(p[k] * (1 - p[k]) / n) * fpc,
+                "couverture_ic_fpc": cumul["couverts_fpc"][k] / total,
+                "couverture_ic_sans_fpc": cumul["couverts_sans_fpc"][k] / total,
+                "couverture_fluctuation": cumul["fluctuation"][k] / total,
+                "n_simulations": total,
+            })
+    return pd.DataFrame(lignes)
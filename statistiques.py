@@ -0,0 +1,122 @@
+# coding:utf8
+
+# Moteur de statistiques descriptives vectorisé.
+# Toutes les colonnes quantitatives sont traitées ensemble sous forme de matrice :
+# chaque colonne n'est triée qu'une seule fois, puis médiane, quantiles, mode et
+# étendue sont lus directement dans la matrice triée.
+
+import numpy as np
+import pandas as pd
+
+QUANTILES_PAR_DEFAUT = (0.10, 0.25, 0.50, 0.75, 0.90)
+
+
+#Fonction pour lister les colonnes quantitatives (mêmes règles que les sessions : int64 ou float64)
+def colonnesQuantitatives(contenu):
+    return [colonne for colonne in contenu.columns if contenu[colonne].dtype in ("int64", "float64")]
+
+
+#Fonction pour lire des quantiles (interpolation linéaire, comme pandas) dans une matrice triée par colonne
+def quantilesTries(tries, effectifs, probabilites):
+    resultats = np.full((len(probabilites), tries.shape[1]), np.nan)
+    valides = effectifs > 0
+    colonnes = np.flatnonzero(valides)
+    for ligne, p in enumerate(probabilites):
+        position = (effectifs[valides] - 1) * p
+        bas = np.floor(position).astype(int)
+        haut = np.minimum(bas + 1, effectifs[valides] - 1)
+        poids = position - bas
+        v_bas = tries[bas, colonnes]
+        v_haut = tries[haut, colonnes]
+        resultats[ligne, valides] = v_bas + (v_haut - v_bas) * poids
+    return resultats
+
+
+#Fonction pour calculer le mode de chaque colonne d'une matrice triée (plus petite valeur en cas d'égalité, comme Series.mode().iloc[0])
+def modesTries(tries, effectifs):
+    n_lignes, n_colonnes = tries.shape
+    if n_lignes == 0:
+        return np.full(n_colonnes, np.nan)
+    indices = np.arange(n_lignes)[:, None]
+    debut = np.ones(tries.shape, dtype=bool)
+    debut[1:] = tries[1:] != tries[:-1]
+    # position du début de la plage de valeurs égales à laquelle appartient chaque ligne
+    debut_plage = np.maximum.accumulate(np.where(debut, indices, 0), axis=0)
+    longueur = indices - debut_plage + 1
+    longueur[indices >= effectifs[None, :]] = 0
+    fin_mode = np.argmax(longueur, axis=0)
+    modes = tries[fin_mode, np.arange(n_colonnes)]
+    modes[effectifs == 0] = np.nan
+    return modes
+
+
+#Fonction pour calculer en une passe matricielle les statistiques de toutes les colonnes quantitatives
+def statistiquesDescriptives(contenu, colonnes=None, quantiles=QUANTILES_PAR_DEFAUT):
+    if colonnes is None:
+        colonnes = colonnesQuantitatives(contenu)
+    bloc = contenu[colonnes].to_numpy(dtype=float, na_value=np.nan)
+    effectifs = np.sum(~np.isnan(bloc), axis=0)
+
+    # Un seul tri par colonne : les NaN sont rangés en fin de colonne
+    tries = np.sort(bloc, axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        moyennes = np.nansum(bloc, axis=0) / effectifs
+        ecarts = bloc - moyennes
+        ecart_absolu_moyen = np.nansum(np.abs(ecarts), axis=0) / effectifs
+        ecart_type = np.sqrt(np.nansum(ecarts ** 2, axis=0) / (effectifs - 1))
+    dernier = np.maximum(effectifs - 1, 0)
+    etendues = tries[dernier, np.arange(len(colonnes))] - tries[0]
+    etendues[effectifs == 0] = np.nan
+
+    probabilites = sorted(set(quantiles) | {0.5})
+    valeurs_quantiles = quantilesTries(tries, effectifs, probabilites)
+    return {
+        "colonnes": list(colonnes),
+        "dtypes": [str(contenu[colonne].dtype) for colonne in colonnes],
+        "effectif": effectifs,
+        "moyenne": moyennes,
+        "mediane": valeurs_quantiles[probabilites.index(0.5)],
+        "mode": modesTries(tries, effectifs),
+        "ecart_type": ecart_type,
+        "ecart_absolu_moyenne": ecart_absolu_moyen,
+        "etendue": etendues,
+        "quantiles": {p: valeurs_quantiles[i] for i, p in enumerate(probabilites)},
+    }
+
+
+#Fonction pour construire le tableau stats_colonnes (mêmes colonnes et arrondis que la session 3)
+def tableauStatistiques(resultats):
+    lignes = []
+    for i, colonne in enumerate(resultats["colonnes"]):
+        mode = resultats["mode"][i]
+        etendue = resultats["etendue"][i]
+        if resultats["dtypes"][i] == "int64":
+            # pandas conserve le type entier pour le mode et l'étendue
+            mode = mode if np.isnan(mode) else np.int64(mode)
+            etendue = etendue if np.isnan(etendue) else np.int64(etendue)
+        lignes.append({
+            "colonne": colonne,
+            "dtype": resultats["dtypes"][i],
+            "moyenne": round(resultats["moyenne"][i], 2),
+            "mediane": round(resultats["mediane"][i], 2),
+            "mode": round(mode, 2),
+            "ecart_type": round(resultats["ecart_type"][i], 2),
+            "ecart_absolu_moyenne": round(resultats["ecart_absolu_moyenne"][i], 2),
+            "etendue": round(etendue, 2),
+        })
+    return pd.DataFrame(lignes)
+
+
+#Fonction pour construire le tableau distances_colonnes (distances interquartile et interdécile)
+def tableauDistances(resultats):
+    q = resultats["quantiles"]
+    lignes = []
+    for i, colonne in enumerate(resultats["colonnes"]):
+        lignes.append({
+            "colonne": colonne,
+            "dtype": resultats["dtypes"][i],
+            "IQR": round(q[0.75][i] - q[0.25][i], 2),
+            "IDR": round(q[0.90][i] - q[0.10][i], 2),
+        })
+    return pd.DataFrame(lignes)